@@ -5,3 +5,6 @@ class EngineConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.engine"
     verbose_name = "测试引擎"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,250 @@
+# core/common/assertion.py
+# 自定义断言脚本：按内容哈希编译一次并缓存，在独立的 worker 进程中执行，单次调用有 CPU 时间与超时限制
+import hashlib
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+from collections import OrderedDict
+from .config import engine_setting
+
+logger = logging.getLogger(__name__)
+
+
+class AssertionTimeout(Exception):
+    """断言脚本超出 CPU 时间或执行时长限制"""
+
+
+def script_digest(script: str) -> str:
+    return hashlib.sha256(script.encode("utf-8")).hexdigest()
+
+
+class ScriptCache:
+    """有界 LRU，按内容哈希缓存编译后的 code 对象；父进程编译时校验语法，各 worker 进程首次执行时编译并各自缓存"""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or engine_setting("ASSERTION_CACHE_SIZE")
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, digest: str, script: str):
+        with self._lock:
+            code = self._cache.get(digest)
+            if code is not None:
+                self.hits += 1
+                self._cache.move_to_end(digest)
+                return code
+            self.misses += 1
+        code = compile(script, f"<assertion {digest[:12]}>", "exec")
+        with self._lock:
+            self._cache[digest] = code
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return code
+
+    def stats(self) -> dict:
+        return {"size": len(self._cache), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+script_cache = ScriptCache()
+
+
+def _raise_timeout(signum, frame):
+    raise AssertionTimeout("CPU 时间超限" if signum == signal.SIGPROF else "执行超时")
+
+
+def _init_worker(memory_limit):
+    """worker 启动时设置信号处理与内存上限"""
+    signal.signal(signal.SIGPROF, _raise_timeout)
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    if memory_limit:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def execute_script(digest: str, script: str, actual, expected, cpu_time=None, timeout=None):
+    """执行断言脚本，脚本通过 result 变量返回断言结果
+
+    在 worker 中执行时用 ITIMER_PROF 限制 CPU 时间、ITIMER_REAL 限制执行时长。
+    """
+    code = script_cache.compile(digest, script)
+    local_vars = {"actual": actual, "expected": expected}
+    limited = cpu_time is not None and threading.current_thread() is threading.main_thread()
+    if limited:
+        signal.setitimer(signal.ITIMER_PROF, cpu_time)
+        signal.setitimer(signal.ITIMER_REAL, timeout or cpu_time)
+    try:
+        exec(code, {}, local_vars)
+    finally:
+        if limited:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return local_vars.get("result", False)
+
+
+def _worker_main(conn, memory_limit):
+    """worker 主循环：逐个接收 (digest, script, actual, expected, cpu_time, timeout) 并回送 (是否成功, 结果或异常)"""
+    _init_worker(memory_limit)
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            return
+        if args is None:
+            return
+        try:
+            reply = (True, execute_script(*args))
+        except BaseException as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # 结果或异常无法序列化时只回送描述
+            conn.send((False, RuntimeError(f"断言结果无法回传: {e!r}")))
+
+
+class _Worker:
+    """单个 worker 进程及其管道"""
+
+    def __init__(self, context, memory_limit):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, memory_limit), daemon=True)
+        self.process.start()
+        child.close()
+
+    def call(self, args, timeout) -> tuple:
+        self.conn.send(args)
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(0.1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+def _start_method() -> str:
+    """worker 不从父进程 fork：执行器进程带有事件循环、报告写入等线程，fork 后子进程可能卡在被复制的锁上"""
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+class AssertionPool:
+    """自定义断言进程池
+
+    - workers: 进程数，0 表示在当前进程内执行（不做资源限制，仅用于调试）
+    - cpu_time / timeout: 单次调用的 CPU 时间与执行时长上限（秒）
+    - 每个 worker 同一时间只执行一个脚本；脚本卡在信号无法打断的位置或进程异常退出时只替换该 worker，
+      其他 worker 上正在执行的断言不受影响
+    """
+
+    def __init__(self, workers=None, cpu_time=None, timeout=None, memory_limit=None):
+        self.workers = engine_setting("ASSERTION_WORKERS") if workers is None else workers
+        self.cpu_time = cpu_time or engine_setting("ASSERTION_CPU_TIME")
+        self.timeout = timeout or engine_setting("ASSERTION_TIMEOUT")
+        self.memory_limit = memory_limit or engine_setting("ASSERTION_MEMORY_LIMIT")
+        self._context = None
+        self._idle = None
+        self._all = []
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def start(self) -> queue.Queue:
+        """拉起全部 worker，返回空闲 worker 队列"""
+        with self._lock:
+            if self._idle is None:
+                self._context = multiprocessing.get_context(_start_method())
+                idle = queue.Queue()
+                for _ in range(self.workers):
+                    idle.put(self._spawn())
+                self._idle = idle
+            return self._idle
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self.memory_limit)
+        self._all.append(worker)
+        return worker
+
+    def run(self, digest: str, script: str, actual, expected):
+        self.calls += 1
+        if not self.workers:
+            return execute_script(digest, script, actual, expected)
+        idle = self.start()
+        worker = idle.get()
+        try:
+            # worker 内的定时器先触发，这里多等 1 秒兜底
+            ok, value = worker.call((digest, script, actual, expected, self.cpu_time, self.timeout), self.timeout + 1)
+        except TimeoutError:
+            # 定时器没能打断脚本，替换该 worker
+            self.timeouts += 1
+            worker = self._restart(worker)
+            raise AssertionTimeout("执行超时")
+        except (EOFError, OSError):
+            worker = self._restart(worker)
+            raise RuntimeError("断言进程异常退出")
+        finally:
+            idle.put(worker)
+        if ok:
+            return value
+        if isinstance(value, AssertionTimeout):
+            self.timeouts += 1
+        raise value
+
+    def _restart(self, worker: _Worker) -> _Worker:
+        worker.process.terminate()
+        worker.process.join()
+        worker.conn.close()
+        with self._lock:
+            self._all.remove(worker)
+            self.restarts += 1
+            return self._spawn()
+
+    def close(self):
+        with self._lock:
+            workers, self._all, self._idle = self._all, [], None
+        for worker in workers:
+            worker.stop()
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "started": self._idle is not None,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "cache": script_cache.stats(),
+        }
+
+
+assertion_pool = AssertionPool()
+
+
+class AssertionScript:
+    """编译执行计划时创建，可直接作为 Validator 的自定义断言函数调用"""
+
+    __slots__ = ("name", "script", "digest")
+
+    def __init__(self, name: str, script: str):
+        self.name = name
+        self.script = script
+        self.digest = script_digest(script)
+        try:
+            script_cache.compile(self.digest, script)
+        except SyntaxError as e:
+            raise ValueError(f"自定义断言 {name} 脚本语法错误: {e}") from e
+
+    def __call__(self, actual, expected):
+        return assertion_pool.run(self.digest, self.script, actual, expected)
@@ -0,0 +1,98 @@
+# core/common/config.py
+from django.conf import settings
+
+# 引擎默认配置，可在 settings.ENGINE 中覆盖
+ENGINE_DEFAULTS = {
+    "MAX_CONCURRENCY": 50,  # 单个任务的全局并发上限
+    "PER_HOST_CONCURRENCY": 10,  # 单个 base_url 的请求并发上限（开启 ADAPTIVE_CONCURRENCY 时为初始值）
+    "HTTP2": False,  # 是否启用 HTTP/2（需安装 h2）
+    "POOL_MAX_CONNECTIONS": 100,  # 单个连接池最大连接数
+    "POOL_MAX_KEEPALIVE": 20,  # 单个连接池最大空闲长连接数
+    "POOL_KEEPALIVE_EXPIRY": 30.0,  # 空闲长连接过期时间（秒）
+    "JMESPATH_CACHE_SIZE": 1024,  # JMESPath 编译缓存容量
+    "REPORT_BATCH_SIZE": 200,  # 报告批量写入条数
+    "REPORT_FLUSH_INTERVAL": 1.0,  # 报告最长写入间隔（秒）
+    "REPORT_QUEUE_SIZE": 1000,  # 报告写入队列上限，满时阻塞执行器
+    "STREAM_RESPONSES": False,  # 是否默认流式读取响应体（步骤可用 stream 覆盖）
+    "STREAM_CHUNK_SIZE": 64 * 1024,  # 流式读取块大小
+    "STREAM_SPILL_BYTES": 1024 * 1024,  # 响应体超过该大小后落盘
+    "STREAM_MAX_BYTES": 200 * 1024 * 1024,  # 单步骤响应体大小上限
+    "STREAM_SPILL_DIR": None,  # 落盘临时目录，默认系统临时目录
+    "STEP_CONCURRENCY": 1,  # 单个用例内无依赖步骤的并发上限，默认 1 按 order 串行，步骤间无隐式依赖时可调大
+    "CASE_TIMEOUT": 600,  # 单个用例的时间预算（秒，含重试），None 表示不限
+    "RETRY_BACKOFF_BASE": 0.5,  # 重试退避基数（秒）
+    "RETRY_BACKOFF_MAX": 10.0,  # 重试退避上限（秒）
+    "RETRY_ON_STATUS": [429, 502, 503, 504],  # 命中这些状态码时重试（与断言结果无关）
+    "RETRY_ON_ASSERTION": False,  # 断言失败是否重试
+    "HEDGE_DELAY": None,  # 幂等 GET 的对冲延迟（秒），None 表示关闭
+    "ROW_CONCURRENCY": 10,  # 参数化用例同时执行的行数
+    "PARAM_MAX_ROWS": 10000,  # 参数化用例的行数上限（含 execution_count 重复）
+    "SHARD_COUNT": 4,  # 分布式执行的分片数
+    "SHARD_TIMEOUT": 3600,  # 分布式执行等待全部分片结束的上限（秒）
+    "SHARD_QUEUE": "engine_shards",  # 分片任务的 Celery 队列，需由独立的 worker 消费（-Q engine_shards），避免协调者占满 worker 后分片无法执行
+    "SHARD_HEARTBEAT_INTERVAL": 10.0,  # 分片发送心跳的间隔（秒）
+    "SHARD_HEARTBEAT_TIMEOUT": 60.0,  # 已开始的分片超过该时长没有任何消息即视为异常退出（秒）
+    "RESULT_STREAM_BACKEND": "redis",  # 分片结果流：redis / memory（测试与 Celery eager 模式）
+    "RESULT_STREAM_MAXLEN": 100000,  # Redis Stream 近似长度上限
+    "RESULT_STREAM_BLOCK": 1.0,  # 协调者每次阻塞读取结果流的时长（秒）
+    "PROGRESS_INTERVAL": 2.0,  # 协调者写回任务阶段汇总的间隔（秒）
+    "SHARD_EWMA_ALPHA": 0.3,  # 用例历史耗时指数加权平均的平滑系数
+    "SHARD_HISTORY_WINDOW": 10,  # 每个用例参与估算的最近报告数
+    "SHARD_DEFAULT_DURATION": 1.0,  # 没有任何历史耗时时的用例预估耗时（秒）
+    "ASSERTION_WORKERS": 2,  # 自定义断言进程池大小，0 表示在当前进程内执行（仅调试）
+    "ASSERTION_CPU_TIME": 2.0,  # 单次自定义断言的 CPU 时间上限（秒）
+    "ASSERTION_TIMEOUT": 5.0,  # 单次自定义断言的执行时长上限（秒）
+    "ASSERTION_MEMORY_LIMIT": None,  # 断言 worker 的地址空间上限（字节），None 表示不限
+    "ASSERTION_CACHE_SIZE": 512,  # 编译后断言脚本的缓存条数
+    "DB_POOL_SIZE": 5,  # 每个被测数据库同时借出的连接上限
+    "DB_POOL_TIMEOUT": 10,  # 等待空闲连接的上限（秒）
+    "DB_POOL_RECYCLE": 300,  # 空闲连接超过该时长（秒）后重建
+    "DB_HOIST_SETUP": False,  # 用例开头一段步骤的 SQL 前置合并为一个事务在用例开始时执行；开启后这些前置会先于前面步骤的请求执行
+    "GRAPHQL_DOCUMENT_CACHE_SIZE": 1024,  # 解析后 GraphQL 文档的缓存条数
+    "GRAPHQL_PERSISTED_QUERIES": False,  # 默认使用持久化查询（只发送哈希，未注册时带查询文本补发）
+    "GRAPHQL_BATCHING": True,  # 相互独立的 GraphQL 步骤合并为一次批量请求
+    "GRAPHQL_BATCH_WINDOW": 0.005,  # 异步执行时等待合并的时间窗口（秒）
+    "GRAPHQL_BATCH_SIZE": 20,  # 单次批量请求的操作数上限
+    "MOCK_PREFIX": "/mock/",  # Mock 服务在 ASGI 应用中的挂载前缀，路径为 {prefix}{project_id}/接口路径
+    "MOCK_RELOAD_INTERVAL": 2.0,  # Mock 服务检查接口变更的间隔（秒）
+    "MOCK_LATENCY": 0,  # 默认注入延迟（毫秒），接口 mock_response.delay 优先
+    "MOCK_ERROR_RATE": 0.0,  # 默认注入错误比例，接口 mock_response.error_rate 优先
+    "MOCK_ERROR_STATUS": 500,  # 注入错误的状态码
+    "RECORD_MODE": None,  # 录制/回放模式：None 不录制 / record / replay / refresh，调试执行可单独指定
+    "RECORD_DIR": None,  # 录制目录，默认系统临时目录下的 engine_records
+    "RECORD_TTL": 3600,  # refresh 模式下录制的有效期（秒）
+    "RECORD_STRICT": False,  # replay 模式下没有录制时报错而不是请求被测服务
+    "RECORD_IGNORE_HEADERS": ["date", "user-agent", "x-request-id", "traceparent", "content-length"],  # 不参与指纹的请求头
+    "RECORD_IGNORE_PARAMS": [],  # 不参与指纹的查询参数，如时间戳、随机数
+    "RECORD_IGNORE_BODY": [],  # 不参与指纹的 JSON 请求体字段（点号路径）
+    "RATE_LIMIT": None,  # 异步执行时单个 base_url 每秒请求数上限，None 表示不限
+    "RATE_LIMIT_BURST": None,  # 令牌桶容量，默认等于 RATE_LIMIT
+    "ADAPTIVE_CONCURRENCY": True,  # 按 p95 延迟与错误率自动调整单个 base_url 的请求并发（AIMD），初始值为 PER_HOST_CONCURRENCY
+    "ADAPTIVE_MIN_CONCURRENCY": 1,  # 自适应并发下限
+    "ADAPTIVE_MAX_CONCURRENCY": 100,  # 自适应并发上限
+    "ADAPTIVE_WINDOW": 20,  # 每完成多少个请求评估一次
+    "ADAPTIVE_ERROR_RATE": 0.05,  # 窗口内错误率超过该值时收缩
+    "ADAPTIVE_LATENCY_TOLERANCE": 2.0,  # 窗口 p95 超过基线的倍数时收缩
+    "ADAPTIVE_LATENCY_TARGET": None,  # 固定的 p95 目标（秒），配置后不再使用基线
+    "ADAPTIVE_DECREASE": 0.7,  # 收缩时并发上限的乘数
+    "THROTTLE_STATUS": [429, 502, 503, 504],  # 计为过载错误的状态码，响应带 Retry-After（秒）时暂停令牌桶
+    "EVENT_STREAM": True,  # 发布步骤开始/结束、用例结束等执行事件，供 SSE / WebSocket 观察
+    "EVENT_BACKEND": "redis",  # 事件总线：redis（pub/sub，worker 与 ASGI 分进程部署）/ memory（进程内，仅测试与单进程调试）
+    "EVENT_PREFIX": "/events/",  # 事件推送在 ASGI 应用中的挂载前缀
+    "EVENT_QUEUE_SIZE": 10000,  # 待发布事件队列上限，满时丢弃新事件而不阻塞执行
+    "EVENT_BATCH_SIZE": 200,  # 每次 pipeline 发布的事件数上限
+    "EVENT_RETRY_MAX": 30.0,  # 总线发布失败后的最长退避（秒），从 1 秒起逐次翻倍
+    "EVENT_SUBSCRIBER_BUFFER": 1000,  # 单个观察者缓冲的事件数，超出时丢弃最旧的
+    "EVENT_HEARTBEAT": 15.0,  # 无事件时的心跳间隔（秒）
+    "RUN_BACKEND": "celery",  # 提交执行的用例运行：celery（投递到 worker）/ thread（进程内线程池，单机调试与测试）
+    "RUN_WORKERS": 4,  # thread 模式下同时执行的运行数
+    "RUN_DEDUP_WINDOW": 10,  # 相同幂等键的重复提交在该时间窗口（秒）内返回同一次运行
+    "HTTP_TIMING": True,  # 记录每个请求的分阶段耗时（连接池等待、建连、TLS、首字节、下载）
+    "LATENCY_HISTOGRAM_ALPHA": 0.01,  # 耗时直方图分位数的相对误差
+    "LATENCY_HISTORY_RUNS": 20,  # 查询接口耗时分位数时默认合并的最近执行次数
+}
+
+
+def engine_setting(name):
+    """读取引擎配置项"""
+    return getattr(settings, "ENGINE", {}).get(name, ENGINE_DEFAULTS[name])
@@ -0,0 +1,51 @@
+# core/common/dag.py
+# 步骤依赖图：根据提取器产出与 ${var} 引用推导步骤间依赖，无依赖的步骤可并发执行
+from .template import compile_template
+
+
+def step_reads(step) -> set:
+    """步骤请求模板与断言期望值中引用的变量"""
+    names = set(step.template.names)
+    expected = [validator.get("expected") for validator in step.validators]
+    names.update(compile_template(expected).names)
+    return names
+
+
+def step_writes(step) -> set:
+    """步骤提取器产出的变量"""
+    return {item["key"] for item in step.extractors}
+
+
+def build_step_graph(steps) -> tuple:
+    """返回每个步骤（按 order 排列）所依赖的前序步骤下标
+
+    - 读后写：引用变量的步骤依赖于它之前最近一次产出该变量的步骤
+    - 写后读 / 写后写：再次产出同名变量的步骤需等之前的读取者与产出者完成
+    - 带前后置 Hook 的步骤视为屏障，与前后所有步骤串行
+    """
+    producers = {}  # 变量 -> 最近一次产出的步骤下标
+    readers = {}  # 变量 -> 自最近一次产出以来读取它的步骤下标
+    barrier = None
+    graph = []
+    for index, step in enumerate(steps):
+        deps = set()
+        is_barrier = bool(step.setup_hooks or step.teardown_hooks)
+        if is_barrier:
+            deps.update(range(index))
+        elif barrier is not None:
+            deps.add(barrier)
+
+        for name in step_reads(step):
+            if name in producers:
+                deps.add(producers[name])
+            readers.setdefault(name, set()).add(index)
+        for name in step_writes(step):
+            deps.update(readers.pop(name, set()) - {index})
+            if name in producers:
+                deps.add(producers[name])
+            producers[name] = index
+
+        if is_barrier:
+            barrier = index
+        graph.append(frozenset(deps))
+    return tuple(graph)
@@ -1,8 +1,21 @@
 # core/common/db_executor.py
+# 被测项目数据库：按 Database 配置维护连接池，SQL 中的 ${var} 作为参数绑定而不是字符串拼接
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from django.db import connection
+from .config import engine_setting
+from .template import VAR_PATTERN
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
 
 def execute_sql(sql, params=None):
-    """执行 SQL 查询，支持参数化查询"""
+    """在平台自身数据库上执行 SQL，支持参数化查询"""
     try:
         with connection.cursor() as cursor:
             cursor.execute(sql, params or [])
@@ -12,5 +25,211 @@ def execute_sql(sql, params=None):
                 return [dict(zip(columns, row)) for row in results]
             return None  # 如果是数据更新操作，返回 None
     except Exception as e:
-        print(f"执行 SQL 时出错: {e}")
+        logger.error(f"执行 SQL 时出错: {str(e)}")
         raise  # 重新抛出异常以便上层处理
+
+
+class SqlStatement:
+    """预编译的 SQL：${var} 拆成占位符，执行时按驱动的 paramstyle 生成语句并绑定参数"""
+
+    __slots__ = ("text", "parts", "names", "_rendered")
+
+    def __init__(self, text: str):
+        self.text = text
+        split = VAR_PATTERN.split(text)
+        self.parts = tuple(split[0::2])
+        self.names = tuple(split[1::2])
+        self._rendered = {}
+
+    def sql(self, paramstyle: str) -> str:
+        rendered = self._rendered.get(paramstyle)
+        if rendered is None:
+            if paramstyle == "qmark":
+                rendered = "?".join(self.parts)
+            else:
+                # format 风格下原文中的 % 需要转义
+                rendered = "%s".join(part.replace("%", "%%") for part in self.parts) if self.names else self.text
+            self._rendered[paramstyle] = rendered
+        return rendered
+
+    def params(self, variables) -> list:
+        params = []
+        for name in self.names:
+            value = variables.get(name, _MISSING)
+            if value is _MISSING:
+                raise ValueError(f"SQL 引用的变量未定义: {name}")
+            params.append(value)
+        return params
+
+
+def _connect_mysql(database):
+    import MySQLdb
+
+    return MySQLdb.connect(
+        host=database.host, port=database.port, user=database.username, passwd=database.password,
+        db=database.db_name, charset="utf8mb4", autocommit=False,
+    )
+
+
+def _connect_postgresql(database):
+    import psycopg2
+
+    return psycopg2.connect(
+        host=database.host, port=database.port, user=database.username, password=database.password,
+        dbname=database.db_name,
+    )
+
+
+def _connect_sqlite(database):
+    import sqlite3
+
+    return sqlite3.connect(database.db_name, check_same_thread=False)
+
+
+# db_type -> (连接函数, paramstyle)
+DRIVERS = {
+    "MYSQL": (_connect_mysql, "format"),
+    "POSTGRESQL": (_connect_postgresql, "format"),
+    "SQLITE": (_connect_sqlite, "qmark"),
+}
+
+
+class DatabasePool:
+    """单个 Database 的连接池
+
+    - max_size: 同时借出的连接上限，借不到时等待 DB_POOL_TIMEOUT 秒
+    - 空闲连接超过 DB_POOL_RECYCLE 秒后重建，避免被服务端断开
+    - close() 之后归还的连接直接关闭，不再放回空闲队列
+    """
+
+    def __init__(self, database, max_size=None, timeout=None, recycle=None):
+        if database.db_type not in DRIVERS:
+            raise ValueError(f"不支持的数据库类型: {database.db_type}")
+        self.database = database
+        self.connect, self.paramstyle = DRIVERS[database.db_type]
+        self.timeout = timeout or engine_setting("DB_POOL_TIMEOUT")
+        self.recycle = recycle or engine_setting("DB_POOL_RECYCLE")
+        self._slots = threading.BoundedSemaphore(max_size or engine_setting("DB_POOL_SIZE"))
+        self._idle = queue.LifoQueue()
+        self.created = 0
+        self.reused = 0
+        self.closed = False
+
+    @contextmanager
+    def connection(self):
+        """借出一个连接，正常归还时放回空闲队列，出错时直接关闭"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"数据库 {self.database.name} 连接池已满")
+        conn, ok = None, False
+        try:
+            conn = self._checkout()
+            yield conn
+            ok = True
+        finally:
+            if conn is not None:
+                if ok and not self.closed:
+                    self._idle.put((conn, time.monotonic()))
+                    # 与 close() 并发时刚放回的连接可能错过清理，再清一次
+                    if self.closed:
+                        self._drain()
+                else:
+                    self._close(conn)
+            self._slots.release()
+
+    def _checkout(self):
+        while True:
+            try:
+                conn, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                self.created += 1
+                return self.connect(self.database)
+            if time.monotonic() - idle_since < self.recycle:
+                self.reused += 1
+                return conn
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def execute(self, statements, variables) -> list:
+        """在同一个事务中依次执行多条语句，任一失败整体回滚；返回每条语句的查询结果（非查询为 None）"""
+        results = []
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for statement in statements:
+                    params = statement.params(variables)
+                    if params:
+                        cursor.execute(statement.sql(self.paramstyle), params)
+                    else:
+                        # 无参数时不传 params，避免驱动对原文中的 % 做格式化
+                        cursor.execute(statement.sql(self.paramstyle))
+                    if cursor.description:
+                        columns = [col[0] for col in cursor.description]
+                        results.append([dict(zip(columns, row)) for row in cursor.fetchall()])
+                    else:
+                        results.append(None)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return results
+
+    def close(self):
+        self.closed = True
+        self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+    def metrics(self) -> dict:
+        return {
+            "database": self.database.name,
+            "db_type": self.database.db_type,
+            "idle": self._idle.qsize(),
+            "created": self.created,
+            "reused": self.reused,
+            "closed": self.closed,
+        }
+
+
+class DatabasePoolRegistry:
+    """按 (Database id, updated_at) 复用连接池，配置变更后旧连接池关闭，仍借出的连接归还时关闭"""
+
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get(self, database) -> DatabasePool:
+        with self._lock:
+            current = self._pools.get(database.id)
+            if current is not None and current[0] == database.updated_at:
+                return current[1]
+            pool = DatabasePool(database)
+            self._pools[database.id] = (database.updated_at, pool)
+        if current is not None:
+            current[1].close()
+        return pool
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for _, pool in pools.values():
+            pool.close()
+
+    def metrics(self) -> list:
+        return [pool.metrics() for _, pool in self._pools.values()]
+
+
+db_pools = DatabasePoolRegistry()
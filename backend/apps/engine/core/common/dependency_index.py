@@ -0,0 +1,130 @@
+# core/common/dependency_index.py
+# 依赖反向索引：步骤保存时展开为 (类型, 键) 条目，按接口、端点或变量直接查到受影响的步骤、用例与套件
+import re
+from urllib.parse import urlsplit
+from django.db import transaction
+from django.db.models import Prefetch
+from .plan import build_step_request
+from .template import VAR_PATTERN, compile_template
+from ...models import StepHook, StepIndexEntry, TestCase, TestStep
+
+_PARAM_SEGMENT = re.compile(r"^(\{[^}]*\}|:\w+|\$\{[^}]+\})$")
+PLACEHOLDER = "{}"
+
+
+def endpoint_pattern(url: str) -> str:
+    """只保留路径，{id} / :id / ${var} 形式的段统一为 {}，用于按端点匹配
+
+    ${host}/users 这类以变量开头的地址先去掉开头的变量。
+    """
+    url = url or ""
+    if url.startswith("${"):
+        url = VAR_PATTERN.sub("", url, count=1)
+    path = urlsplit(url).path if "://" in url else url.split("?", 1)[0]
+    segments = [PLACEHOLDER if _PARAM_SEGMENT.match(segment) else segment for segment in path.split("/") if segment]
+    return "/" + "/".join(segments)
+
+
+def endpoint_key(method: str, url: str) -> str:
+    return f"{(method or 'GET').upper()} {endpoint_pattern(url)}"
+
+
+def step_entries(step) -> list:
+    """步骤对应的索引条目 [(类型, 键)]；接口覆盖与 raw_request_config 覆盖按合并后的请求计算"""
+    request = build_step_request(step)
+    entries = []
+    if step.api_interface_id:
+        entries.append(("INTERFACE", str(step.api_interface_id)))
+    if request.get("url"):
+        entries.append(("ENDPOINT", endpoint_key(request.get("method"), request["url"])))
+    for item in step.extractors or ():
+        if item.get("key"):
+            entries.append(("PRODUCES", item["key"]))
+    scripts = [hook.hook_template.script for hook in step.hook_scripts.all() if hook.hook_template_id]
+    reads = compile_template([
+        request,
+        [validator.get("expected") for validator in step.validators or ()],
+        step.setup_hooks,
+        step.teardown_hooks,
+        scripts,
+    ]).names
+    entries.extend(("CONSUMES", name) for name in sorted(reads))
+    return list(dict.fromkeys(entries))
+
+
+def _steps(queryset):
+    hooks = StepHook.objects.filter(enable=True, is_active=True).select_related("hook_template")
+    return queryset.select_related("api_interface", "testcase").prefetch_related(
+        Prefetch("hook_scripts", queryset=hooks)
+    )
+
+
+def index_steps(queryset) -> int:
+    """重建一批步骤的索引条目，返回写入的条目数；停用的步骤只删除不写入"""
+    steps = list(_steps(queryset))
+    rows = [
+        StepIndexEntry(step_id=step.id, testcase_id=step.testcase_id, suite_id=step.testcase.suite_id, kind=kind, key=key)
+        for step in steps
+        if step.is_active
+        for kind, key in step_entries(step)
+    ]
+    with transaction.atomic():
+        StepIndexEntry.objects.filter(step_id__in=[step.id for step in steps]).delete()
+        StepIndexEntry.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild() -> int:
+    """全量重建，用于初始化或批量 update 绕过信号之后"""
+    with transaction.atomic():
+        StepIndexEntry.objects.all().delete()
+        return index_steps(TestStep.objects.all())
+
+
+def move_case(case: TestCase):
+    """用例换了套件时同步冗余的 suite_id"""
+    StepIndexEntry.objects.filter(testcase_id=case.id).exclude(suite_id=case.suite_id).update(suite_id=case.suite_id)
+
+
+def _impact(entries) -> dict:
+    rows = list(entries.values_list("step_id", "testcase_id", "suite_id").distinct())
+    return {
+        "steps": sorted({step_id for step_id, _, _ in rows}),
+        "cases": sorted({case_id for _, case_id, _ in rows}),
+        "suites": sorted({suite_id for _, _, suite_id in rows}),
+    }
+
+
+def interface_impact(interface_id: int) -> dict:
+    return _impact(StepIndexEntry.objects.filter(kind="INTERFACE", key=str(interface_id)))
+
+
+def _pattern_matches(pattern: str, candidate: str) -> bool:
+    left, right = pattern.split("/"), candidate.split("/")
+    return len(left) == len(right) and all(
+        a == b or PLACEHOLDER in (a, b) for a, b in zip(left, right)
+    )
+
+
+def endpoint_impact(method: str, url: str) -> dict:
+    """method 为空或 * 时匹配所有方法；路径中的 {} 段与任意值匹配，/users/42 能命中 /users/{id}"""
+    pattern = endpoint_pattern(url)
+    entries = StepIndexEntry.objects.filter(kind="ENDPOINT")
+    if method and method != "*":
+        entries = entries.filter(key__startswith=f"{method.upper()} ")
+    keys = {
+        key for key in entries.values_list("key", flat=True).distinct()
+        if _pattern_matches(pattern, key.split(" ", 1)[1])
+    }
+    return _impact(StepIndexEntry.objects.filter(kind="ENDPOINT", key__in=keys))
+
+
+def variable_usage(name: str) -> dict:
+    """产出与引用某个变量的步骤"""
+    rows = StepIndexEntry.objects.filter(kind__in=("PRODUCES", "CONSUMES"), key=name).values_list(
+        "kind", "step_id", "testcase_id"
+    )
+    usage = {"producers": [], "consumers": []}
+    for kind, step_id, case_id in rows:
+        usage["producers" if kind == "PRODUCES" else "consumers"].append({"step_id": step_id, "case_id": case_id})
+    return usage
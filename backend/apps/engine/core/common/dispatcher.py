@@ -1,21 +1,53 @@
 # 调度器（同步/异步统一入口）
-import asyncio
-from .core.base.runner import APIRunner, AsyncAPIRunner
+from .executor import JobExecutor, case_finished
+from .variables import ScopeRegistry
+from ..graphql.runner import GraphQLRunner, is_graphql
+from ..http.recorder import get_recorder
+from ..http.runner import HTTPRunner
+from ..http.throttle import ThrottleRegistry
+
 
 class EngineDispatcher:
-    def __init__(self, is_async=False):
+    def __init__(self, is_async=False, max_concurrency=None, per_host_limit=None, on_result=None, record=None,
+                 throttles=None, events=None):
         self.is_async = is_async
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.on_result = on_result
+        self.recorder = get_recorder(record)
+        self.throttles = throttles or ThrottleRegistry(per_host_limit)
+        self.events = events
 
     def run(self, case_data, **kwargs):
         if self.is_async:
-            return asyncio.run(self.run_async(case_data, **kwargs))
+            return self.run_concurrent(case_data, **kwargs)
         else:
             return self.run_sync(case_data, **kwargs)
 
     def run_sync(self, case_data, **kwargs):
-        runner = APIRunner()
-        return runner.run_cases(case_data, **kwargs)
+        """串行执行，case_data 为 CasePlan 列表；参数化用例的各行仍并发执行"""
+        runner = HTTPRunner(recorder=self.recorder, events=self.events)
+        graphql_runner = GraphQLRunner(recorder=self.recorder, events=self.events)
+        scopes = ScopeRegistry()
+        results = []
+        for case in case_data:
+            if case.rows:
+                result = JobExecutor(
+                    self.max_concurrency, self.per_host_limit, recorder=self.recorder, throttles=self.throttles,
+                    events=self.events,
+                ).run([case])[0]
+            else:
+                result = (graphql_runner if is_graphql(case) else runner).run_sync(case, scopes.case_context(case))
+                result["content_hash"] = case.content_hash
+                case_finished(self.events, result)
+            if self.on_result:
+                self.on_result(result)
+            results.append(result)
+        return results
 
-    async def run_async(self, case_data, **kwargs):
-        runner = AsyncAPIRunner()
-        return await runner.run_cases(case_data, **kwargs)
\ No newline at end of file
+    def run_concurrent(self, case_data, **kwargs):
+        """并发执行（同步调用，内部启动事件循环），受全局并发与单主机请求并发限制"""
+        executor = JobExecutor(
+            self.max_concurrency, self.per_host_limit, self.on_result, self.recorder, self.throttles, self.events
+        )
+        return executor.run(case_data)
@@ -0,0 +1,196 @@
+# core/common/distributed.py
+# 分布式执行：将任务的用例分片到多个 Celery worker，结果经结果流回传，由协调者合并为一份报告
+import itertools
+import logging
+import threading
+import time
+import uuid
+from django.utils import timezone
+from .config import engine_setting
+from .dispatcher import EngineDispatcher
+from .plan import PlanCompiler
+from .report import ReportWriter, persist_response_files
+from .runner import JobRunner, summarize
+from .sharding import estimate_durations, plan_lpt
+from .stream import get_result_stream, stream_key
+from ..events.bus import get_publisher
+from ...models import CeleryTaskRecord, TestCase, TestJob, TestReport
+
+logger = logging.getLogger(__name__)
+
+
+def split_round_robin(items: list, shards: int) -> list:
+    """按顺序轮流分配到各分片，丢弃空分片"""
+    buckets = [[] for _ in range(max(shards, 1))]
+    for bucket, item in zip(itertools.cycle(buckets), items):
+        bucket.append(item)
+    return [bucket for bucket in buckets if bucket]
+
+
+def _heartbeat(stream, shard: int, stop: threading.Event):
+    """分片执行期间定期写入心跳，协调者据此发现未发出 done 就退出的分片"""
+    interval = engine_setting("SHARD_HEARTBEAT_INTERVAL")
+    while True:
+        try:
+            stream.publish({"type": "heartbeat", "shard": shard})
+        except Exception as e:
+            logger.warning(f"分片 {shard} 发送心跳失败: {str(e)}")
+        if stop.wait(interval):
+            return
+
+
+def run_shard(job_id: int, report_id: int, shard: int, case_ids: list, key: str):
+    """执行一个分片：编译分片内的用例，每个用例结束后写入结果流，最后写入带分片耗时的 done 消息"""
+    started = time.perf_counter()
+    stream = get_result_stream(key)
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat, args=(stream, shard, stop), name=f"shard-{shard}-heartbeat", daemon=True,
+    )
+    heartbeat.start()
+
+    def publish(result: dict):
+        # 大响应体在 worker 本地落盘，先转存到共享存储再回传
+        persist_response_files([(report_id, result)])
+        stream.publish({"type": "case", "shard": shard, "result": result})
+
+    try:
+        job = TestJob.objects.select_related("environment").get(id=job_id)
+        cases = PlanCompiler(job.environment).compile_cases(TestCase.objects.filter(id__in=case_ids))
+        EngineDispatcher(is_async=job.parallel, on_result=publish, events=get_publisher("job", job_id)).run(cases)
+    except Exception as e:
+        logger.error(f"执行任务 {job_id} 分片 {shard} 时发生错误: {str(e)}")
+        stream.publish({"type": "done", "shard": shard, "elapsed": time.perf_counter() - started, "error": str(e)})
+        raise
+    finally:
+        stop.set()
+        heartbeat.join()
+    stream.publish({"type": "done", "shard": shard, "elapsed": time.perf_counter() - started})
+
+
+class DistributedJobRunner(JobRunner):
+    """分布式执行 TestJob
+
+    - shards: 分片数，默认 SHARD_COUNT
+    - 按历史耗时 LPT 装箱分片，汇总中记录预估与实际的 makespan（最慢分片耗时）
+    - 协调者在当前进程内消费结果流，用例结果交给 ReportWriter 批量落库，
+      每隔 PROGRESS_INTERVAL 秒把阶段汇总写回 TestJob.result_summary
+    - 分片投递到 SHARD_QUEUE，与协调者所在的默认队列分开，协调者阻塞等待时不会占住分片所需的 worker
+    - 已开始的分片超过 SHARD_HEARTBEAT_TIMEOUT 没有任何消息时视为异常退出，不再等待到 SHARD_TIMEOUT
+    """
+
+    def __init__(self, job: TestJob, shards=None, smart=False):
+        super().__init__(job, smart=smart)
+        self.shards = shards or engine_setting("SHARD_COUNT")
+        self.shard_errors = []
+        self.expected = 0
+        self.missing = 0
+        self.planned_loads = []
+        self.shard_elapsed = {}
+
+    def plan_shards(self, case_ids: list) -> list:
+        planned = plan_lpt(estimate_durations(case_ids), self.shards)
+        self.planned_loads = [load for _, load in planned]
+        return [bucket for bucket, _ in planned]
+
+    def execute(self, report: TestReport, writer: ReportWriter) -> list:
+        carried = []
+        if self.smart:
+            # 协调者编译一次执行计划计算内容哈希，只把需要执行的用例分片
+            cases, carried = self.carry_forward(PlanCompiler().compile_job(self.job).cases, report, writer)
+            case_ids = [case.id for case in cases]
+        else:
+            case_ids = list(PlanCompiler().job_cases(self.job).values_list("id", flat=True))
+        self.expected = len(case_ids)
+        shards = self.plan_shards(case_ids)
+        key = stream_key(self.job.id, report.id)
+        stream = get_result_stream(key)
+        try:
+            records = self._dispatch(report, shards, key)
+            results = self._collect(stream, report, writer, len(shards))
+        finally:
+            stream.delete()
+        # 分片异常退出时未回传的用例计为失败
+        self.missing = self.expected - len(results)
+        self._finish_records(records)
+        return carried + results
+
+    def summarize(self, results: list) -> dict:
+        summary = summarize(results)
+        if self.missing:
+            summary["missing"] = self.missing
+            summary["failed"] += self.missing
+        if self.shard_errors:
+            summary["shard_errors"] = self.shard_errors
+        if self.planned_loads:
+            actual = [self.shard_elapsed.get(index) for index in range(len(self.planned_loads))]
+            finished = [elapsed for elapsed in actual if elapsed is not None]
+            summary["sharding"] = {
+                "planner": "lpt",
+                "planned": self.planned_loads,
+                "actual": actual,
+                "planned_makespan": max(self.planned_loads),
+                "actual_makespan": max(finished) if finished else None,
+            }
+        return summary
+
+    def _dispatch(self, report: TestReport, shards: list, key: str) -> dict:
+        """先建任务记录再投递，eager 模式下任务同步执行时也能找到记录"""
+        from ...tasks import run_job_shard
+
+        records = {}
+        for index, case_ids in enumerate(shards):
+            task_id = uuid.uuid4().hex
+            records[index] = CeleryTaskRecord.objects.create(
+                job=self.job, task_id=task_id, status="PENDING", result={"shard": index, "cases": len(case_ids)}
+            )
+            run_job_shard.apply_async(
+                args=(self.job.id, report.id, index, case_ids, key), task_id=task_id, queue=engine_setting("SHARD_QUEUE"),
+            )
+        return records
+
+    def _collect(self, stream, report: TestReport, writer: ReportWriter, shard_count: int) -> list:
+        """读取结果流直到所有分片结束，超过 SHARD_TIMEOUT 视为失败，心跳中断的分片记为异常退出"""
+        deadline = time.monotonic() + engine_setting("SHARD_TIMEOUT")
+        interval = engine_setting("PROGRESS_INTERVAL")
+        heartbeat_timeout = engine_setting("SHARD_HEARTBEAT_TIMEOUT")
+        block_ms = int(engine_setting("RESULT_STREAM_BLOCK") * 1000)
+        results, done, last_id, last_seen = [], set(), "0", {}
+        next_progress = time.monotonic() + interval
+        while len(done) < shard_count:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"分片执行超时，已完成 {len(done)}/{shard_count} 个分片")
+            messages = stream.read(last_id, block_ms=block_ms)
+            for last_id, message in messages:
+                last_seen[message["shard"]] = time.monotonic()
+                if message["type"] == "case":
+                    result = message["result"]
+                    writer.submit(report.id, result)
+                    results.append({key: result.get(key) for key in ("case_id", "status", "duration", "rows")})
+                elif message["type"] == "done":
+                    done.add(message["shard"])
+                    self.shard_elapsed[message["shard"]] = message.get("elapsed")
+                    if message.get("error"):
+                        self.shard_errors.append({"shard": message["shard"], "error": message["error"]})
+            for shard, seen in last_seen.items():
+                if shard not in done and time.monotonic() - seen > heartbeat_timeout:
+                    logger.error(f"任务 {self.job.id} 分片 {shard} 心跳中断，视为异常退出")
+                    done.add(shard)
+                    self.shard_errors.append({"shard": shard, "error": "心跳中断，分片异常退出"})
+            if messages and time.monotonic() >= next_progress:
+                self._progress(results, len(done), shard_count)
+                next_progress = time.monotonic() + interval
+        return results
+
+    def _progress(self, results: list, shards_done: int, shard_count: int):
+        summary = self.summarize(results)
+        summary.update({"expected": self.expected, "shards_done": shards_done, "shards": shard_count})
+        self.job.result_summary = summary
+        self.job.save(update_fields=["result_summary"])
+
+    def _finish_records(self, records: dict):
+        failed = {item["shard"] for item in self.shard_errors}
+        for index, record in records.items():
+            CeleryTaskRecord.objects.filter(id=record.id, status__in=("PENDING", "RUNNING")).update(
+                status="FAILURE" if index in failed else "SUCCESS", finished_at=timezone.now()
+            )
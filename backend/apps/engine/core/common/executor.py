@@ -0,0 +1,99 @@
+# core/common/executor.py
+# 异步任务执行器：在共享的 AsyncClient 上并发执行任务内的用例
+import asyncio
+import logging
+import time
+from .config import engine_setting
+from .parameters import run_rows
+from .variables import ScopeRegistry
+from ..graphql.runner import GraphQLRunner, is_graphql
+from ..http.client_pool import client_registry
+from ..http.recorder import get_recorder
+from ..http.runner import HTTPRunner
+from ..http.throttle import ThrottleRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def case_finished(events, result: dict):
+    if events is not None:
+        events.emit(
+            "case-finished",
+            case_id=result["case_id"],
+            name=result["name"],
+            status=result["status"],
+            duration=result["duration"],
+            error_message=result["error_message"],
+        )
+
+
+class JobExecutor:
+    """任务执行器
+
+    两级限制：max_concurrency 限制同时执行的用例数；同一 base_url 的请求并发由 throttles 中的 HostThrottle 限制，
+    初始为 per_host_limit，开启 ADAPTIVE_CONCURRENCY 时在 ADAPTIVE_MIN/MAX_CONCURRENCY 之间按 AIMD 调整。
+    用例级不按主机限流，等待主机请求名额的用例仍占用全局名额。
+
+    - max_concurrency: 全局并发上限，串行任务传 1
+    - per_host_limit: 单个 base_url 的请求并发初始上限
+    - on_result: 每个用例结束后回调（在线程中执行，可阻塞以形成背压）
+    - recorder: 录制/回放层，为空时使用 RECORD_MODE 配置
+    - throttles: 按 base_url 的请求限流与自适应并发，为空时每次执行新建
+    - events: 执行事件发布器，步骤开始/结束与用例结束时发布事件
+    """
+
+    def __init__(self, max_concurrency=None, per_host_limit=None, on_result=None, recorder=None, throttles=None,
+                 events=None):
+        self.max_concurrency = max_concurrency or engine_setting("MAX_CONCURRENCY")
+        self.per_host_limit = per_host_limit or engine_setting("PER_HOST_CONCURRENCY")
+        self.on_result = on_result
+        self.recorder = recorder or get_recorder()
+        self.throttles = throttles
+        self.events = events
+
+    def run(self, cases) -> list:
+        """同步入口"""
+        return asyncio.run(self.run_async(cases))
+
+    async def run_async(self, cases) -> list:
+        """并发执行所有用例，结果顺序与传入顺序一致"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        scopes = ScopeRegistry()
+        throttles = self.throttles or ThrottleRegistry(self.per_host_limit)
+        runner = HTTPRunner(is_async=True, recorder=self.recorder, throttles=throttles, events=self.events)
+        graphql_runner = GraphQLRunner(is_async=True, recorder=self.recorder, throttles=throttles, events=self.events)
+        try:
+            tasks = [
+                self._run_case(graphql_runner if is_graphql(case) else runner, case, scopes, semaphore)
+                for case in cases
+            ]
+            return await asyncio.gather(*tasks)
+        finally:
+            await client_registry.aclose_loop()
+
+    async def _run_case(self, runner: HTTPRunner, case, scopes: ScopeRegistry, semaphore) -> dict:
+        async with semaphore:
+            result = await self._execute_case(runner, case, scopes)
+        result["content_hash"] = case.content_hash
+        case_finished(self.events, result)
+        if self.on_result:
+            await asyncio.to_thread(self.on_result, result)
+        return result
+
+    async def _execute_case(self, runner: HTTPRunner, case, scopes: ScopeRegistry) -> dict:
+        started = time.perf_counter()
+        context = scopes.case_context(case)
+        try:
+            if case.rows:
+                return await run_rows(runner, case, context)
+            return await runner.run_async(case, context)
+        except Exception as e:
+            logger.error(f"执行用例 {case.id} 时发生错误: {str(e)}")
+            return {
+                "case_id": case.id,
+                "name": case.name,
+                "status": "ERROR",
+                "duration": time.perf_counter() - started,
+                "steps": [],
+                "error_message": str(e),
+            }
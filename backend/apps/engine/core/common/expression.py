@@ -0,0 +1,58 @@
+# core/common/expression.py
+# JMESPath 表达式编译缓存，进程内共享
+import threading
+from collections import OrderedDict
+import jmespath
+from jmespath.exceptions import JMESPathError
+from .config import engine_setting
+
+
+class ExpressionCache:
+    """有界 LRU，缓存 jmespath.compile 的结果"""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or engine_setting("JMESPATH_CACHE_SIZE")
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, expression: str):
+        with self._lock:
+            parsed = self._cache.get(expression)
+            if parsed is not None:
+                self.hits += 1
+                self._cache.move_to_end(expression)
+                return parsed
+            self.misses += 1
+        parsed = jmespath.compile(expression)
+        with self._lock:
+            self._cache[expression] = parsed
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return parsed
+
+    def search(self, expression: str, data):
+        return self.compile(expression).search(data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._cache), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+
+expression_cache = ExpressionCache()
+
+
+def precompile_step(step):
+    """编译执行计划时预编译步骤内的提取器与断言表达式，表达式错误在发送请求前暴露"""
+    expressions = [item["expression"] for item in step.extractors]
+    expressions += [item["actual"] for item in step.validators]
+    for expression in expressions:
+        try:
+            expression_cache.compile(expression)
+        except JMESPathError as e:
+            raise ValueError(f"步骤 {step.name or step.id} 的表达式无效: {expression}: {e}") from e
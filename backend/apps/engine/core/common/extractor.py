@@ -1,6 +1,6 @@
 # core/common/extractor.py
 import base64
-import jmespath
+from .expression import expression_cache
 
 class Extractor:
     """从响应中提取变量并更新变量上下文"""
@@ -12,14 +12,10 @@ class Extractor:
     def extract(self, response_data):
         for item in self.extractors:
             key = item["key"]
-            expr = item["expression"]
+            value = expression_cache.search(item["expression"], response_data)
 
-            # 如果字段是文件类型，跳过提取
-            if isinstance(response_data, dict) and key in response_data:
-                value = response_data[key]
-                if isinstance(value, bytes):  # 如果是文件二进制数据
-                    value = base64.b64encode(value).decode('utf-8')  # 转为 base64 编码
-                else:
-                    value = jmespath.search(expr, response_data)
+            # 如果字段是文件类型，转为 base64 编码
+            if isinstance(value, bytes):
+                value = base64.b64encode(value).decode('utf-8')
 
-                self.variables.set(key, value)
+            self.variables.set(key, value)
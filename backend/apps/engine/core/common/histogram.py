@@ -0,0 +1,194 @@
+# core/common/histogram.py
+# 耗时直方图：DDSketch 式对数分桶，分位数相对误差不超过 alpha，可按步骤 -> 用例 / 接口 -> 任务逐级合并
+import base64
+import math
+import struct
+from .config import engine_setting
+
+_VERSION = 1
+_MIN_VALUE = 1e-6  # 不超过 1 微秒的耗时计入零桶
+_HEADER = struct.Struct(">Bdddd")  # 版本、alpha、最小值、最大值、总和
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+class LatencyHistogram:
+    """耗时直方图（秒）
+
+    - 值 v 落入下标 ceil(log_gamma(v)) 的桶，gamma = (1 + alpha) / (1 - alpha)
+    - 合并只需按下标累加计数，要求 alpha 相同
+    - encode() 输出 base64 文本：头部 + 零桶计数 + 按下标排序的 (下标增量, 计数) 变长整数
+    """
+
+    __slots__ = ("alpha", "gamma", "_log_gamma", "buckets", "zero", "count", "total", "min", "max")
+
+    def __init__(self, alpha=None):
+        self.alpha = alpha or engine_setting("LATENCY_HISTOGRAM_ALPHA")
+        self.gamma = (1 + self.alpha) / (1 - self.alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float, count: int = 1):
+        if value is None or count <= 0:
+            return
+        value = max(0.0, float(value))
+        if value <= _MIN_VALUE:
+            self.zero += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other is None or not other.count:
+            return self
+        if not self.count and other.alpha != self.alpha:
+            self.__init__(other.alpha)
+        if other.alpha != self.alpha:
+            raise ValueError(f"直方图精度不一致: {self.alpha} != {other.alpha}")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float):
+        """第 q 分位的估计值（最近秩），估计值限制在 [min, max] 之间"""
+        if not self.count:
+            return None
+        rank = max(0, math.ceil(q * self.count) - 1)
+        seen = self.zero
+        if rank < seen:
+            return self.min
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(self.max, max(self.min, estimate))
+        return self.max
+
+    def summary(self) -> dict:
+        """count / mean / p50 / p90 / p99 / max，空直方图返回 {"count": 0}"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p90": round(self.quantile(0.9), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max, 6),
+        }
+
+    def encode(self) -> str:
+        if not self.count:
+            return ""
+        out = bytearray(_HEADER.pack(_VERSION, self.alpha, self.min, self.max, self.total))
+        _write_varint(out, self.zero)
+        _write_varint(out, len(self.buckets))
+        previous = 0
+        for position, index in enumerate(sorted(self.buckets)):
+            # 首个下标可能为负（小于 1 秒），之后的增量均为正
+            _write_varint(out, _zigzag(index) if position == 0 else index - previous)
+            _write_varint(out, self.buckets[index])
+            previous = index
+        return base64.b64encode(bytes(out)).decode("ascii")
+
+    @classmethod
+    def decode(cls, data: str) -> "LatencyHistogram":
+        if not data:
+            return cls()
+        raw = base64.b64decode(data)
+        version, alpha, minimum, maximum, total = _HEADER.unpack_from(raw)
+        if version != _VERSION:
+            raise ValueError(f"不支持的直方图版本: {version}")
+        histogram = cls(alpha)
+        histogram.min, histogram.max, histogram.total = minimum, maximum, total
+        histogram.zero, pos = _read_varint(raw, _HEADER.size)
+        size, pos = _read_varint(raw, pos)
+        index = 0
+        for position in range(size):
+            delta, pos = _read_varint(raw, pos)
+            index = _unzigzag(delta) if position == 0 else index + delta
+            histogram.buckets[index], pos = _read_varint(raw, pos)
+        histogram.count = histogram.zero + sum(histogram.buckets.values())
+        return histogram
+
+
+def merge_encoded(values) -> LatencyHistogram:
+    """合并多个编码后的直方图，空值跳过"""
+    histogram = None
+    for value in values:
+        if not value:
+            continue
+        decoded = LatencyHistogram.decode(value)
+        histogram = decoded if histogram is None else histogram.merge(decoded)
+    return histogram or LatencyHistogram()
+
+
+def step_histogram(step_results) -> LatencyHistogram:
+    """步骤每次尝试的耗时；已带 latency（参数化用例合并了各行）的步骤结果直接解码"""
+    histogram = LatencyHistogram()
+    for step_result in step_results:
+        if step_result.get("latency"):
+            histogram.merge(LatencyHistogram.decode(step_result["latency"]))
+            continue
+        for attempt in step_result.get("attempts") or ():
+            histogram.add(attempt.get("duration"))
+    return histogram
+
+
+class LatencyRollup:
+    """一份报告内的汇总：整体、按接口与按请求阶段，用例结果逐条 add"""
+
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.interfaces = {}
+        self.phases = {}
+
+    def add(self, case_result: dict):
+        for step_result in case_result.get("steps") or ():
+            for phase, value in (step_result.get("timing") or {}).items():
+                self.phases.setdefault(phase, LatencyHistogram()).add(value)
+            histogram = step_histogram([step_result])
+            if not histogram.count:
+                continue
+            self.total.merge(histogram)
+            interface_id = step_result.get("interface_id")
+            if interface_id is not None:
+                self.interfaces.setdefault(interface_id, LatencyHistogram()).merge(histogram)
@@ -0,0 +1,93 @@
+# core/common/incremental.py
+# 增量执行：按用例定义的内容哈希判断是否变更，未变更且上次通过的用例沿用上次结果
+import hashlib
+import json
+from django.db.models import Max
+from ...models import CaseReport
+
+
+def _interface_content(interface):
+    if interface is None:
+        return None
+    return [
+        interface.protocol, interface.method, interface.url, interface.headers, interface.params,
+        interface.body, interface.graphql_query, interface.timeout,
+    ]
+
+
+def _step_content(step) -> list:
+    return [
+        step.order, step.skip, step.retries, step.headers, step.params, step.body, step.graphql_query,
+        step.raw_request_config, step.extractors, step.validators, step.setup_hooks, step.teardown_hooks,
+        _interface_content(step.api_interface),
+        [
+            [hook.position, hook.hook_template.language, hook.hook_template.script]
+            for hook in step.hook_scripts.all()
+        ],
+    ]
+
+
+def case_hash(test_case, steps, environment, global_vars, case_vars, rows, assertions) -> str:
+    """用例定义的内容哈希
+
+    覆盖用例与步骤配置、引用的接口、项目变量与变量集、Hook 模板、参数行、环境、全局变量、
+    被测数据库与自定义断言脚本；只包含影响执行结果的字段，名称、描述等修改不算变更。
+    """
+    database = test_case.database
+    content = [
+        test_case.retries,
+        rows,
+        case_vars,
+        [database.db_type, database.host, database.port, database.db_name, database.username] if database else None,
+        [environment.base_url, environment.verify_ssl, environment.proxy, environment.variables],
+        global_vars,
+        [_step_content(step) for step in steps],
+        sorted((name, script.digest) for name, script in assertions.items()),
+    ]
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def latest_reports(case_ids: list) -> dict:
+    """一次查询取每个用例最近一次的用例报告"""
+    last_ids = (
+        CaseReport.objects.filter(testcase_id__in=case_ids)
+        .values("testcase_id")
+        .annotate(last_id=Max("id"))
+        .values("last_id")
+    )
+    reports = CaseReport.objects.filter(id__in=last_ids).only(
+        "id", "testcase_id", "status", "duration", "content_hash", "carried_from_id", "row_results"
+    )
+    return {report.testcase_id: report for report in reports}
+
+
+def carried_result(case, report) -> dict:
+    """沿用的结果：不含步骤详情，carried_from 指向最初执行的用例报告"""
+    return {
+        "case_id": case.id,
+        "name": case.name,
+        "status": report.status,
+        "duration": report.duration,
+        "steps": [],
+        "error_message": None,
+        "rows": report.row_results,
+        "content_hash": case.content_hash,
+        "carried_from": report.carried_from_id or report.id,
+    }
+
+
+def select_changed(cases) -> tuple:
+    """返回 (需要执行的用例, 沿用的结果)
+
+    上次未通过、没有历史报告或内容哈希与上次通过时不同的用例需要执行。
+    """
+    latest = latest_reports([case.id for case in cases])
+    changed, carried = [], []
+    for case in cases:
+        report = latest.get(case.id)
+        if report is not None and report.status == "PASS" and report.content_hash == case.content_hash:
+            carried.append(carried_result(case, report))
+        else:
+            changed.append(case)
+    return changed, carried
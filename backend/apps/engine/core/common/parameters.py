@@ -0,0 +1,144 @@
+# core/common/parameters.py
+# 参数化执行：为用例挂载参数表，同一份执行计划按行并发执行，结果汇总为紧凑的逐行矩阵
+import asyncio
+import csv
+import io
+import itertools
+import json
+import os
+import time
+from django.core.files.storage import default_storage
+from .config import engine_setting
+from .histogram import step_histogram
+
+
+def expand_matrix(matrix: dict) -> list:
+    """{"currency": ["USD", "GBP"], "region": ["US", "GB"]} 展开为笛卡尔积，标量视为固定值"""
+    names = list(matrix)
+    values = [value if isinstance(value, list) else [value] for value in matrix.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def read_table_file(path: str) -> list:
+    """读取存储中的 CSV / JSONL 参数文件"""
+    with default_storage.open(path, "rb") as f:
+        text = f.read().decode("utf-8-sig")
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if path.lower().endswith(".csv"):
+        return list(csv.DictReader(io.StringIO(text)))
+    raise ValueError(f"不支持的参数文件格式: {path}")
+
+
+def table_rows(config: dict, variable_sets: dict = None) -> list:
+    """按 TestCase.parameters 配置读取参数表
+
+    - rows: 内联行列表
+    - matrix: 各参数取值列表，展开为笛卡尔积
+    - variable_set: VariableSet id，变量中有 rows 列表时按行读取，否则按 matrix 展开
+    - file: 存储中的 CSV / JSONL 文件路径
+    """
+    if not config:
+        return []
+    if "rows" in config:
+        rows = config["rows"]
+    elif "matrix" in config:
+        rows = expand_matrix(config["matrix"])
+    elif "variable_set" in config:
+        variable_set = (variable_sets or {}).get(config["variable_set"])
+        if variable_set is None:
+            raise ValueError(f"参数表引用的变量集 {config['variable_set']} 不存在")
+        variables = variable_set.variables or {}
+        rows = variables["rows"] if isinstance(variables.get("rows"), list) else expand_matrix(variables)
+    elif "file" in config:
+        rows = read_table_file(config["file"])
+    else:
+        raise ValueError("参数表需指定 rows、matrix、variable_set 或 file")
+    if not all(isinstance(row, dict) for row in rows):
+        raise ValueError("参数表的每一行必须是对象")
+    return rows
+
+
+def case_rows(config: dict, execution_count: int = 1, variable_sets: dict = None):
+    """参数表按 execution_count 重复；既无参数表又只执行一次时返回 None，按普通用例执行"""
+    rows = table_rows(config, variable_sets)
+    count = max(execution_count or 1, 1)
+    if not rows:
+        if count == 1:
+            return None
+        rows = [{}]
+    rows = tuple(row for _ in range(count) for row in rows)
+    if len(rows) > engine_setting("PARAM_MAX_ROWS"):
+        raise ValueError(f"参数化执行共 {len(rows)} 行，超过上限 {engine_setting('PARAM_MAX_ROWS')}")
+    return rows
+
+
+def _discard_files(steps: list):
+    for step_result in steps:
+        path = step_result.get("response_file")
+        if path and os.path.exists(path):
+            os.unlink(path)
+
+
+def _row_summary(index: int, row: dict, result: dict) -> dict:
+    failed = next((step for step in result["steps"] if step["status"] not in ("PASS", "SKIP")), None)
+    return {
+        "index": index,
+        "params": row,
+        "status": result["status"],
+        "duration": result["duration"],
+        "failed_step": failed["name"] if failed else None,
+        "error_message": (failed["error_message"] if failed else None) or result.get("error_message"),
+    }
+
+
+def merge_rows(case, rows: tuple, results: list, started: float) -> dict:
+    """汇总为一条用例结果：逐行矩阵 + 首个未通过行（全部通过时取首行）的步骤详情
+
+    保留的步骤详情带上所有行该步骤的耗时直方图（latency），其余行的步骤详情丢弃。
+    """
+    matrix = [_row_summary(index, row, result) for index, (row, result) in enumerate(zip(rows, results))]
+    failed = [item for item in matrix if item["status"] != "PASS"]
+    sample = failed[0]["index"] if failed else 0
+    by_step = {}
+    for result in results:
+        for step_result in result["steps"]:
+            by_step.setdefault(step_result["step_id"], []).append(step_result)
+    for step_result in results[sample]["steps"]:
+        step_result["latency"] = step_histogram(by_step[step_result["step_id"]]).encode()
+    for index, result in enumerate(results):
+        if index != sample:
+            _discard_files(result["steps"])
+    return {
+        "case_id": case.id,
+        "name": case.name,
+        "status": "FAIL" if failed else "PASS",
+        "duration": time.perf_counter() - started,
+        "steps": results[sample]["steps"],
+        "error_message": f"{len(failed)}/{len(rows)} 组参数未通过" if failed else None,
+        "rows": matrix,
+    }
+
+
+async def run_rows(runner, case, context) -> dict:
+    """每行在用例作用域之上 fork 一层参数变量，共享同一份执行计划与连接池"""
+    started = time.perf_counter()
+    limit = asyncio.Semaphore(engine_setting("ROW_CONCURRENCY"))
+
+    async def run_row(row: dict) -> dict:
+        row_started = time.perf_counter()
+        async with limit:
+            try:
+                return await runner.run_async(case, context.fork(row))
+            except Exception as e:
+                return {
+                    "case_id": case.id,
+                    "name": case.name,
+                    "status": "ERROR",
+                    "duration": time.perf_counter() - row_started,
+                    "steps": [],
+                    "error_message": str(e),
+                }
+
+    results = await asyncio.gather(*(run_row(row) for row in case.rows))
+    return merge_rows(case, case.rows, list(results), started)
@@ -0,0 +1,328 @@
+# core/common/plan.py
+# 执行计划编译：按固定次数的查询加载任务所需的全部数据，生成只读计划对象，执行阶段不再访问 ORM
+from types import SimpleNamespace
+from django.db.models import Prefetch
+from .config import engine_setting
+from .dag import build_step_graph
+from .expression import precompile_step
+from .incremental import case_hash
+from .parameters import case_rows
+from .prepost import normalize_hook
+from .retry import RetryPolicy
+from .template import template_cache
+from .validator import CustomAssertionExecutor, builtin_operators
+from .variables import VariableContext
+from ..graphql.document import check_variables, document_cache
+from ..http.client_pool import ClientKey, client_key
+from ..http.runner import join_url
+from ...models import CustomAssertion, GlobalVariable, StepHook, TestCase, TestStep, TestSuite, VariableSet
+
+
+class _Plan:
+    """只读计划对象基类"""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 为只读对象")
+
+    def __repr__(self):
+        return f"<{type(self).__name__} id={getattr(self, 'id', None)}>"
+
+
+class InterfacePlan(_Plan):
+    __slots__ = ("id", "name", "protocol", "method", "url", "timeout", "graphql_query", "updated_at")
+
+
+class StepPlan(_Plan):
+    __slots__ = (
+        "id", "name", "order", "updated_at", "interface", "request", "template",
+        "extractors", "validators", "assertions", "setup_hooks", "teardown_hooks", "retry", "skip", "error",
+    )
+
+
+class DatabasePlan(_Plan):
+    __slots__ = ("id", "name", "db_type", "host", "port", "username", "password", "db_name", "updated_at")
+
+
+class CasePlan(_Plan):
+    __slots__ = (
+        "id", "name", "order", "base_url", "verify_ssl", "proxy", "database", "setup_hooks",
+        "global_vars", "env_vars", "case_vars", "steps", "graph", "retries", "rows", "updated_at", "content_hash",
+    )
+
+
+class JobPlan(_Plan):
+    __slots__ = ("id", "name", "parallel", "environment_id", "cases")
+
+
+def build_step_request(step) -> dict:
+    """合并接口定义与步骤覆盖配置（retry 为重试策略配置，不属于请求）
+
+    GraphQL 步骤：document 为查询文本，body 作为 variables，固定 POST。
+    """
+    interface = step.api_interface
+    request = {
+        "method": (interface.method if interface else None) or "GET",
+        "url": (interface.url if interface else None) or "",
+        "headers": {**(interface.headers if interface else {}), **(step.headers or {})},
+        "params": {**(interface.params if interface else {}), **(step.params or {})},
+        "json": step.body or (interface.body if interface else None) or None,
+        "timeout": interface.timeout if interface else None,
+    }
+    query = step.graphql_query or (interface.graphql_query if interface else None)
+    if query:
+        request.update(method="POST", document=query, variables=request.pop("json") or {})
+    request.update({k: v for k, v in (step.raw_request_config or {}).items() if k != "retry"})
+    return request
+
+
+def build_interface_request(interface, environment=None, document=None, variables=None) -> tuple:
+    """调试单个接口：与执行步骤相同经 build_step_request 组装请求，返回 (请求, 连接池维度)
+
+    document / variables 覆盖接口保存的查询与 body。指定环境时用全局变量与环境变量渲染请求、拼接 base_url，
+    并使用该环境（TLS 校验、代理）的连接池。
+    """
+    step = SimpleNamespace(
+        api_interface=interface, headers=None, params=None, body=None, graphql_query=document, raw_request_config=None,
+    )
+    request = build_step_request(step)
+    if variables is not None and "document" in request:
+        request["variables"] = variables
+    if environment is None:
+        return request, ClientKey()
+    context = VariableContext(PlanCompiler(environment).global_vars, environment.variables or {})
+    request = context.resolve(request)
+    request["url"] = join_url(environment.base_url, request["url"])
+    return request, client_key(environment)
+
+
+def _step_hooks(step, position: str, inline_hooks) -> tuple:
+    """步骤内联 hook + 关联的 Hook 模板，SQL 预编译"""
+    hooks = [normalize_hook(hook) for hook in inline_hooks or ()]
+    for hook in step.hook_scripts.all():
+        if hook.position == position:
+            template = hook.hook_template
+            hooks.append(normalize_hook({"type": position, "language": template.language, "value": template.script}))
+    return tuple(hooks)
+
+
+def hoist_setup_hooks(steps, step_hooks: list) -> tuple:
+    """把用例开头一段步骤的 SQL 前置提升到用例级，在一个事务内批量执行
+
+    按 order 依次检查，遇到以下情况停止提升：前置中含非 SQL 脚本、SQL 引用了步骤提取的变量、
+    之前的步骤带后置操作。返回 (用例级前置, 每个步骤剩余的前置)。
+    提升后第 2 个及之后步骤的前置会先于前面步骤的请求执行，依赖前面请求产生的数据时不能开启，
+    因此默认关闭（DB_HOIST_SETUP）。
+    """
+    if not engine_setting("DB_HOIST_SETUP"):
+        return (), [setup for setup, _ in step_hooks]
+    writes = {item["key"] for step in steps for item in step.extractors or ()}
+    hoisted, remaining, hoisting = [], [], True
+    for setup, teardown in step_hooks:
+        if hoisting and all(hook.get("sql") and not set(hook["sql"].names) & writes for hook in setup):
+            hoisted.extend(setup)
+            setup = ()
+        else:
+            hoisting = False
+        hoisting = hoisting and not teardown
+        remaining.append(setup)
+    return tuple(hoisted), remaining
+
+
+class PlanCompiler:
+    """执行计划编译器
+
+    查询次数与用例、步骤数量无关：全局变量 1 次，用例（连带项目/环境/变量集）1 次，
+    步骤（连带接口）1 次，步骤 Hook（连带模板）1 次，套件树 1 次，参数表引用的变量集 1 次，
+    断言引用的自定义断言 1 次。
+    """
+
+    def __init__(self, environment=None):
+        self.environment = environment
+        self._global_vars = None
+        self._assertions = {}
+
+    @property
+    def global_vars(self) -> dict:
+        if self._global_vars is None:
+            variables = {}
+            for item in GlobalVariable.objects.filter(is_active=True).order_by("id"):
+                variables.update(item.variables or {})
+            self._global_vars = variables
+        return self._global_vars
+
+    def job_cases(self, job):
+        """ALL 模式取套件（含子套件）内的用例，SELECTED 模式取指定用例"""
+        if job.run_mode == "ALL" and job.suite_id:
+            queryset = TestCase.objects.filter(suite_id__in=self._suite_tree(job.suite_id))
+        else:
+            queryset = job.testcases.all()
+        return queryset.filter(skip=False, is_active=True).order_by("order", "id")
+
+    def compile_job(self, job) -> JobPlan:
+        if self.environment is None:
+            self.environment = job.environment
+        return JobPlan(
+            id=job.id,
+            name=job.name,
+            parallel=job.parallel,
+            environment_id=job.environment_id,
+            cases=self.compile_cases(self.job_cases(job)),
+        )
+
+    def compile_case(self, test_case) -> CasePlan:
+        return self.compile_cases(TestCase.objects.filter(id=test_case.id))[0]
+
+    def compile_cases(self, queryset) -> tuple:
+        steps = TestStep.objects.filter(is_active=True).select_related("api_interface").order_by("order", "id")
+        hooks = StepHook.objects.filter(enable=True, is_active=True).select_related("hook_template").order_by("id")
+        queryset = (
+            queryset.filter(is_active=True)
+            .select_related("project", "environment", "variable_set", "database")
+            .prefetch_related(Prefetch("steps", queryset=steps), Prefetch("steps__hook_scripts", queryset=hooks))
+            .order_by("order", "id")
+        )
+        test_cases = list(queryset)
+        refs = {case.parameters["variable_set"] for case in test_cases if "variable_set" in (case.parameters or {})}
+        variable_sets = VariableSet.objects.in_bulk(refs) if refs else {}
+        self._load_assertions(test_cases)
+        return tuple(self._compile_case(test_case, variable_sets) for test_case in test_cases)
+
+    def _load_assertions(self, test_cases: list):
+        """一次取出步骤断言引用的自定义断言，脚本按内容哈希编译"""
+        names = {
+            validator["operator"]
+            for test_case in test_cases
+            for step in test_case.steps.all()
+            for validator in step.validators or ()
+            if validator.get("operator") not in builtin_operators
+        } - set(self._assertions)
+        if names:
+            assertions = CustomAssertion.objects.filter(name__in=names, is_active=True)
+            self._assertions.update(CustomAssertionExecutor(assertions).funcs)
+
+    def _suite_tree(self, suite_id: int) -> set:
+        """同项目下一次取出全部套件，在内存中展开子树"""
+        children = {}
+        for pk, parent_id in TestSuite.objects.filter(project__testsuite=suite_id).values_list("id", "parent_id"):
+            children.setdefault(parent_id, []).append(pk)
+        tree, pending = set(), [suite_id]
+        while pending:
+            pk = pending.pop()
+            if pk not in tree:
+                tree.add(pk)
+                pending.extend(children.get(pk, []))
+        return tree
+
+    def _compile_case(self, test_case, variable_sets=None) -> CasePlan:
+        environment = self.environment or test_case.environment
+        case_vars = {**(test_case.project.variables or {})}
+        if test_case.variable_set:
+            case_vars.update(test_case.variable_set.variables or {})
+        raw_steps = list(test_case.steps.all())
+        step_hooks = [
+            (_step_hooks(step, "SETUP", step.setup_hooks), _step_hooks(step, "TEARDOWN", step.teardown_hooks))
+            for step in raw_steps
+        ]
+        case_setup, setups = hoist_setup_hooks(raw_steps, step_hooks)
+        steps = tuple(
+            self._compile_step(step, test_case.retries, setup, teardown)
+            for step, setup, (_, teardown) in zip(raw_steps, setups, step_hooks)
+        )
+        database = test_case.database
+        rows = case_rows(test_case.parameters, test_case.execution_count, variable_sets)
+        assertions = {name: script for step in steps for name, script in step.assertions.items()}
+        return CasePlan(
+            id=test_case.id,
+            name=test_case.name,
+            order=test_case.order,
+            base_url=environment.base_url,
+            verify_ssl=environment.verify_ssl,
+            proxy=environment.proxy,
+            database=DatabasePlan(
+                id=database.id,
+                name=database.name,
+                db_type=database.db_type,
+                host=database.host,
+                port=database.port,
+                username=database.username,
+                password=database.password,
+                db_name=database.db_name,
+                updated_at=database.updated_at,
+            ) if database else None,
+            setup_hooks=case_setup,
+            global_vars=self.global_vars,
+            env_vars=environment.variables or {},
+            case_vars=case_vars,
+            steps=steps,
+            graph=build_step_graph(steps),
+            retries=test_case.retries,
+            rows=rows,
+            updated_at=test_case.updated_at,
+            content_hash=case_hash(
+                test_case, raw_steps, environment, self.global_vars, case_vars, rows, assertions
+            ),
+        )
+
+    def _compile_step(self, step, case_retries=0, setup_hooks=None, teardown_hooks=None) -> StepPlan:
+        interface = step.api_interface
+        updated_at = max(step.updated_at, interface.updated_at) if interface else step.updated_at
+        request = build_step_request(step)
+        # 配置错误只影响该步骤，执行时记为步骤错误，不中断整个用例或任务的编译
+        error = None
+        if "document" in request:
+            # 语法错误与缺少必填变量在编译阶段暴露，文档进入缓存供发送时使用
+            try:
+                check_variables(document_cache.get(request["document"]), request["variables"])
+            except ValueError as e:
+                error = str(e)
+        elif interface and interface.protocol == "GRAPHQL":
+            error = f"GraphQL 接口 {interface.name} 未配置查询"
+        try:
+            retry = RetryPolicy.from_config(step.retries or case_retries, (step.raw_request_config or {}).get("retry"))
+        except ValueError as e:
+            retry, error = RetryPolicy(), error or f"重试配置无效: {e}"
+        plan = StepPlan(
+            id=step.id,
+            name=step.name,
+            order=step.order,
+            updated_at=updated_at,
+            interface=InterfacePlan(
+                id=interface.id,
+                name=interface.name,
+                protocol=interface.protocol,
+                method=interface.method,
+                url=interface.url,
+                timeout=interface.timeout,
+                graphql_query=interface.graphql_query,
+                updated_at=interface.updated_at,
+            ) if interface else None,
+            request=request,
+            template=template_cache.get((step.id, updated_at), request),
+            extractors=tuple(step.extractors or ()),
+            validators=tuple(step.validators or ()),
+            assertions={
+                item["operator"]: self._assertions[item["operator"]]
+                for item in step.validators or ()
+                if item.get("operator") in self._assertions
+            },
+            setup_hooks=_step_hooks(step, "SETUP", step.setup_hooks) if setup_hooks is None else setup_hooks,
+            teardown_hooks=(
+                _step_hooks(step, "TEARDOWN", step.teardown_hooks) if teardown_hooks is None else teardown_hooks
+            ),
+            retry=retry,
+            skip=step.skip,
+            error=error,
+        )
+        if error is None:
+            try:
+                precompile_step(plan)
+            except ValueError as e:
+                # 计划对象只读，编译阶段与 _Plan.__init__ 一样直接写入
+                object.__setattr__(plan, "error", str(e))
+        return plan
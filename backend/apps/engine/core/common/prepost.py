@@ -1,29 +1,48 @@
 # core/common/prepost.py
-from core.common.db_executor import execute_sql
+from .db_executor import SqlStatement, db_pools
+
+
+def normalize_hook(hook: dict) -> dict:
+    """统一 hook 结构：内联脚本以 SQL: 开头或 language 为 SQL 时预编译为 SqlStatement"""
+    value = hook.get("value") or ""
+    language = (hook.get("language") or "").upper()
+    if value.startswith("SQL:"):
+        value, language = value[4:], "SQL"
+    normalized = {**hook, "language": language or "PYTHON", "value": value}
+    if normalized["language"] == "SQL":
+        normalized["sql"] = SqlStatement(value.strip())
+    return normalized
+
 
 class HookExecutor:
-    """执行前后置操作"""
+    """执行前后置操作
 
-    def __init__(self, hooks, variable_ctx):
-        self.hooks = hooks
+    同一批 SQL hook 从用例数据库的连接池借一个连接，在一个事务内执行，${var} 作为参数绑定。
+    """
+
+    def __init__(self, hooks, variable_ctx, database=None):
+        self.hooks = [hook if "sql" in hook else normalize_hook(hook) for hook in hooks]
         self.variables = variable_ctx
+        self.database = database
 
     def execute_all(self):
         """执行所有前后置操作"""
-        for hook in self.hooks:
-            if hook["type"] == "SETUP":
-                self.execute_setup(hook["value"])
-            elif hook["type"] == "TEARDOWN":
-                self.execute_teardown(hook["value"])
+        statements = [hook["sql"] for hook in self.hooks if hook.get("sql")]
+        if statements:
+            return self._execute(statements)
+        return []
 
     def execute_setup(self, script):
         """执行前置脚本"""
         if script.startswith("SQL:"):
-            sql = script[4:]
-            execute_sql(sql)
+            return self._execute([SqlStatement(script[4:].strip())])
 
     def execute_teardown(self, script):
         """执行后置脚本"""
         if script.startswith("SQL:"):
-            sql = script[4:]
-            execute_sql(sql)
+            return self._execute([SqlStatement(script[4:].strip())])
+
+    def _execute(self, statements):
+        if self.database is None:
+            raise ValueError("用例未配置数据库，无法执行 SQL 前后置")
+        return db_pools.get(self.database).execute(statements, self.variables)
@@ -0,0 +1,285 @@
+# core/common/report.py
+# 报告写入：用例结果先进入队列，由后台线程按批量/时间窗口 bulk_create，写库不占用步骤耗时
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from .config import engine_setting
+from .histogram import LatencyHistogram, LatencyRollup, merge_encoded, step_histogram
+from ...models import CaseReport, InterfaceLatency, StepReport, TestLog, TestReport
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _fill_case_report_pks(case_reports: list):
+    """数据库不支持 bulk_create 回填主键时（如 MySQL），按每行的 write_token 回查主键"""
+    rows = CaseReport.objects.filter(write_token__in=[item.write_token for item in case_reports])
+    pks = dict(rows.values_list("write_token", "id"))
+    for item in case_reports:
+        item.pk = pks[item.write_token]
+
+
+def persist_response_files(items: list) -> list:
+    """将落盘的大响应体转存到 TestLog.response_file，返回 (步骤结果, 临时文件, 存储文件, trace_id) 列表
+
+    事务提交后才删除本地临时文件并回写 trace_id 到步骤结果；事务回滚时调用方用 discard_response_files
+    删除已转存的文件，步骤结果保持原样，可以重新写入。
+    """
+    saved = []
+    logs = []
+    try:
+        for _, result in items:
+            for step_result in result["steps"]:
+                path = step_result.get("response_file")
+                if not path:
+                    continue
+                trace_id = uuid.uuid4().hex
+                with open(path, "rb") as f:
+                    name = default_storage.save(f"response_files/{trace_id}.bin", File(f))
+                saved.append((step_result, path, name, trace_id))
+                logs.append(TestLog(
+                    trace_id=trace_id,
+                    step_id=step_result["step_id"],
+                    content=f"响应体 {step_result['response']['size']} 字节",
+                    response_file=name,
+                ))
+        if logs:
+            TestLog.objects.bulk_create(logs)
+    except Exception:
+        discard_response_files(saved)
+        raise
+    if saved:
+        transaction.on_commit(lambda: _commit_response_files(saved))
+    return saved
+
+
+def _commit_response_files(saved: list):
+    for step_result, path, _, trace_id in saved:
+        step_result["response_file"] = None
+        step_result["trace_id"] = trace_id
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def discard_response_files(saved: list):
+    """删除已转存但未能提交的响应体文件"""
+    for _, _, name, _ in saved:
+        try:
+            default_storage.delete(name)
+        except Exception as e:
+            logger.warning(f"删除响应体文件 {name} 失败: {str(e)}")
+
+
+def bulk_write_case_reports(items: list) -> list:
+    """批量写入用例报告及其步骤报告，items 为 (report_id, case_result) 列表
+
+    大响应体的转存与报告写入在同一事务内，写入失败时不留下孤立的文件与 TestLog。
+    """
+    latencies = [[step_histogram([step_result]) for step_result in result["steps"]] for _, result in items]
+    case_reports = [
+        CaseReport(
+            report_id=report_id,
+            testcase_id=result["case_id"],
+            status=result["status"],
+            duration=result["duration"],
+            extract_result={},
+            error_message=result["error_message"],
+            row_results=result.get("rows", []),
+            content_hash=result.get("content_hash") or "",
+            carried_from_id=result.get("carried_from"),
+            latency=step_histogram(result["steps"]).encode(),
+            write_token=uuid.uuid4().hex,
+        )
+        for report_id, result in items
+    ]
+    saved = []
+    try:
+        with transaction.atomic():
+            saved = persist_response_files(items)
+            _bulk_create_reports(items, case_reports, latencies, {id(step): trace_id for step, _, _, trace_id in saved})
+    except Exception:
+        discard_response_files(saved)
+        raise
+    return case_reports
+
+
+def _bulk_create_reports(items: list, case_reports: list, latencies: list, trace_ids: dict):
+    CaseReport.objects.bulk_create(case_reports)
+    if case_reports and case_reports[0].pk is None:
+        _fill_case_report_pks(case_reports)
+    step_reports = [
+        StepReport(
+            case_report_id=case_report.pk,
+            step_id=step_result["step_id"],
+            status=step_result["status"],
+            duration=step_result["duration"],
+            extract_result=step_result["extract_result"],
+            error_message=step_result["error_message"],
+            trace_id=trace_ids.get(id(step_result), step_result.get("trace_id")),
+            attempts=step_result.get("attempts", []),
+            latency=histogram.encode(),
+            timing=step_result.get("timing"),
+        )
+        for case_report, (_, result), histograms in zip(case_reports, items, latencies)
+        for step_result, histogram in zip(result["steps"], histograms)
+    ]
+    StepReport.objects.bulk_create(step_reports, batch_size=engine_setting("REPORT_BATCH_SIZE"))
+
+
+def save_latency(report_id: int, rollup: LatencyRollup):
+    """写入报告整体与按接口合并的耗时直方图"""
+    TestReport.objects.filter(id=report_id).update(latency=rollup.total.encode())
+    rows = []
+    for interface_id, histogram in rollup.interfaces.items():
+        summary = histogram.summary()
+        rows.append(InterfaceLatency(
+            report_id=report_id,
+            interface_id=interface_id,
+            histogram=histogram.encode(),
+            count=summary["count"],
+            p50=summary["p50"],
+            p90=summary["p90"],
+            p99=summary["p99"],
+            max=summary["max"],
+        ))
+    InterfaceLatency.objects.bulk_create(rows)
+
+
+def _latency_row(item: InterfaceLatency) -> dict:
+    return {"count": item.count, "p50": item.p50, "p90": item.p90, "p99": item.p99, "max": item.max}
+
+
+def report_latency(report: TestReport) -> dict:
+    """报告整体与各接口的耗时分位数"""
+    items = InterfaceLatency.objects.filter(report_id=report.id).select_related("interface").order_by("-p99")
+    return {
+        "report_id": report.id,
+        "total": LatencyHistogram.decode(report.latency).summary(),
+        "interfaces": [
+            {"interface_id": item.interface_id, "name": item.interface.name, **_latency_row(item)} for item in items
+        ],
+    }
+
+
+def interface_latency(interface_id: int, runs: int) -> dict:
+    """接口最近 runs 次执行的逐次分位数，以及合并后的分位数"""
+    items = list(
+        InterfaceLatency.objects.filter(interface_id=interface_id).select_related("report").order_by("-report_id")[:runs]
+    )
+    return {
+        "interface_id": interface_id,
+        "merged": merge_encoded(item.histogram for item in items).summary(),
+        "runs": [
+            {"report_id": item.report_id, "created_at": item.report.created_at, **_latency_row(item)} for item in items
+        ],
+    }
+
+
+class ReportWriter:
+    """后台批量写报告
+
+    - batch_size: 攒够多少条用例结果写一次
+    - flush_interval: 最长多少秒写一次
+    - max_queue: 队列上限，队列满时 submit 阻塞，形成背压
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None, max_queue=None):
+        self.batch_size = batch_size or engine_setting("REPORT_BATCH_SIZE")
+        self.flush_interval = flush_interval or engine_setting("REPORT_FLUSH_INTERVAL")
+        self.queue = queue.Queue(maxsize=max_queue or engine_setting("REPORT_QUEUE_SIZE"))
+        self.written = 0
+        self.errors = []
+        self.rollups = {}
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="report-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, report_id: int, case_result: dict, timeout=None):
+        """提交一条用例结果，队列满时阻塞"""
+        self.queue.put((report_id, case_result), timeout=timeout)
+
+    def close(self):
+        """写完剩余数据并停止后台线程，最后写入各报告的耗时汇总"""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        for report_id, rollup in self.rollups.items():
+            try:
+                save_latency(report_id, rollup)
+            except Exception as e:
+                logger.error(f"写入报告 {report_id} 耗时汇总失败: {str(e)}")
+                self.errors.append(str(e))
+
+    def latency(self, report_id: int):
+        """报告整体的耗时分位数，没有已写入的步骤时返回 None"""
+        rollup = self.rollups.get(report_id)
+        return rollup.total.summary() if rollup and rollup.total.count else None
+
+    def timing(self, report_id: int):
+        """报告内请求各阶段耗时的分位数，没有分阶段耗时时返回 None"""
+        rollup = self.rollups.get(report_id)
+        if not rollup or not rollup.phases:
+            return None
+        return {phase: histogram.summary() for phase, histogram in rollup.phases.items()}
+
+    def _loop(self):
+        batch = []
+        deadline = None
+        try:
+            while True:
+                timeout = max(0, deadline - time.monotonic()) if batch else None
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    break
+                if item is not None:
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_interval
+                    batch.append(item)
+                if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                    self._flush(batch)
+                    batch = []
+            if batch:
+                self._flush(batch)
+        finally:
+            # 后台线程持有独立的数据库连接，退出时释放
+            connection.close()
+
+    def _flush(self, batch: list):
+        try:
+            bulk_write_case_reports(batch)
+        except Exception as e:
+            if len(batch) > 1:
+                # 整批失败时逐条重写，只丢弃本身写不进去的用例结果
+                logger.warning(f"批量写入报告失败，改为逐条写入: {str(e)}")
+                for item in batch:
+                    self._flush([item])
+                return
+            logger.error(f"写入用例 {batch[0][1]['case_id']} 的报告失败: {str(e)}")
+            self.errors.append(str(e))
+            return
+        self.written += len(batch)
+        for report_id, result in batch:
+            self.rollups.setdefault(report_id, LatencyRollup()).add(result)
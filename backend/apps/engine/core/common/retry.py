@@ -0,0 +1,118 @@
+# core/common/retry.py
+# 重试策略：指数退避 + 抖动、按规则重试、幂等 GET 的对冲请求，以及用例级时间预算
+import math
+import random
+import time
+import httpx
+from .config import engine_setting
+
+
+class RetryPolicy:
+    """步骤重试策略
+
+    - retries: 最大重试次数（不含首次）
+    - backoff_base / backoff_max: 指数退避基数与上限（秒），采用 full jitter
+    - retry_on_status: 状态码命中时重试，与断言结果无关
+    - retry_on_connection: 连接错误、超时时重试
+    - retry_on_assertion: 断言失败时重试
+    - hedge_delay: 幂等 GET 超过该时长未返回时发出对冲请求，None 表示关闭
+    """
+
+    __slots__ = (
+        "retries", "backoff_base", "backoff_max", "retry_on_status",
+        "retry_on_connection", "retry_on_assertion", "hedge_delay",
+    )
+
+    def __init__(self, retries=0, backoff_base=None, backoff_max=None, retry_on_status=None,
+                 retry_on_connection=True, retry_on_assertion=None, hedge_delay=None):
+        self.retries = retries
+        self.backoff_base = engine_setting("RETRY_BACKOFF_BASE") if backoff_base is None else backoff_base
+        self.backoff_max = engine_setting("RETRY_BACKOFF_MAX") if backoff_max is None else backoff_max
+        self.retry_on_status = frozenset(
+            engine_setting("RETRY_ON_STATUS") if retry_on_status is None else retry_on_status
+        )
+        self.retry_on_connection = retry_on_connection
+        self.retry_on_assertion = (
+            engine_setting("RETRY_ON_ASSERTION") if retry_on_assertion is None else retry_on_assertion
+        )
+        self.hedge_delay = engine_setting("HEDGE_DELAY") if hedge_delay is None else hedge_delay
+
+    @classmethod
+    def from_config(cls, retries: int, config: dict = None) -> "RetryPolicy":
+        """步骤 raw_request_config.retry 可覆盖默认策略，配置无效时抛出 ValueError"""
+        if config is not None and not isinstance(config, dict):
+            raise ValueError("retry 应为对象")
+        # null 与未配置相同，使用默认值
+        config = {key: value for key, value in (config or {}).items() if value is not None}
+        config.setdefault("retries", retries)
+        unknown = set(config) - set(cls.__slots__)
+        if unknown:
+            raise ValueError(f"未知的重试配置项: {', '.join(sorted(unknown))}")
+        _check_number(config, "retries", integer=True)
+        _check_number(config, "backoff_base")
+        _check_number(config, "backoff_max")
+        _check_number(config, "hedge_delay")
+        for name in ("retry_on_connection", "retry_on_assertion"):
+            if config.get(name) is not None and not isinstance(config[name], bool):
+                raise ValueError(f"{name} 应为布尔值")
+        statuses = config.get("retry_on_status")
+        if statuses is not None and (
+            not isinstance(statuses, (list, tuple)) or not all(_is_int(code) for code in statuses)
+        ):
+            raise ValueError("retry_on_status 应为状态码列表")
+        return cls(**config)
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（attempt 从 0 开始）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def should_retry(self, result: dict, error: Exception = None) -> bool:
+        if error is not None:
+            return self.retry_on_connection and isinstance(error, httpx.TransportError)
+        # 状态码与断言分开判断：断言期望的是重试状态码时同样重试
+        response = result.get("response") or {}
+        if response.get("status_code") in self.retry_on_status:
+            return True
+        return result["status"] == "FAIL" and self.retry_on_assertion
+
+    def can_hedge(self, request: dict) -> bool:
+        return self.hedge_delay is not None and request["method"].upper() == "GET"
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_number(config: dict, name: str, integer=False):
+    """None 表示使用默认值，其余须为非负数"""
+    value = config.get(name)
+    if value is None:
+        return
+    valid = _is_int(value) if integer else _is_int(value) or isinstance(value, float)
+    if not valid or value < 0:
+        raise ValueError(f"{name} 应为非负{'整数' if integer else '数'}")
+
+
+class Deadline:
+    """用例级时间预算，重试与退避等待都计入预算"""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, budget=None):
+        self.expires_at = time.monotonic() + budget if budget else None
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, timeout=None):
+        """请求超时不超过剩余预算"""
+        remaining = self.remaining()
+        if timeout is None:
+            return None if remaining == math.inf else remaining
+        return min(timeout, remaining)
@@ -0,0 +1,168 @@
+# core/common/runner.py
+# 任务执行入口：编译执行计划 -> 调度执行 -> 写入报告 -> 更新任务状态
+import logging
+import threading
+import time
+from django.utils import timezone
+from .config import engine_setting
+from .dispatcher import EngineDispatcher
+from .incremental import select_changed
+from .plan import PlanCompiler
+from .report import ReportWriter
+from ..events.bus import get_publisher
+from ..http.throttle import ThrottleRegistry
+from ...models import TestJob, TestReport
+
+logger = logging.getLogger(__name__)
+
+
+def summarize(results: list) -> dict:
+    """汇总用例执行结果，沿用的结果计入通过数但不计入耗时"""
+    total = len(results)
+    passed = sum(1 for result in results if result["status"] == "PASS")
+    summary = {
+        "total": total,
+        "passed": passed,
+        "failed": total - passed,
+        "duration": sum(result["duration"] for result in results if not result.get("carried_from")),
+    }
+    carried = sum(1 for result in results if result.get("carried_from"))
+    if carried:
+        summary["carried"] = carried
+    rows = [row for result in results for row in result.get("rows") or []]
+    if rows:
+        summary["rows"] = len(rows)
+        summary["rows_failed"] = sum(1 for row in rows if row["status"] != "PASS")
+    return summary
+
+
+class JobProgress:
+    """执行过程中每 PROGRESS_INTERVAL 秒把阶段汇总与各 base_url 的限流状态写回 job.result_summary，
+    并发布 progress 事件
+
+    on_result 回调可能在多个线程中执行，只用 update 写入 result_summary，不覆盖任务状态。
+    """
+
+    def __init__(self, job: TestJob, expected: int, throttles: ThrottleRegistry, results=None, events=None):
+        self.job = job
+        self.expected = expected
+        self.throttles = throttles
+        self.events = events
+        self.results = [self._brief(result) for result in results or ()]
+        self.interval = engine_setting("PROGRESS_INTERVAL")
+        self._next = time.monotonic() + self.interval
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _brief(result: dict) -> dict:
+        return {key: result.get(key) for key in ("case_id", "status", "duration", "rows", "carried_from")}
+
+    def update(self, result: dict):
+        with self._lock:
+            self.results.append(self._brief(result))
+            if time.monotonic() < self._next:
+                return
+            self._next = time.monotonic() + self.interval
+            summary = summarize(self.results)
+        summary["expected"] = self.expected
+        throttle = self.throttles.stats()
+        if throttle:
+            summary["throttle"] = throttle
+        TestJob.objects.filter(id=self.job.id).update(result_summary=summary)
+        if self.events is not None:
+            self.events.emit("progress", job_id=self.job.id, summary=summary)
+
+
+class JobRunner:
+    """执行 TestJob，parallel=True 时并发执行用例，用例结果由 ReportWriter 后台批量落库
+
+    smart=True 时只执行上次未通过或定义有变更的用例，其余沿用上次结果（CaseReport.carried_from）。
+    """
+
+    def __init__(self, job: TestJob, max_concurrency=None, per_host_limit=None, smart=False):
+        self.job = job
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.smart = smart
+        self.throttles = ThrottleRegistry(per_host_limit)
+        self.events = get_publisher("job", job.id)
+
+    def run(self, report: TestReport = None) -> TestReport:
+        """report: 提交执行时预先创建的报告，为空时新建"""
+        job = self.job
+        job.status = "RUNNING"
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+        report = report or TestReport.objects.create(job=job, report_type="SUITE", summary={})
+        self.emit("run-started", job_id=job.id, report_id=report.id)
+        try:
+            with ReportWriter() as writer:
+                results = self.execute(report, writer)
+        except Exception as e:
+            logger.error(f"执行任务 {job.id} 时发生错误: {str(e)}")
+            job.status = "FAILED"
+            job.finished_at = timezone.now()
+            job.result_summary = {"error": str(e)}
+            job.save(update_fields=["status", "finished_at", "result_summary"])
+            self.emit("run-finished", job_id=job.id, report_id=report.id, status="FAILED", error_message=str(e))
+            raise
+
+        # 耗时直方图由 ReportWriter 关闭时按 ID 写入，返回前同步到内存中的报告
+        report.refresh_from_db(fields=["latency"])
+        summary = self.summarize(results)
+        summary["elapsed"] = (timezone.now() - job.started_at).total_seconds()
+        latency = writer.latency(report.id)
+        if latency:
+            summary["latency"] = latency
+        timing = writer.timing(report.id)
+        if timing:
+            summary["timing"] = timing
+        throttle = self.throttles.stats()
+        if throttle:
+            summary["throttle"] = throttle
+        if writer.errors:
+            summary["report_errors"] = writer.errors
+        report.summary = summary
+        report.save(update_fields=["summary"])
+        job.status = "SUCCESS" if summary["failed"] == 0 else "FAILED"
+        job.finished_at = timezone.now()
+        job.result_summary = summary
+        job.save(update_fields=["status", "finished_at", "result_summary"])
+        self.emit("run-finished", job_id=job.id, report_id=report.id, status=job.status, summary=summary)
+        return report
+
+    def emit(self, event_type: str, **fields):
+        if self.events is not None:
+            self.events.emit(event_type, **fields)
+
+    def execute(self, report: TestReport, writer: ReportWriter) -> list:
+        """在当前进程内执行全部用例，返回用例结果列表"""
+        plan = PlanCompiler().compile_job(self.job)
+        cases, carried = self.carry_forward(plan.cases, report, writer)
+        progress = JobProgress(self.job, len(cases) + len(carried), self.throttles, carried, self.events)
+
+        def on_result(result):
+            writer.submit(report.id, result)
+            progress.update(result)
+
+        dispatcher = EngineDispatcher(
+            is_async=self.job.parallel,
+            max_concurrency=self.max_concurrency,
+            per_host_limit=self.per_host_limit,
+            on_result=on_result,
+            throttles=self.throttles,
+            events=self.events,
+        )
+        return carried + dispatcher.run(cases)
+
+    def carry_forward(self, cases, report: TestReport, writer: ReportWriter) -> tuple:
+        """smart 模式下沿用未变更用例的结果并写入报告，返回 (需要执行的用例, 沿用的结果)"""
+        if not self.smart:
+            return list(cases), []
+        cases, carried = select_changed(cases)
+        for result in carried:
+            writer.submit(report.id, result)
+        return cases, carried
+
+    def summarize(self, results: list) -> dict:
+        return summarize(results)
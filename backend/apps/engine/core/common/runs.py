@@ -0,0 +1,225 @@
+# core/common/runs.py
+# 提交执行：接口只建运行记录并投递到执行器，立即返回运行 ID；执行进度、部分结果与取消请求经 TestRun 记录交换
+# 测试任务同样先建报告再投递，web 请求不等待任务（包括分布式执行的协调者）执行
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+from .config import engine_setting
+from .dispatcher import EngineDispatcher
+from .histogram import LatencyRollup
+from .plan import PlanCompiler
+from .report import bulk_write_case_reports, save_latency
+from .distributed import DistributedJobRunner
+from .runner import JobRunner, summarize
+from ..events.bus import get_publisher
+from ...models import TestJob, TestReport, TestRun
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("SUCCESS", "FAILED", "CANCELLED")
+
+
+def idempotency_key(case_id: int, environment_id=None, record=None, key=None) -> str:
+    """客户端给出的幂等键按用例区分；未给出时由用例、环境与录制模式生成，相同参数的重复提交得到相同的键"""
+    parts = [case_id, key] if key else [case_id, environment_id, record or ""]
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def submit_run(test_case, environment=None, record=None, key=None) -> tuple:
+    """创建运行记录并投递，返回 (运行, 是否为重复提交)
+
+    RUN_DEDUP_WINDOW 秒内相同幂等键的提交（已取消的除外）返回最早的那次运行。先插入再按 ID 取最早的一条，
+    并发的重复提交也只会保留一条。
+    """
+    key = idempotency_key(test_case.id, environment.id if environment else None, record, key)
+    run = TestRun.objects.create(
+        testcase=test_case, environment=environment, record=record or "", idempotency_key=key, task_id=uuid.uuid4().hex,
+    )
+    since = timezone.now() - timedelta(seconds=engine_setting("RUN_DEDUP_WINDOW"))
+    first = (
+        TestRun.objects.filter(idempotency_key=key, created_at__gte=since)
+        .exclude(status="CANCELLED")
+        .order_by("id")
+        .first()
+    )
+    if first is not None and first.id != run.id:
+        run.delete()
+        return first, True
+    # 事务提交后再投递，worker 一定能读到运行记录
+    transaction.on_commit(lambda: enqueue_run(run))
+    return run, False
+
+
+# ==== 执行器 ====
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _thread_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(engine_setting("RUN_WORKERS"), thread_name_prefix="case-run")
+    return _pool
+
+
+def _run_in_thread(execute, *args):
+    try:
+        execute(*args)
+    except Exception as e:
+        logger.error(f"后台执行 {execute.__name__}{args} 时发生错误: {str(e)}")
+    finally:
+        # 线程池中的线程各自持有数据库连接，每次执行结束后释放
+        connection.close()
+
+
+def enqueue_run(run: TestRun):
+    """按 RUN_BACKEND 投递：celery 投递到 worker；thread 在当前进程的线程池中执行，进程退出时排队中的运行会丢失"""
+    if engine_setting("RUN_BACKEND") == "thread":
+        _thread_pool().submit(_run_in_thread, execute_run, run.id)
+        return
+    from ...tasks import run_test_case
+
+    run_test_case.apply_async(args=(run.id,), task_id=run.task_id)
+
+
+def submit_job(job: TestJob, distributed=False, shards=None, smart=False) -> TestReport:
+    """预先创建报告并投递任务，立即返回报告；进度见 TestJob.status / result_summary 或订阅 events/job/{job_id}"""
+    report = TestReport.objects.create(job=job, report_type="SUITE", summary={})
+    TestJob.objects.filter(id=job.id).update(status="PENDING")
+    transaction.on_commit(lambda: enqueue_job(job.id, report.id, distributed, shards, smart))
+    return report
+
+
+def enqueue_job(job_id: int, report_id: int, distributed=False, shards=None, smart=False):
+    """与 enqueue_run 相同按 RUN_BACKEND 投递；分布式执行时协调者本身也占用一个 worker"""
+    args = (job_id, report_id, distributed, shards, smart)
+    if engine_setting("RUN_BACKEND") == "thread":
+        _thread_pool().submit(_run_in_thread, execute_job, *args)
+        return
+    from ...tasks import run_test_job
+
+    run_test_job.apply_async(args=args)
+
+
+def execute_job(job_id: int, report_id: int, distributed=False, shards=None, smart=False) -> TestReport:
+    """在 worker 中执行任务，结果写入提交时创建的报告"""
+    job = TestJob.objects.select_related("environment").get(id=job_id)
+    runner = DistributedJobRunner(job, shards, smart) if distributed else JobRunner(job, smart=smart)
+    return runner.run(TestReport.objects.get(id=report_id))
+
+
+class RunProgress:
+    """运行中的进度与取消
+
+    作为 runner 的 events 使用：执行事件原样转发给 run 频道，step-finished 同时记入部分结果。
+    后台线程每 PROGRESS_INTERVAL 秒把部分结果写回 TestRun.partial，写回条件带上 cancel_requested=False，
+    没有更新到记录即说明已请求取消，之后 cancelled 为真，runner 在步骤之间停止。
+    执行器可能在事件循环中调用 emit，这里不直接访问数据库。
+    """
+
+    def __init__(self, run_id: int, events=None):
+        self.run_id = run_id
+        self.events = events
+        self.steps = []
+        self.cancelled = False
+        self.interval = engine_setting("PROGRESS_INTERVAL")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._loop, name="run-progress", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+    def emit(self, event_type: str, **fields):
+        if event_type == "step-finished":
+            with self._lock:
+                self.steps.append(dict(fields))
+        if self.events is not None:
+            self.events.emit(event_type, run_id=self.run_id, **fields)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return list(self.steps)
+
+    def flush(self):
+        updated = TestRun.objects.filter(id=self.run_id, cancel_requested=False).update(partial=self.snapshot())
+        if not updated:
+            self.cancelled = True
+
+    def _loop(self):
+        try:
+            while not self._stop.wait(self.interval) and not self.cancelled:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"写回运行 {self.run_id} 进度失败: {str(e)}")
+        finally:
+            connection.close()
+
+
+def save_case_report(result: dict) -> TestReport:
+    """单用例运行的报告：用例、步骤结果与耗时汇总"""
+    report = TestReport.objects.create(report_type="CASE", summary=summarize([result]))
+    bulk_write_case_reports([(report.id, result)])
+    rollup = LatencyRollup()
+    rollup.add(result)
+    save_latency(report.id, rollup)
+    report.latency = rollup.total.encode()
+    return report
+
+
+def execute_run(run_id: int):
+    """在 worker 中执行一次运行；只领取排队中的运行，已取消或已被领取的直接返回"""
+    if not TestRun.objects.filter(id=run_id, status="PENDING").update(status="RUNNING", started_at=timezone.now()):
+        return
+    run = TestRun.objects.select_related("testcase", "environment").get(id=run_id)
+    progress = RunProgress(run.id, get_publisher("run", run.id))
+    progress.emit("run-started", case_id=run.testcase_id)
+    try:
+        with progress:
+            case = PlanCompiler(run.environment).compile_case(run.testcase)
+            result = EngineDispatcher(record=run.record or None, events=progress).run_sync([case])[0]
+        report = save_case_report(result)
+    except Exception as e:
+        logger.error(f"执行运行 {run_id} 时发生错误: {str(e)}")
+        _finish(run, progress, "FAILED", error_message=str(e))
+        raise
+    # 取消请求在最后一个步骤之后才到达时运行已完整执行，按实际结果记录
+    status = "CANCELLED" if progress.cancelled else "SUCCESS" if result["status"] == "PASS" else "FAILED"
+    _finish(run, progress, status, report=report, summary=report.summary, error_message=result["error_message"])
+
+
+def _finish(run: TestRun, progress: RunProgress, status: str, **fields):
+    TestRun.objects.filter(id=run.id).update(status=status, finished_at=timezone.now(), partial=progress.snapshot(), **fields)
+    report = fields.get("report")
+    progress.emit(
+        "run-finished", case_id=run.testcase_id, status=status, report_id=report.id if report else None,
+        error_message=fields.get("error_message"),
+    )
+
+
+def cancel_run(run_id: int) -> TestRun:
+    """排队中的运行直接取消；执行中的运行记下取消请求，由执行方在下一个步骤前停止"""
+    if TestRun.objects.filter(id=run_id, status="PENDING").update(
+        status="CANCELLED", cancel_requested=True, finished_at=timezone.now()
+    ):
+        publisher = get_publisher("run", run_id)
+        if publisher is not None:
+            publisher.emit("run-finished", run_id=run_id, status="CANCELLED")
+    else:
+        TestRun.objects.filter(id=run_id, status="RUNNING").update(cancel_requested=True)
+    return TestRun.objects.get(id=run_id)
@@ -0,0 +1,48 @@
+# core/common/sharding.py
+# 分片规划：按历史 CaseReport.duration 的指数加权平均估算用例耗时，最长处理时间优先（LPT）装箱
+import heapq
+import statistics
+from .config import engine_setting
+from ...models import CaseReport
+
+
+def ewma(values, alpha: float) -> float:
+    """按时间先后计算指数加权平均，越新的耗时权重越大"""
+    estimate = None
+    for value in values:
+        estimate = value if estimate is None else alpha * value + (1 - alpha) * estimate
+    return estimate
+
+
+def estimate_durations(case_ids: list, alpha=None, window=None) -> dict:
+    """一次查询取最近的用例报告，返回 {case_id: 预估耗时}；没有历史的用例取已知用例的中位数"""
+    alpha = alpha or engine_setting("SHARD_EWMA_ALPHA")
+    window = window or engine_setting("SHARD_HISTORY_WINDOW")
+    history = {}
+    rows = (
+        CaseReport.objects.filter(testcase_id__in=case_ids)
+        .order_by("-id")
+        .values_list("testcase_id", "duration")[: len(case_ids) * window]
+    )
+    for case_id, duration in rows:
+        durations = history.setdefault(case_id, [])
+        if len(durations) < window:
+            durations.append(duration)
+    estimates = {case_id: ewma(reversed(durations), alpha) for case_id, durations in history.items()}
+    default = statistics.median(estimates.values()) if estimates else engine_setting("SHARD_DEFAULT_DURATION")
+    return {case_id: estimates.get(case_id, default) for case_id in case_ids}
+
+
+def plan_lpt(estimates: dict, shards: int) -> list:
+    """按预估耗时从大到小依次放入当前负载最小的分片，返回 [(case_ids, 预估负载)]，丢弃空分片
+
+    耗时相同的用例保持传入顺序，分片内按原顺序执行。
+    """
+    order = {case_id: index for index, case_id in enumerate(estimates)}
+    heap = [(0.0, index, []) for index in range(max(shards, 1))]
+    for case_id in sorted(estimates, key=lambda pk: (-estimates[pk], order[pk])):
+        load, index, bucket = heapq.heappop(heap)
+        bucket.append(case_id)
+        heapq.heappush(heap, (load + estimates[case_id], index, bucket))
+    planned = sorted(heap, key=lambda item: item[1])
+    return [(sorted(bucket, key=order.get), load) for load, _, bucket in planned if bucket]
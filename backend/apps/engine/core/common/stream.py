@@ -0,0 +1,87 @@
+# core/common/stream.py
+# 结果流：分片任务逐条写入用例结果，协调者按顺序读取；生产环境用 Redis Stream，测试与单机调试用内存实现
+import json
+import threading
+from django.conf import settings
+from .config import engine_setting
+
+
+class MemoryResultStream:
+    """进程内结果流，接口与 RedisResultStream 一致，供 Celery eager 模式与测试使用"""
+
+    _streams = {}
+    _lock = threading.Lock()
+
+    def __init__(self, key: str):
+        self.key = key
+        with self._lock:
+            self._entries, self._cond = self._streams.setdefault(key, ([], threading.Condition()))
+
+    def publish(self, message: dict) -> str:
+        # 与 Redis 一致，消息经过 JSON 序列化，避免共享可变对象
+        with self._cond:
+            entry_id = str(len(self._entries) + 1)
+            self._entries.append((entry_id, json.dumps(message, default=str)))
+            self._cond.notify_all()
+        return entry_id
+
+    def read(self, last_id: str = "0", count: int = 100, block_ms: int = None) -> list:
+        """返回 last_id 之后的 (entry_id, message) 列表，block_ms 内无新消息时返回空列表"""
+        start = int(last_id)
+        with self._cond:
+            if len(self._entries) <= start and block_ms:
+                self._cond.wait(block_ms / 1000)
+            entries = self._entries[start:start + count]
+        return [(entry_id, json.loads(data)) for entry_id, data in entries]
+
+    def delete(self):
+        with self._lock:
+            self._streams.pop(self.key, None)
+
+
+class RedisResultStream:
+    """基于 Redis Stream（XADD / XREAD）的结果流"""
+
+    def __init__(self, key: str, client=None):
+        self.key = key
+        self.client = client or self._get_redis_client()
+
+    @staticmethod
+    def _get_redis_client():
+        import redis
+
+        return redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True,
+        )
+
+    def publish(self, message: dict) -> str:
+        fields = {"data": json.dumps(message, default=str)}
+        entry_id = self.client.xadd(self.key, fields, maxlen=engine_setting("RESULT_STREAM_MAXLEN"), approximate=True)
+        self.client.expire(self.key, engine_setting("SHARD_TIMEOUT"))
+        return entry_id
+
+    def read(self, last_id: str = "0", count: int = 100, block_ms: int = None) -> list:
+        response = self.client.xread({self.key: last_id}, count=count, block=block_ms)
+        if not response:
+            return []
+        return [(entry_id, json.loads(fields["data"])) for entry_id, fields in response[0][1]]
+
+    def delete(self):
+        self.client.delete(self.key)
+
+
+_BACKENDS = {"memory": MemoryResultStream, "redis": RedisResultStream}
+
+
+def get_result_stream(key: str):
+    """按 RESULT_STREAM_BACKEND 配置创建结果流"""
+    return _BACKENDS[engine_setting("RESULT_STREAM_BACKEND")](key)
+
+
+def stream_key(job_id: int, report_id: int) -> str:
+    return f"engine:job:{job_id}:report:{report_id}"
+
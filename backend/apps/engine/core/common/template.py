@@ -0,0 +1,107 @@
+# core/common/template.py
+# ${var} 模板预编译：一次解析，渲染时单趟只查找被引用的变量
+import re
+import threading
+from collections import OrderedDict
+
+VAR_PATTERN = re.compile(r"\$\{([^}]+)\}")
+_MISSING = object()
+
+
+class Template:
+    """编译后的模板
+
+    - render(variables): variables 为支持 get 的映射，未定义的变量保留原文
+    - names: 模板引用的全部变量名
+    """
+
+    __slots__ = ("render", "names")
+
+    def __init__(self, render, names):
+        self.render = render
+        self.names = names
+
+
+def _constant(value):
+    return lambda variables: value
+
+
+def _compile_str(text: str, names: set):
+    parts = VAR_PATTERN.split(text)
+    if len(parts) == 1:
+        return _constant(text)
+
+    if len(parts) == 3 and not parts[0] and not parts[2]:
+        # 整串引用 "${id}" 保留变量原始类型
+        name = parts[1]
+        names.add(name)
+
+        def render_ref(variables):
+            value = variables.get(name, _MISSING)
+            return text if value is _MISSING else value
+        return render_ref
+
+    literals = parts[0::2]
+    refs = parts[1::2]
+    names.update(refs)
+    pairs = list(zip(refs, literals[1:]))
+    head = literals[0]
+
+    def render_text(variables):
+        out = [head]
+        for name, literal in pairs:
+            value = variables.get(name, _MISSING)
+            out.append("${" + name + "}" if value is _MISSING else str(value))
+            out.append(literal)
+        return "".join(out)
+    return render_text
+
+
+def _compile(data, names: set):
+    if isinstance(data, str):
+        return _compile_str(data, names)
+    if isinstance(data, dict):
+        items = [(key, _compile(value, names)) for key, value in data.items()]
+        return lambda variables: {key: render(variables) for key, render in items}
+    if isinstance(data, list):
+        renders = [_compile(item, names) for item in data]
+        return lambda variables: [render(variables) for render in renders]
+    return _constant(data)
+
+
+def compile_template(data) -> Template:
+    """编译任意 str/dict/list 结构"""
+    names = set()
+    render = _compile(data, names)
+    return Template(render, frozenset(names))
+
+
+class TemplateCache:
+    """编译结果缓存，key 一般为 (step_id, updated_at)，步骤修改后自然失效"""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, data) -> Template:
+        if key is None:
+            return compile_template(data)
+        with self._lock:
+            template = self._cache.get(key)
+            if template is not None:
+                self._cache.move_to_end(key)
+                return template
+        template = compile_template(data)
+        with self._lock:
+            self._cache[key] = template
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+template_cache = TemplateCache()
@@ -1,7 +1,8 @@
 # 内建 + 自定义断言
 import operator
 import logging
-import jmespath
+from .assertion import AssertionScript
+from .expression import expression_cache
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ class Validator:
 
     def validate(self, response_data):
         for validator in self.validators:
-            actual = jmespath.search(validator["actual"], response_data)
+            actual = expression_cache.search(validator["actual"], response_data)
             expected = self.variables.resolve(validator["expected"])
             op = validator["operator"]
 
@@ -40,28 +41,25 @@ class Validator:
 
 # core/common/validator.py
 class CustomAssertionExecutor:
-    """执行自定义断言"""
+    """执行自定义断言，脚本在创建时按内容哈希编译，执行交给断言进程池"""
 
     def __init__(self, custom_assertions):
-        # 将 CustomAssertion 存储到字典中
-        self.custom_assertions = {assertion.name: assertion.script for assertion in custom_assertions}
+        self.custom_assertions = {}
+        for assertion in custom_assertions:
+            if not self.is_safe_script(assertion.script):
+                raise ValueError(f"不安全的脚本内容: {assertion.name}")
+            self.custom_assertions[assertion.name] = AssertionScript(assertion.name, assertion.script)
+
+    @property
+    def funcs(self) -> dict:
+        """供 Validator 使用的 {断言名: 可调用对象}"""
+        return self.custom_assertions
 
     def execute(self, assertion_name, actual, expected):
-        """动态加载并执行断言"""
+        """执行断言，脚本通过 result 变量返回断言结果"""
         if assertion_name not in self.custom_assertions:
             raise ValueError(f"自定义断言不存在: {assertion_name}")
-
-        # 动态执行脚本
-        script = self.custom_assertions[assertion_name]
-        # 这里可以添加输入验证逻辑
-        if not self.is_safe_script(script):
-            raise ValueError("不安全的脚本内容")
-
-        local_vars = {"actual": actual, "expected": expected}
-        exec(script, {}, local_vars)
-
-        # 如果脚本执行没有抛出异常，表示断言成功
-        return local_vars.get("result", False)
+        return self.custom_assertions[assertion_name](actual, expected)
 
     def is_safe_script(self, script):
         # 这里可以添加安全性检查逻辑
@@ -1,12 +1,33 @@
+from collections import ChainMap
+from .template import Template, compile_template
+
+
 class VariableContext:
-    """管理变量作用域：环境变量 + 用例变量 + 提取变量"""
+    """管理变量作用域：环境变量 + 用例变量 + 提取变量
+
+    各层以 ChainMap 叠加，不复制上层字典；写入（包括提取变量）只落在最顶层，
+    fork() 只新增一层，多个并发用例可共享同一份全局/环境变量。
+    """
 
     def __init__(self, global_vars=None, env_vars=None, case_vars=None, step_vars=None):
-        self.context = {}
-        self.context.update(global_vars or {})
-        self.context.update(env_vars or {})
-        self.context.update(case_vars or {})
-        self.context.update(step_vars or {})
+        layers = [layer for layer in (step_vars, case_vars, env_vars, global_vars) if layer]
+        self.context = ChainMap({}, *layers)
+
+    @classmethod
+    def _from_chain(cls, chain: ChainMap) -> "VariableContext":
+        ctx = cls.__new__(cls)
+        ctx.context = chain
+        return ctx
+
+    def fork(self, variables=None) -> "VariableContext":
+        """派生子作用域，variables 作为只读层压在当前作用域之上"""
+        maps = [variables] if variables else []
+        return self._from_chain(ChainMap({}, *maps, *self.context.maps))
+
+    @property
+    def local(self) -> dict:
+        """当前作用域写入的变量"""
+        return self.context.maps[0]
 
     def set(self, key, value):
         self.context[key] = value
@@ -15,29 +36,33 @@ class VariableContext:
         return self.context.get(key, default)
 
     def merge(self, new_vars: dict):
-        self.context.update(new_vars)
+        self.context.maps[0].update(new_vars)
+
+    def render(self, template: Template):
+        """渲染预编译模板"""
+        return template.render(self.context)
 
     def resolve(self, data):
-        """支持 ${var} 格式变量替换"""
-        if isinstance(data, str):
-            for k, v in self.context.items():
-                data = data.replace(f"${{{k}}}", str(v))
-            return data
-        elif isinstance(data, dict):
-            return {k: self.resolve(v) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self.resolve(i) for i in data]
+        """支持 ${var} 格式变量替换，整串引用保留原始类型"""
+        if isinstance(data, (str, dict, list)):
+            return self.render(compile_template(data))
         return data
 
     def resolve_with_check(self, data):
-        """带检查的变量解析"""
-        if isinstance(data, str):
-            for k, v in self.context.items():
-                if f"${{{k}}}" in data:
-                    data = data.replace(f"${{{k}}}", str(v))
-            return data
-        elif isinstance(data, dict):
-            return {k: self.resolve_with_check(v) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self.resolve_with_check(i) for i in data]
-        return data
+        """带检查的变量解析（未定义的变量保留原文）"""
+        return self.resolve(data)
+
+
+class ScopeRegistry:
+    """按 (全局变量, 环境变量) 复用只读基础作用域，每个用例只 fork 一层"""
+
+    def __init__(self):
+        self._bases = {}
+
+    def case_context(self, case) -> VariableContext:
+        global_vars, env_vars = case.global_vars, case.env_vars
+        key = (id(global_vars), id(env_vars))
+        base = self._bases.get(key)
+        if base is None:
+            base = self._bases[key] = VariableContext(global_vars, env_vars)
+        return base.fork(case.case_vars)
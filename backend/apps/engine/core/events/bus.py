@@ -0,0 +1,319 @@
+# core/events/bus.py
+# 执行事件总线：执行器经后台线程批量发布步骤/用例事件，ASGI 进程内每个频道只订阅一次再分发给所有观察者
+# 生产环境走 Redis pub/sub，测试与单机调试用进程内实现
+import asyncio
+import collections
+import json
+import logging
+import queue
+import threading
+import time
+import weakref
+from django.conf import settings
+from ..common.config import engine_setting
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_EVENTS = ("run-finished",)
+
+
+def event_channel(kind: str, object_id) -> str:
+    """频道名，如 engine:events:job:12；kind 为 job / case / run"""
+    return f"engine:events:{kind}:{object_id}"
+
+
+class MemoryEventBus:
+    """进程内总线：publish 时直接调用该频道的监听回调（每个事件循环的 EventHub 一个）"""
+
+    def __init__(self):
+        self._listeners = {}
+        self._lock = threading.Lock()
+
+    def publish_many(self, items: list):
+        with self._lock:
+            listeners = {channel: list(callbacks) for channel, callbacks in self._listeners.items()}
+        for channel, data in items:
+            for callback in listeners.get(channel, ()):
+                callback(data)
+
+    async def listen(self, channel: str, callback):
+        with self._lock:
+            self._listeners.setdefault(channel, []).append(callback)
+
+    async def unlisten(self, channel: str, callback):
+        with self._lock:
+            callbacks = self._listeners.get(channel, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._listeners.pop(channel, None)
+
+
+class RedisEventBus:
+    """Redis pub/sub 总线
+
+    发布端用同步客户端按批 pipeline PUBLISH；订阅端每个事件循环一个异步 pubsub 连接，
+    频道按需 SUBSCRIBE / UNSUBSCRIBE，由一个读取任务按频道分发。
+    """
+
+    def __init__(self):
+        self._client = None
+        self._subscribers = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def _options() -> dict:
+        return {
+            "host": settings.REDIS_HOST,
+            "port": settings.REDIS_PORT,
+            "db": settings.REDIS_DB,
+            "password": settings.REDIS_PASSWORD,
+            "decode_responses": True,
+        }
+
+    def publish_many(self, items: list):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis(**self._options())
+        pipeline = self._client.pipeline(transaction=False)
+        for channel, data in items:
+            pipeline.publish(channel, data)
+        pipeline.execute()
+
+    def _subscriber(self) -> dict:
+        loop = asyncio.get_running_loop()
+        subscriber = self._subscribers.get(loop)
+        if subscriber is None:
+            import redis.asyncio as aioredis
+
+            pubsub = aioredis.Redis(**self._options()).pubsub()
+            subscriber = self._subscribers[loop] = {"pubsub": pubsub, "callbacks": {}, "reader": None}
+        return subscriber
+
+    async def listen(self, channel: str, callback):
+        subscriber = self._subscriber()
+        subscriber["callbacks"][channel] = callback
+        await subscriber["pubsub"].subscribe(channel)
+        if subscriber["reader"] is None:
+            subscriber["reader"] = asyncio.ensure_future(self._read(subscriber))
+
+    async def unlisten(self, channel: str, callback):
+        subscriber = self._subscriber()
+        subscriber["callbacks"].pop(channel, None)
+        await subscriber["pubsub"].unsubscribe(channel)
+
+    @staticmethod
+    async def _read(subscriber: dict):
+        pubsub, callbacks = subscriber["pubsub"], subscriber["callbacks"]
+        while True:
+            try:
+                if not callbacks:
+                    await asyncio.sleep(0.1)
+                    continue
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception as e:
+                logger.error(f"读取执行事件时出错: {str(e)}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is not None:
+                callback = callbacks.get(message["channel"])
+                if callback is not None:
+                    callback(message["data"])
+
+
+_BACKENDS = {"memory": MemoryEventBus, "redis": RedisEventBus}
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+def get_event_bus():
+    """按 EVENT_BACKEND 配置取进程内唯一的总线"""
+    backend = engine_setting("EVENT_BACKEND")
+    with _buses_lock:
+        if backend not in _buses:
+            _buses[backend] = _BACKENDS[backend]()
+        return _buses[backend]
+
+
+# ==== 发布端 ====
+class _EventWorker:
+    """进程级后台线程：事件先进入有界队列，按批序列化并发布，执行线程不等待网络
+
+    队列满时丢弃新事件并计数，不阻塞执行器。总线不可用（如 Redis 宕机）时按总线指数退避，
+    退避期间的事件直接丢弃，只在首次失败与恢复时各记录一次日志。
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=engine_setting("EVENT_QUEUE_SIZE"))
+        self.dropped = 0
+        self.published = 0
+        self._failures = {}  # 总线 -> (连续失败次数, 下次重试时间)
+        self._thread = threading.Thread(target=self._loop, name="event-publisher", daemon=True)
+        self._thread.start()
+
+    def put(self, bus, channel: str, event: dict):
+        try:
+            self.queue.put_nowait((bus, channel, event))
+        except queue.Full:
+            self.dropped += 1
+
+    def _loop(self):
+        batch_size = engine_setting("EVENT_BATCH_SIZE")
+        while True:
+            items = [self.queue.get()]
+            while len(items) < batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            batches = collections.defaultdict(list)
+            for bus, channel, event in items:
+                batches[bus].append((channel, json.dumps(event, default=str, ensure_ascii=False)))
+            for bus, batch in batches.items():
+                self._publish(bus, batch)
+            for _ in items:
+                self.queue.task_done()
+
+    def _publish(self, bus, batch: list):
+        failures, retry_at = self._failures.get(bus, (0, 0.0))
+        if time.monotonic() < retry_at:
+            self.dropped += len(batch)
+            return
+        try:
+            bus.publish_many(batch)
+        except Exception as e:
+            if not failures:
+                logger.warning(f"发布执行事件失败，退避期间的事件将被丢弃: {str(e)}")
+            delay = min(engine_setting("EVENT_RETRY_MAX"), 2 ** failures)
+            self._failures[bus] = (failures + 1, time.monotonic() + delay)
+            self.dropped += len(batch)
+            return
+        if failures:
+            logger.info(f"执行事件发布已恢复，此前连续失败 {failures} 次")
+            del self._failures[bus]
+        self.published += len(batch)
+
+    def flush(self, timeout=5.0):
+        """等待已入队的事件发布完（测试与进程退出前使用）"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def event_worker() -> _EventWorker:
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = _EventWorker()
+    return _worker
+
+
+class EventPublisher:
+    """绑定一个频道的发布器，emit 只做入队，事件带上毫秒时间戳
+
+    cancelled 供 runner 在步骤之间检查，提交执行的运行由 RunProgress 根据取消请求给出。
+    """
+
+    cancelled = False
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.bus = get_event_bus()
+        self.worker = event_worker()
+
+    def emit(self, event_type: str, **fields):
+        fields["type"] = event_type
+        fields["ts"] = int(time.time() * 1000)
+        self.worker.put(self.bus, self.channel, fields)
+
+
+def get_publisher(kind: str, object_id):
+    """EVENT_STREAM 关闭时返回 None，执行器据此跳过所有事件"""
+    if not engine_setting("EVENT_STREAM"):
+        return None
+    return EventPublisher(event_channel(kind, object_id))
+
+
+# ==== 订阅端 ====
+class Subscription:
+    """单个观察者的有界缓冲区；观察者太慢时丢弃最旧的事件，下一条事件带上 dropped 计数"""
+
+    def __init__(self, hub: "EventHub", channel: str, size: int):
+        self.hub = hub
+        self.channel = channel
+        self.buffer = collections.deque(maxlen=size)
+        self.dropped = 0
+        self._event = asyncio.Event()
+
+    def put(self, data: str):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(data)
+        self._event.set()
+
+    async def get(self, timeout: float = None):
+        """返回 (事件 JSON 文本, 丢弃数)，超时返回 (None, 0)"""
+        if not self.buffer:
+            self._event.clear()
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None, 0
+        dropped, self.dropped = self.dropped, 0
+        return self.buffer.popleft(), dropped
+
+    async def close(self):
+        await self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """ASGI 进程内（每个事件循环一个）的频道分发：首个观察者到来时订阅总线，最后一个离开时退订"""
+
+    def __init__(self, bus=None):
+        self.bus = bus or get_event_bus()
+        self.loop = asyncio.get_running_loop()
+        self._channels = {}
+        self._callbacks = {}
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel, engine_setting("EVENT_SUBSCRIBER_BUFFER"))
+        subscribers = self._channels.get(channel)
+        if subscribers is None:
+            subscribers = self._channels[channel] = set()
+            # 内存总线在发布线程中回调，统一切回事件循环再分发
+            callback = self._callbacks[channel] = lambda data: self.loop.call_soon_threadsafe(self._dispatch, channel, data)
+            await self.bus.listen(channel, callback)
+        subscribers.add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._channels[subscription.channel]
+            await self.bus.unlisten(subscription.channel, self._callbacks.pop(subscription.channel))
+
+    def _dispatch(self, channel: str, data: str):
+        for subscription in self._channels.get(channel, ()):
+            subscription.put(data)
+
+    def stats(self) -> dict:
+        return {channel: len(subscribers) for channel, subscribers in self._channels.items()}
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub() -> EventHub:
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = EventHub()
+    return hub
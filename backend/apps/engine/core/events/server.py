@@ -0,0 +1,132 @@
+# core/events/server.py
+# 执行进度推送：原生 ASGI 应用，SSE 与 WebSocket 共用 {prefix}{kind}/{id} 路径，只读事件总线，不访问数据库
+import asyncio
+import json
+import re
+from ..common.config import engine_setting
+from .bus import TERMINAL_EVENTS, event_channel, get_hub
+
+_PATH = re.compile(r"^/?(job|case|run)/(\w+)/?$")
+_SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+def _frame(data: str, dropped: int) -> tuple:
+    """返回 (事件类型, 发送给观察者的 JSON 文本)；有丢弃时在事件中带上 dropped"""
+    event = json.loads(data)
+    if dropped:
+        event["dropped"] = dropped
+        data = json.dumps(event, ensure_ascii=False)
+    return event.get("type", "message"), data
+
+
+async def _watch_disconnect(receive, disconnect_type: str):
+    while True:
+        message = await receive()
+        if message["type"] == disconnect_type:
+            return
+
+
+async def _pump(subscription, emit, disconnected: asyncio.Future):
+    """把订阅中的事件交给 emit，直到运行结束或观察者断开；空闲时发送心跳"""
+    heartbeat = engine_setting("EVENT_HEARTBEAT")
+    while not disconnected.done():
+        if subscription.buffer:
+            data, dropped = await subscription.get()
+        else:
+            getter = asyncio.ensure_future(subscription.get(heartbeat))
+            await asyncio.wait({getter, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                getter.cancel()
+                return
+            data, dropped = getter.result()
+        if data is None:
+            await emit(None, None)
+            continue
+        event_type, data = _frame(data, dropped)
+        await emit(event_type, data)
+        if event_type in TERMINAL_EVENTS:
+            return
+
+
+class EventGateway:
+    """执行事件推送入口（ASGI）
+
+    - HTTP GET：Server-Sent Events，每条事件为 event: <type> / data: <json>
+    - WebSocket：每条事件为一个文本帧
+    路径为 {prefix}job/{job_id}、{prefix}case/{case_id} 或 {prefix}run/{run_id}，收到 run-finished 后结束。
+    观察者在运行开始后连接只能收到之后的事件，已有结果通过报告接口查询。
+    """
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix.rstrip("/")
+
+    async def __call__(self, scope, receive, send):
+        matched = _PATH.match(scope["path"][len(self.prefix):])
+        if scope["type"] == "websocket":
+            return await self.websocket(matched, receive, send)
+        if scope["type"] != "http":
+            return
+        if matched is None or scope["method"] != "GET":
+            body = json.dumps({"error": "路径应为 job/{id}、case/{id} 或 run/{id}"}, ensure_ascii=False).encode("utf-8")
+            await send({"type": "http.response.start", "status": 404, "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+        await self.sse(event_channel(*matched.groups()), receive, send)
+
+    async def sse(self, channel: str, receive, send):
+        subscription = await get_hub().subscribe(channel)
+        disconnected = asyncio.ensure_future(_watch_disconnect(receive, "http.disconnect"))
+
+        async def emit(event_type, data):
+            chunk = b": ping\n\n" if data is None else f"event: {event_type}\ndata: {data}\n\n".encode("utf-8")
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": _SSE_HEADERS})
+            await emit(None, None)
+            await _pump(subscription, emit, disconnected)
+            if not disconnected.done():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            disconnected.cancel()
+            await subscription.close()
+
+    async def websocket(self, matched, receive, send):
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        if matched is None:
+            await send({"type": "websocket.close", "code": 4404})
+            return
+        subscription = await get_hub().subscribe(event_channel(*matched.groups()))
+        disconnected = asyncio.ensure_future(_watch_disconnect(receive, "websocket.disconnect"))
+
+        async def emit(event_type, data):
+            if data is not None:
+                await send({"type": "websocket.send", "text": data})
+
+        try:
+            await send({"type": "websocket.accept"})
+            await _pump(subscription, emit, disconnected)
+            if not disconnected.done():
+                await send({"type": "websocket.close", "code": 1000})
+        finally:
+            disconnected.cancel()
+            await subscription.close()
+
+
+def mount(application, prefix=None):
+    """挂载到 Django ASGI 应用旁：prefix 下的 HTTP 与 WebSocket 连接由事件推送处理"""
+    prefix = prefix or engine_setting("EVENT_PREFIX")
+    gateway = EventGateway(prefix)
+
+    async def app(scope, receive, send):
+        if scope["type"] in ("http", "websocket") and scope["path"].startswith(prefix):
+            return await gateway(scope, receive, send)
+        return await application(scope, receive, send)
+
+    return app
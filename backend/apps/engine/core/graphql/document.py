@@ -0,0 +1,140 @@
+# core/graphql/document.py
+# GraphQL 文档解析与缓存：每个查询文本只解析校验一次，得到规范化文本与持久化查询哈希
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from ..common.config import engine_setting
+
+try:
+    import graphql as graphql_core
+except ImportError:  # graphql-core 为可选依赖，未安装时使用内置的轻量词法检查
+    graphql_core = None
+
+_TOKEN = re.compile(r'"""(?:[^"\\]|\\.|"(?!""))*"""|"(?:[^"\\\n]|\\.)*"|#[^\n]*|[\w$]+|\.\.\.|\S')
+_VARIABLE_DEF = re.compile(r"\$(\w+)\s*:\s*([\w\[\]!]+)(\s*=)?")
+_PAIRS = {"}": "{", ")": "(", "]": "["}
+
+
+class GraphQLDocument:
+    """解析后的 GraphQL 文档
+
+    - query: 规范化后的查询文本（去注释、压缩空白），发送与计算哈希都使用它
+    - operation_type / operation_name: 首个操作的类型与名称
+    - required: 无默认值的非空变量，编译执行计划时检查步骤是否提供
+    - sha256: 持久化查询（APQ）使用的哈希
+    """
+
+    __slots__ = ("query", "operation_type", "operation_name", "variables", "required", "sha256")
+
+    def __init__(self, query, operation_type, operation_name, variables, required):
+        self.query = query
+        self.operation_type = operation_type
+        self.operation_name = operation_name
+        self.variables = variables
+        self.required = required
+        self.sha256 = hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def _parse_with_core(text: str) -> GraphQLDocument:
+    try:
+        ast = graphql_core.parse(text)
+    except graphql_core.GraphQLError as e:
+        raise ValueError(f"GraphQL 语法错误: {e.message}") from e
+    operations = [item for item in ast.definitions if isinstance(item, graphql_core.OperationDefinitionNode)]
+    if not operations:
+        raise ValueError("GraphQL 文档中没有操作")
+    operation = operations[0]
+    definitions = operation.variable_definitions or ()
+    return GraphQLDocument(
+        query=" ".join(graphql_core.print_ast(ast).split()),
+        operation_type=operation.operation.value,
+        operation_name=operation.name.value if operation.name else None,
+        variables=tuple(item.variable.name.value for item in definitions),
+        required=tuple(
+            item.variable.name.value
+            for item in definitions
+            if isinstance(item.type, graphql_core.NonNullTypeNode) and item.default_value is None
+        ),
+    )
+
+
+def _parse_lexical(text: str) -> GraphQLDocument:
+    """不依赖 graphql-core 的检查：括号配对、操作类型与名称、变量声明"""
+    tokens = [token for token in _TOKEN.findall(text) if not token.startswith("#")]
+    if not tokens:
+        raise ValueError("GraphQL 文档为空")
+    stack = []
+    for token in tokens:
+        if token in "{([":
+            stack.append(token)
+        elif token in _PAIRS:
+            if not stack or stack.pop() != _PAIRS[token]:
+                raise ValueError(f"GraphQL 语法错误: 括号不匹配 {token}")
+    if stack:
+        raise ValueError("GraphQL 语法错误: 括号未闭合")
+    if tokens[0] == "{":
+        operation_type, operation_name = "query", None
+    elif tokens[0] in ("query", "mutation", "subscription"):
+        operation_type = tokens[0]
+        operation_name = tokens[1] if len(tokens) > 1 and (tokens[1][0].isalpha() or tokens[1][0] == "_") else None
+    elif tokens[0] == "fragment":
+        raise ValueError("GraphQL 文档中没有操作")
+    else:
+        raise ValueError(f"GraphQL 语法错误: 无法识别的操作 {tokens[0]}")
+    header = text[: text.find("{")]
+    definitions = _VARIABLE_DEF.findall(header)
+    return GraphQLDocument(
+        query=" ".join(tokens),
+        operation_type=operation_type,
+        operation_name=operation_name,
+        variables=tuple(name for name, _, _ in definitions),
+        required=tuple(name for name, type_name, default in definitions if type_name.endswith("!") and not default),
+    )
+
+
+def parse_document(text: str) -> GraphQLDocument:
+    if graphql_core is not None:
+        return _parse_with_core(text)
+    return _parse_lexical(text)
+
+
+def check_variables(document: GraphQLDocument, variables):
+    """检查必填变量是否都已提供，变量整体为模板表达式时留到运行时由服务端校验"""
+    if not isinstance(variables, dict):
+        return
+    missing = [name for name in document.required if name not in variables]
+    if missing:
+        raise ValueError(f"GraphQL 缺少必填变量: {', '.join(missing)}")
+
+
+class DocumentCache:
+    """有界 LRU，按原始查询文本缓存解析结果"""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or engine_setting("GRAPHQL_DOCUMENT_CACHE_SIZE")
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> GraphQLDocument:
+        with self._lock:
+            document = self._cache.get(text)
+            if document is not None:
+                self.hits += 1
+                self._cache.move_to_end(text)
+                return document
+            self.misses += 1
+        document = parse_document(text)
+        with self._lock:
+            self._cache[text] = document
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return document
+
+    def stats(self) -> dict:
+        return {"size": len(self._cache), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+document_cache = DocumentCache()
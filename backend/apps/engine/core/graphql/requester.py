@@ -0,0 +1,233 @@
+# core/graphql/requester.py
+# GraphQL 请求器：持久化查询（APQ）只发送哈希，相互独立的操作合并为一次批量请求
+import asyncio
+import json
+import threading
+from ..base.requester import BaseRequester
+from ..common.config import engine_setting
+from ..http.requester import AsyncHTTPRequester, HTTPRequester
+from ..http.response import ResponseBody
+from .document import document_cache
+
+
+class EndpointRegistry:
+    """记录服务端能力：不支持持久化查询或批量请求的地址，之后直接退回普通请求"""
+
+    def __init__(self):
+        self._no_persisted = set()
+        self._no_batch = set()
+        self._lock = threading.Lock()
+
+    def persisted(self, url: str) -> bool:
+        return url not in self._no_persisted
+
+    def batchable(self, url: str) -> bool:
+        return url not in self._no_batch
+
+    def disable_persisted(self, url: str):
+        with self._lock:
+            self._no_persisted.add(url)
+
+    def disable_batch(self, url: str):
+        with self._lock:
+            self._no_batch.add(url)
+
+
+endpoints = EndpointRegistry()
+
+
+def use_persisted(request: dict) -> bool:
+    persisted = request.get("persisted")
+    if persisted is None:
+        persisted = engine_setting("GRAPHQL_PERSISTED_QUERIES")
+    return bool(persisted) and endpoints.persisted(request["url"])
+
+
+def build_payload(request: dict, include_query: bool) -> dict:
+    """request["document"] 为查询文本，解析结果取自文档缓存"""
+    document = document_cache.get(request["document"])
+    payload = {
+        "operationName": request.get("operation_name") or document.operation_name,
+        "variables": request.get("variables") or {},
+    }
+    if include_query:
+        payload["query"] = document.query
+    if use_persisted(request):
+        payload["extensions"] = {"persistedQuery": {"version": 1, "sha256Hash": document.sha256}}
+    return payload
+
+
+def batch_key(request: dict) -> str:
+    """同一地址、同样请求头的操作才能合并"""
+    return json.dumps([request["url"], request.get("headers") or {}, request.get("params") or {}], sort_keys=True)
+
+
+def _http_request(request: dict, payload, timeout=None) -> dict:
+    return {
+        "method": "POST",
+        "url": request["url"],
+        "headers": request.get("headers"),
+        "params": request.get("params"),
+        "json": payload,
+        "timeout": timeout if timeout is not None else request.get("timeout"),
+        "stream": False,
+    }
+
+
+def _batch_timeout(requests: list):
+    timeouts = [request.get("timeout") for request in requests]
+    return None if None in timeouts else max(timeouts)
+
+
+def _error_codes(body) -> set:
+    errors = body.get("errors") if isinstance(body, dict) else None
+    codes = set()
+    for error in errors or ():
+        codes.add(error.get("message"))
+        codes.add((error.get("extensions") or {}).get("code"))
+    return codes
+
+
+def persisted_query_missing(response: dict) -> bool:
+    codes = _error_codes(response["body"].parse())
+    return "PersistedQueryNotFound" in codes or "PERSISTED_QUERY_NOT_FOUND" in codes
+
+
+def persisted_query_unsupported(response: dict) -> bool:
+    codes = _error_codes(response["body"].parse())
+    return "PersistedQueryNotSupported" in codes or "PERSISTED_QUERY_NOT_SUPPORTED" in codes
+
+
+def _needs_query(request: dict, response: dict) -> bool:
+    """哈希未注册或服务端不支持持久化查询时，需要带上查询文本重发"""
+    if persisted_query_unsupported(response):
+        endpoints.disable_persisted(request["url"])
+        return True
+    return persisted_query_missing(response)
+
+
+def _missing_queries(requests: list, payloads: list, responses: list) -> list:
+    return [
+        index for index, response in enumerate(responses)
+        if "query" not in payloads[index] and _needs_query(requests[index], response)
+    ]
+
+
+def split_batch(response: dict, count: int):
+    """把批量响应拆成每个操作各自的响应，服务端不支持批量（未返回等长数组）时返回 None"""
+    body = response["body"]
+    items = body.parse()
+    body.discard()
+    if not isinstance(items, list) or len(items) != count:
+        return None
+    return [
+        {"status_code": response["status_code"], "headers": response["headers"], "body": ResponseBody.of(item)}
+        for item in items
+    ]
+
+
+class GraphQLRequester(BaseRequester):
+    """同步 GraphQL 请求器，非 GraphQL 请求交给 HTTPRequester"""
+
+    def __init__(self, client=None, recorder=None):
+        self.http = HTTPRequester(client, recorder)
+
+    def send_request(self, request_data: dict) -> dict:
+        if "document" not in request_data:
+            return self.http.send_request(request_data)
+        persisted = use_persisted(request_data)
+        response = self.http.send_request(_http_request(request_data, build_payload(request_data, not persisted)))
+        if persisted and _needs_query(request_data, response):
+            response = self.http.send_request(_http_request(request_data, build_payload(request_data, True)))
+        return response
+
+    def send_batch(self, requests: list) -> list:
+        """一次 HTTP 请求发送多个操作，哈希未注册的操作再带上查询文本补发一次"""
+        if len(requests) == 1 or not endpoints.batchable(requests[0]["url"]):
+            return [self.send_request(request) for request in requests]
+        payloads = [build_payload(request, not use_persisted(request)) for request in requests]
+        response = self.http.send_request(_http_request(requests[0], payloads, _batch_timeout(requests)))
+        responses = split_batch(response, len(requests))
+        if responses is None:
+            endpoints.disable_batch(requests[0]["url"])
+            return [self.send_request(request) for request in requests]
+        for index in _missing_queries(requests, payloads, responses):
+            request = requests[index]
+            responses[index] = self.http.send_request(_http_request(request, build_payload(request, True)))
+        return responses
+
+
+class AsyncGraphQLRequester(GraphQLRequester):
+    """异步 GraphQL 请求器
+
+    同一事件循环周期内（GRAPHQL_BATCH_WINDOW 秒内）发往同一地址的操作合并为一次批量请求，
+    达到 GRAPHQL_BATCH_SIZE 时立即发送。
+    """
+
+    def __init__(self, client, batching=None, recorder=None, throttle=None):
+        self.http = AsyncHTTPRequester(client, recorder, throttle)
+        self.batching = engine_setting("GRAPHQL_BATCHING") if batching is None else batching
+        self.window = engine_setting("GRAPHQL_BATCH_WINDOW")
+        self.max_size = engine_setting("GRAPHQL_BATCH_SIZE")
+        self._pending = {}
+        # 事件循环只保留任务的弱引用，发送中的批量请求需自行持有
+        self._tasks = set()
+
+    async def send_request(self, request_data: dict) -> dict:
+        if "document" not in request_data:
+            return await self.http.send_request(request_data)
+        if not self.batching or not endpoints.batchable(request_data["url"]):
+            return await self._send_one(request_data)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = batch_key(request_data)
+        batch = self._pending.setdefault(key, [])
+        batch.append((request_data, future))
+        if len(batch) == 1:
+            loop.call_later(self.window, self._flush, key)
+        elif len(batch) >= self.max_size:
+            self._flush(key)
+        return await future
+
+    async def _send_one(self, request_data: dict) -> dict:
+        persisted = use_persisted(request_data)
+        response = await self.http.send_request(_http_request(request_data, build_payload(request_data, not persisted)))
+        if persisted and _needs_query(request_data, response):
+            response = await self.http.send_request(_http_request(request_data, build_payload(request_data, True)))
+        return response
+
+    def _flush(self, key: str):
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._send_pending(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_pending(self, batch: list):
+        try:
+            responses = await self.send_batch([request for request, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def send_batch(self, requests: list) -> list:
+        if len(requests) == 1 or not endpoints.batchable(requests[0]["url"]):
+            return list(await asyncio.gather(*(self._send_one(request) for request in requests)))
+        payloads = [build_payload(request, not use_persisted(request)) for request in requests]
+        response = await self.http.send_request(_http_request(requests[0], payloads, _batch_timeout(requests)))
+        responses = split_batch(response, len(requests))
+        if responses is None:
+            endpoints.disable_batch(requests[0]["url"])
+            return list(await asyncio.gather(*(self._send_one(request) for request in requests)))
+        missing = _missing_queries(requests, payloads, responses)
+        retried = await asyncio.gather(
+            *(self.http.send_request(_http_request(requests[index], build_payload(requests[index], True))) for index in missing)
+        )
+        for index, response in zip(missing, retried):
+            responses[index] = response
+        return responses
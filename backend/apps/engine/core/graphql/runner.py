@@ -0,0 +1,100 @@
+# core/graphql/runner.py
+# GraphQL 协议 runner：请求发送交给 GraphQL 请求器，串行执行时把相互独立的相邻步骤合并为一次批量请求
+import time
+from ..common.config import engine_setting
+from ..common.dag import build_step_graph
+from ..http.client_pool import client_key, client_registry
+from ..http.runner import HTTPRunner
+from .requester import AsyncGraphQLRequester, GraphQLRequester, batch_key
+
+
+def is_graphql(case) -> bool:
+    return any("document" in step.request for step in case.steps)
+
+
+def _batchable(step) -> bool:
+    """带前后置、跳过或编译出错的步骤单独执行"""
+    return "document" in step.request and not (step.skip or step.error or step.setup_hooks or step.teardown_hooks)
+
+
+class GraphQLRunner(HTTPRunner):
+    """异步执行时依赖图中同时就绪的步骤由 AsyncGraphQLRequester 在时间窗口内合并"""
+
+    def _sync_requester(self, case):
+        return GraphQLRequester(client_registry.get_client(client_key(case)), self.recorder)
+
+    def _async_requester(self, case):
+        # 请求器按用例创建，步骤串行执行时同一时刻只有一个请求在途，等待合并窗口只会增加延迟
+        batching = engine_setting("GRAPHQL_BATCHING") and engine_setting("STEP_CONCURRENCY") > 1
+        return AsyncGraphQLRequester(
+            client_registry.get_async_client(client_key(case)), batching=batching, recorder=self.recorder,
+            throttle=self._throttle(case),
+        )
+
+    def _run_steps_sync(self, requester, case, context, deadline) -> list:
+        if not engine_setting("GRAPHQL_BATCHING"):
+            return super()._run_steps_sync(requester, case, context, deadline)
+        graph = case.graph or build_step_graph(case.steps)
+        step_results, index = [], 0
+        while index < len(case.steps):
+            batch = self._next_batch(case, graph, index, context, deadline)
+            if len(batch) > 1 and not self._cancelled():
+                step_results.extend(self._execute_batch_sync(requester, case, batch, context, deadline))
+                index += len(batch)
+            else:
+                step_results.append(self._execute_step_sync(requester, case, case.steps[index], context, deadline))
+                index += 1
+        return step_results
+
+    def _next_batch(self, case, graph, start, context, deadline) -> list:
+        """从 start 开始取发往同一地址、互不依赖的相邻 GraphQL 步骤，返回 [(step, request)]"""
+        if not _batchable(case.steps[start]):
+            return []
+        try:
+            request = self._prepare_request(case, case.steps[start], context, deadline)
+        except Exception:
+            return []
+        batch, key = [(case.steps[start], request)], batch_key(request)
+        for index in range(start + 1, min(len(case.steps), start + engine_setting("GRAPHQL_BATCH_SIZE"))):
+            step = case.steps[index]
+            if not _batchable(step) or graph[index] & set(range(start, index)):
+                break
+            try:
+                request = self._prepare_request(case, step, context, deadline)
+            except Exception:
+                break
+            if batch_key(request) != key:
+                break
+            batch.append((step, request))
+        return batch
+
+    def _execute_batch_sync(self, requester, case, batch: list, context, deadline) -> list:
+        """批量发送一次，计为各步骤的第一次尝试；请求失败或结果需要重试的步骤再按各自剩余的重试次数单独执行"""
+        started = time.perf_counter()
+        for step, _ in batch:
+            self._step_started(case, step)
+        try:
+            responses, batch_error = requester.send_batch([request for _, request in batch]), None
+        except Exception as e:
+            responses, batch_error = [None] * len(batch), e
+        results = []
+        for (step, request), response in zip(batch, responses):
+            if batch_error is not None:
+                result = self._step_result(step, "ERROR", started, request=request, error=str(batch_error))
+                error = batch_error
+            else:
+                try:
+                    result, error = self._check_response(step, context, request, response, started), None
+                except Exception as e:
+                    result, error = self._step_result(step, "ERROR", started, request=request, error=str(e)), e
+            attempts = [self._attempt_summary(0, result)]
+            delay = step.retry.delay(0)
+            if self._should_retry(step.retry, 0, result, error) and delay < deadline.remaining():
+                self._discard(result)
+                time.sleep(delay)
+                result = self._attempt_step_sync(requester, case, step, context, deadline, attempts, started)
+            else:
+                result = self._finish_step(result, attempts, started, context)
+            self._step_finished(case, result)
+            results.append(result)
+        return results
@@ -0,0 +1,148 @@
+# core/http/client_pool.py
+# 进程级 HTTP 客户端注册表：同一环境（base_url + TLS + 代理）复用同一个连接池
+import asyncio
+import logging
+import threading
+import weakref
+from typing import NamedTuple, Optional
+import httpx
+from ..common.config import engine_setting
+
+logger = logging.getLogger(__name__)
+
+
+class ClientKey(NamedTuple):
+    base_url: str = ""
+    verify: bool = True
+    proxy: Optional[str] = None
+
+
+def client_key(case) -> ClientKey:
+    """从用例计划中取出连接池维度"""
+    return ClientKey(case.base_url or "", case.verify_ssl, case.proxy or None)
+
+
+def _http2_enabled() -> bool:
+    if not engine_setting("HTTP2"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("未安装 h2，HTTP/2 已降级为 HTTP/1.1")
+        return False
+    return True
+
+
+class _ClientStats:
+    """记录客户端发出的请求数"""
+
+    def __init__(self):
+        self.requests = 0
+
+    def on_request(self, request):
+        self.requests += 1
+
+    async def on_request_async(self, request):
+        self.requests += 1
+
+
+def _pool_occupancy(client) -> dict:
+    """读取 httpcore 连接池中的连接占用情况
+
+    依赖 httpx/httpcore 的私有属性，版本变化导致读取失败时返回空值而不影响其余指标。
+    """
+    try:
+        connections = list(client._transport._pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+    except Exception:
+        logger.debug("无法读取连接池占用情况", exc_info=True)
+        return {"connections": None, "active": None, "idle": None}
+    return {"connections": len(connections), "active": len(connections) - idle, "idle": idle}
+
+
+class ClientRegistry:
+    """按环境缓存 httpx.Client / httpx.AsyncClient
+
+    AsyncClient 的连接绑定事件循环，因此异步客户端按事件循环分组，循环结束时释放。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._stats = weakref.WeakKeyDictionary()
+
+    def _client_options(self, key: ClientKey) -> dict:
+        return {
+            "verify": key.verify,
+            "proxy": key.proxy,
+            "http2": _http2_enabled(),
+            "limits": httpx.Limits(
+                max_connections=engine_setting("POOL_MAX_CONNECTIONS"),
+                max_keepalive_connections=engine_setting("POOL_MAX_KEEPALIVE"),
+                keepalive_expiry=engine_setting("POOL_KEEPALIVE_EXPIRY"),
+            ),
+        }
+
+    def get_client(self, key: ClientKey = ClientKey()) -> httpx.Client:
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                stats = _ClientStats()
+                client = httpx.Client(event_hooks={"request": [stats.on_request]}, **self._client_options(key))
+                self._stats[client] = stats
+                self._clients[key] = client
+            return client
+
+    def get_async_client(self, key: ClientKey = ClientKey()) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                stats = _ClientStats()
+                client = httpx.AsyncClient(
+                    event_hooks={"request": [stats.on_request_async]}, **self._client_options(key),
+                )
+                self._stats[client] = stats
+                clients[key] = client
+            return client
+
+    async def aclose_loop(self):
+        """关闭当前事件循环下的异步客户端"""
+        with self._lock:
+            clients = self._async_clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    def close(self):
+        """关闭所有同步客户端"""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+    def metrics(self) -> list:
+        """连接池占用情况"""
+        with self._lock:
+            items = [("sync", key, client) for key, client in self._clients.items()]
+            for clients in self._async_clients.values():
+                items.extend(("async", key, client) for key, client in clients.items())
+            stats = {id(client): self._stats.get(client) for _, _, client in items}
+        result = []
+        for kind, key, client in items:
+            if client.is_closed:
+                continue
+            client_stats = stats[id(client)]
+            result.append({
+                "type": kind,
+                "base_url": key.base_url,
+                "verify": key.verify,
+                "proxy": key.proxy,
+                "requests": client_stats.requests if client_stats else 0,
+                **_pool_occupancy(client),
+            })
+        return result
+
+
+client_registry = ClientRegistry()
@@ -0,0 +1,203 @@
+# core/http/recorder.py
+# 录制/回放：按请求指纹把响应存到本地目录，调试时重复执行同一批用例不再访问被测服务
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+import httpx
+from ..common.config import engine_setting
+from .response import ResponseBody
+
+MODES = ("record", "replay", "refresh")
+
+
+class RecordMissing(LookupError):
+    """严格回放模式下没有对应的录制"""
+
+
+def _drop_path(data, path: list):
+    """删除 JSON 中按点号路径指定的字段，返回副本"""
+    if not isinstance(data, dict) or not path:
+        return data
+    key, rest = path[0], path[1:]
+    if key not in data:
+        return data
+    data = dict(data)
+    if rest:
+        data[key] = _drop_path(data[key], rest)
+    else:
+        del data[key]
+    return data
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def fingerprint(request_data: dict, ignore_headers=(), ignore_params=(), ignore_body=()) -> str:
+    """方法、解析后的地址、规范化的请求头/查询参数/请求体的哈希
+
+    - 地址中的查询参数与 params 合并后排序，scheme / host 不区分大小写
+    - 请求头名称不区分大小写；ignore_headers / ignore_params 中的名称不参与计算
+    - ignore_body 为点号路径（如 meta.timestamp），只对 JSON 请求体生效
+    """
+    url = httpx.URL(request_data["url"])
+    ignore_params = set(ignore_params)
+    params = [(key, value) for key, value in url.params.multi_items() if key not in ignore_params]
+    for key, value in (request_data.get("params") or {}).items():
+        if key in ignore_params:
+            continue
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            params.append((key, str(item)))
+    ignore_headers = {name.lower() for name in ignore_headers}
+    headers = sorted(
+        (str(name).lower(), str(value))
+        for name, value in (request_data.get("headers") or {}).items()
+        if str(name).lower() not in ignore_headers
+    )
+    body = request_data.get("json")
+    if body is not None:
+        for path in ignore_body:
+            body = _drop_path(body, path.split("."))
+    else:
+        body = request_data.get("data")
+    canonical = _canonical([
+        request_data["method"].upper(),
+        f"{url.scheme.lower()}://{url.netloc.decode('ascii').lower()}{url.path}",
+        sorted(params),
+        headers,
+        body,
+    ])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def record_dir() -> str:
+    return engine_setting("RECORD_DIR") or os.path.join(tempfile.gettempdir(), "engine_records")
+
+
+class RecordStore:
+    """本地录制目录：每条录制一个文件，按指纹前两位分目录
+
+    文件格式：4 字节元信息长度 + 元信息 JSON（状态码、响应头、编码、录制时间）+ zlib 压缩的响应体。
+    写入先写临时文件再原子替换，并发录制同一指纹时后写入者生效。
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.rec")
+
+    def get(self, key: str, ttl=None):
+        """返回录制的响应；不存在或超过 ttl 秒返回 None"""
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        size = int.from_bytes(data[:4], "big")
+        meta = json.loads(data[4:4 + size])
+        if ttl is not None and time.time() - meta["recorded_at"] > ttl:
+            return None
+        body = ResponseBody(zlib.decompress(data[4 + size:]), encoding=meta["encoding"])
+        return {"status_code": meta["status_code"], "headers": meta["headers"], "body": body}
+
+    def put(self, key: str, request_data: dict, response: dict):
+        body = response["body"]
+        meta = json.dumps({
+            "method": request_data["method"].upper(),
+            "url": str(request_data["url"]),
+            "status_code": response["status_code"],
+            "headers": response["headers"],
+            "encoding": body.encoding,
+            "recorded_at": time.time(),
+        }).encode("utf-8")
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(len(meta).to_bytes(4, "big"))
+            f.write(meta)
+            # 落盘的大响应体按块压缩写入，不整体读入内存
+            compressor = zlib.compressobj()
+            for chunk in body.iter_bytes(engine_setting("STREAM_CHUNK_SIZE")):
+                f.write(compressor.compress(chunk))
+            f.write(compressor.flush())
+        os.replace(tmp, path)
+
+    def stats(self) -> dict:
+        entries = size = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".rec"):
+                    entries += 1
+                    size += os.path.getsize(os.path.join(directory, name))
+        return {"root": self.root, "entries": entries, "bytes": size}
+
+
+class Recorder:
+    """请求器使用的录制/回放层
+
+    - record: 总是请求被测服务并覆盖录制
+    - replay: 有录制直接返回，没有时请求并录制（strict 时报错）
+    - refresh: 录制超过 ttl 秒视为过期，重新请求并录制
+    """
+
+    def __init__(self, mode: str, root=None, ttl=None, ignore_headers=None, ignore_params=None, ignore_body=None,
+                 strict=None):
+        if mode not in MODES:
+            raise ValueError(f"不支持的录制模式: {mode}")
+        self.mode = mode
+        self.store = RecordStore(root or record_dir())
+        self.ttl = (ttl or engine_setting("RECORD_TTL")) if mode == "refresh" else None
+        self.ignore_headers = engine_setting("RECORD_IGNORE_HEADERS") if ignore_headers is None else ignore_headers
+        self.ignore_params = engine_setting("RECORD_IGNORE_PARAMS") if ignore_params is None else ignore_params
+        self.ignore_body = engine_setting("RECORD_IGNORE_BODY") if ignore_body is None else ignore_body
+        self.strict = engine_setting("RECORD_STRICT") if strict is None else strict
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, request_data: dict) -> str:
+        return fingerprint(request_data, self.ignore_headers, self.ignore_params, self.ignore_body)
+
+    def lookup(self, request_data: dict):
+        """返回 (指纹, 录制的响应或 None)"""
+        key = self.fingerprint(request_data)
+        if self.mode == "record":
+            return key, None
+        response = self.store.get(key, self.ttl)
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if response is None and self.strict and self.mode == "replay":
+            raise RecordMissing(f"没有录制: {request_data['method'].upper()} {request_data['url']}")
+        return key, response
+
+    def send(self, request_data: dict, send):
+        key, response = self.lookup(request_data)
+        if response is None:
+            response = send(request_data)
+            self.store.put(key, request_data, response)
+        return response
+
+    async def send_async(self, request_data: dict, send):
+        key, response = self.lookup(request_data)
+        if response is None:
+            response = await send(request_data)
+            self.store.put(key, request_data, response)
+        return response
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, **self.store.stats()}
+
+
+def get_recorder(mode=None):
+    """mode 未指定时使用 RECORD_MODE 配置，为空表示不录制"""
+    mode = mode or engine_setting("RECORD_MODE")
+    return Recorder(mode) if mode else None
@@ -1,23 +1,120 @@
 # core/http/requester.py
 import httpx
-from core.base.requester import BaseRequester
+from ..base.requester import BaseRequester
+from ..common.config import engine_setting
+from .client_pool import client_registry
+from .response import BodyCollector, ResponseBody, check_size
+from .timing import PhaseTimer
+
+
+def _build_response(response: httpx.Response, body: ResponseBody, timer: PhaseTimer = None) -> dict:
+    """统一响应结构，响应体延迟解析；开启 HTTP_TIMING 时带上分阶段耗时"""
+    result = {"status_code": response.status_code, "headers": dict(response.headers), "body": body}
+    if timer is not None:
+        result["timing"] = timer.phases()
+    return result
+
+
+def _start_timer(kwargs: dict, is_async: bool):
+    """开启 HTTP_TIMING 时通过 trace 扩展挂上阶段计时"""
+    if not engine_setting("HTTP_TIMING"):
+        return None
+    timer = PhaseTimer()
+    kwargs["extensions"] = {"trace": timer.atrace if is_async else timer.trace}
+    return timer
+
+
+def _is_stream(request_data: dict) -> bool:
+    """步骤 raw_request_config 中的 stream 优先于全局配置"""
+    stream = request_data.get("stream")
+    return engine_setting("STREAM_RESPONSES") if stream is None else bool(stream)
+
+
+def _request_kwargs(request_data: dict) -> dict:
+    kwargs = {
+        "params": request_data.get("params") or None,
+        "headers": request_data.get("headers") or None,
+    }
+    if request_data.get("json") is not None:
+        kwargs["json"] = request_data["json"]
+    elif request_data.get("data"):
+        kwargs["data"] = request_data["data"]
+    if request_data.get("timeout") is not None:
+        kwargs["timeout"] = request_data["timeout"]
+    return kwargs
+
 
 class HTTPRequester(BaseRequester):
-    def __init__(self):
-        self.client = httpx.Client()
+    """recorder 不为空时先查录制，未命中再请求并录制"""
+
+    def __init__(self, client: httpx.Client = None, recorder=None):
+        self.client = client or client_registry.get_client()
+        self.recorder = recorder
 
     def send_request(self, request_data: dict) -> dict:
-        method = request_data["method"]
+        if self.recorder is not None:
+            return self.recorder.send(request_data, self._send)
+        return self._send(request_data)
+
+    def _send(self, request_data: dict) -> dict:
+        method = request_data["method"].upper()
         url = request_data["url"]
-        headers = request_data.get("headers", {})
-        params = request_data.get("params", {})
-        data = request_data.get("data", {})
-
-        if method.lower() == "get":
-            response = self.client.get(url, params=params, headers=headers)
-        elif method.lower() == "post":
-            response = self.client.post(url, data=data, headers=headers)
-        else:
-            raise ValueError("Unsupported HTTP method")
-        
-        return {"status_code": response.status_code, "body": response.json()}
+        kwargs = _request_kwargs(request_data)
+        timer = _start_timer(kwargs, is_async=False)
+        if not _is_stream(request_data):
+            response = self.client.request(method, url, **kwargs)
+            body = ResponseBody(check_size(response.content), encoding=response.encoding)
+            return _build_response(response, body, timer)
+
+        with self.client.stream(method, url, **kwargs) as response:
+            collector = BodyCollector(response.encoding)
+            try:
+                for chunk in response.iter_bytes(engine_setting("STREAM_CHUNK_SIZE")):
+                    collector.feed(chunk)
+            except BaseException:
+                collector.discard()
+                raise
+            return _build_response(response, collector.finish(), timer)
+
+
+class AsyncHTTPRequester(BaseRequester):
+    """异步请求器，同一环境的用例共享同一个 AsyncClient
+
+    throttle 不为空时实际发出的请求经过限流（见 core/http/throttle.py），回放命中的请求不受限。
+    """
+
+    def __init__(self, client: httpx.AsyncClient, recorder=None, throttle=None):
+        self.client = client
+        self.recorder = recorder
+        self.throttle = throttle
+
+    async def send_request(self, request_data: dict) -> dict:
+        if self.recorder is not None:
+            return await self.recorder.send_async(request_data, self._send)
+        return await self._send(request_data)
+
+    async def _send(self, request_data: dict) -> dict:
+        if self.throttle is not None:
+            return await self.throttle.send(self._request, request_data)
+        return await self._request(request_data)
+
+    async def _request(self, request_data: dict) -> dict:
+        method = request_data["method"].upper()
+        url = request_data["url"]
+        kwargs = _request_kwargs(request_data)
+        timer = _start_timer(kwargs, is_async=True)
+        if not _is_stream(request_data):
+            response = await self.client.request(method, url, **kwargs)
+            body = ResponseBody(check_size(response.content), encoding=response.encoding)
+            return _build_response(response, body, timer)
+
+        async with self.client.stream(method, url, **kwargs) as response:
+            collector = BodyCollector(response.encoding)
+            try:
+                async for chunk in response.aiter_bytes(engine_setting("STREAM_CHUNK_SIZE")):
+                    collector.feed(chunk)
+            except BaseException:
+                # 包括对冲请求被取消的情况，清理已落盘的部分
+                collector.discard()
+                raise
+            return _build_response(response, collector.finish(), timer)
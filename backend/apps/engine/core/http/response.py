@@ -0,0 +1,148 @@
+# core/http/response.py
+# 响应体：按需解析 JSON，流式模式下超过阈值的响应体落盘，内存占用与响应大小无关
+import json
+import os
+import tempfile
+from ..common.config import engine_setting
+
+try:
+    import orjson
+
+    def json_loads(content: bytes):
+        return orjson.loads(content)
+except ImportError:  # orjson 为可选依赖
+    def json_loads(content: bytes):
+        return json.loads(content)
+
+_UNPARSED = object()
+
+
+class ResponseTooLarge(ValueError):
+    """响应体超过单步骤大小上限"""
+
+
+class ResponseBody:
+    """响应体
+
+    - content: 内存中的响应体（未落盘时）
+    - path: 落盘文件路径（超过阈值时）
+    - parse(): 首次调用时解析 JSON，非 JSON 返回文本
+    """
+
+    __slots__ = ("content", "path", "size", "encoding", "_parsed")
+
+    def __init__(self, content: bytes = b"", path: str = None, size: int = None, encoding: str = "utf-8"):
+        self.content = content
+        self.path = path
+        self.size = len(content) if size is None else size
+        self.encoding = encoding or "utf-8"
+        self._parsed = _UNPARSED
+
+    @classmethod
+    def of(cls, value) -> "ResponseBody":
+        """已解析的响应体，如批量响应拆分出的单项"""
+        body = cls()
+        body._parsed = value
+        return body
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def parsed(self) -> bool:
+        return self._parsed is not _UNPARSED
+
+    def read(self) -> bytes:
+        if self.path is None:
+            return self.content
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def iter_bytes(self, chunk_size: int):
+        """按块读取，落盘的响应体不整体读入内存"""
+        if self.path is None:
+            yield self.content
+            return
+        with open(self.path, "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    def discard(self):
+        """删除落盘文件，响应体不再使用时调用"""
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def parse(self):
+        if self._parsed is _UNPARSED:
+            content = self.read()
+            try:
+                self._parsed = json_loads(content) if content else None
+            except ValueError:
+                self._parsed = content.decode(self.encoding, errors="replace")
+        return self._parsed
+
+
+class BodyCollector:
+    """流式收集响应体：超过 spill_bytes 后写入临时文件，超过 max_bytes 报错"""
+
+    def __init__(self, encoding=None):
+        self.spill_bytes = engine_setting("STREAM_SPILL_BYTES")
+        self.max_bytes = engine_setting("STREAM_MAX_BYTES")
+        self.encoding = encoding
+        self.size = 0
+        self._chunks = []
+        self._file = None
+
+    def feed(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise ResponseTooLarge(f"响应体超过上限 {self.max_bytes} 字节")
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        self._chunks.append(chunk)
+        if self.size > self.spill_bytes:
+            self._file = tempfile.NamedTemporaryFile(
+                prefix="resp_", suffix=".bin", dir=engine_setting("STREAM_SPILL_DIR"), delete=False
+            )
+            self._file.write(b"".join(self._chunks))
+            self._chunks = []
+
+    def finish(self) -> ResponseBody:
+        if self._file is None:
+            return ResponseBody(b"".join(self._chunks), encoding=self.encoding)
+        self._file.close()
+        return ResponseBody(path=self._file.name, size=self.size, encoding=self.encoding)
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._file.name)
+            self._file = None
+        self._chunks = []
+
+
+def check_size(content: bytes) -> bytes:
+    """非流式模式下同样执行大小上限"""
+    max_bytes = engine_setting("STREAM_MAX_BYTES")
+    if len(content) > max_bytes:
+        raise ResponseTooLarge(f"响应体超过上限 {max_bytes} 字节")
+    return content
+
+
+def materialize(response: dict) -> dict:
+    """提取器/断言需要时才解析响应体"""
+    return {**response, "body": response["body"].parse()}
+
+
+def response_summary(response: dict) -> dict:
+    """写入步骤结果的响应信息：已解析且未落盘的响应体原样保留，其余只保留大小与文件"""
+    body = response["body"]
+    return {
+        "status_code": response["status_code"],
+        "headers": response["headers"],
+        "body": body.parse() if body.parsed and not body.spilled else None,
+        "size": body.size,
+        "body_file": body.path,
+    }
@@ -1,25 +1,354 @@
 # HTTP 协议 runner 实现
 # core/http/runner.py
-from core.base.runner import BaseRunner
-from core.http.requester import HTTPRequester
+import asyncio
+import os
+import time
+from ..base.runner import BaseRunner
+from ..common.config import engine_setting
+from ..common.dag import build_step_graph
+from ..common.extractor import Extractor
+from ..common.prepost import HookExecutor
+from ..common.retry import Deadline
+from ..common.validator import Validator
+from .client_pool import client_key, client_registry
+from .requester import HTTPRequester, AsyncHTTPRequester
+from .response import materialize, response_summary
+
+
+def join_url(base_url: str, url: str) -> str:
+    """拼接环境 base_url 与接口路径，绝对地址保持不变"""
+    if not base_url or url.startswith(("http://", "https://")):
+        return url
+    return f"{base_url.rstrip('/')}/{url.lstrip('/')}"
+
 
 class HTTPRunner(BaseRunner):
-    def __init__(self, is_async=False):
+    """recorder: 录制/回放层（见 core/http/recorder.py），为空时直接请求被测服务
+    throttles: 按 base_url 的限流器（见 core/http/throttle.py），只用于异步执行
+    events: 执行事件发布器（见 core/events/bus.py），为空时不发布步骤事件；
+            events.cancelled 为真时剩余步骤不再执行，记为 SKIP
+    """
+
+    def __init__(self, is_async=False, recorder=None, throttles=None, events=None):
         self.is_async = is_async
-        self.requester = HTTPRequester()
+        self.recorder = recorder
+        self.throttles = throttles
+        self.events = events
 
-    def run(self, case: dict, context: dict) -> dict:
+    def run(self, case, context) -> dict:
         if self.is_async:
             return self.run_async(case, context)
         else:
             return self.run_sync(case, context)
 
-    def run_sync(self, case: dict, context: dict) -> dict:
-        response = self.requester.send_request(case["request"])
-        # 执行断言
-        return response
+    def run_sync(self, case, context) -> dict:
+        started = time.perf_counter()
+        requester = self._sync_requester(case)
+        deadline = Deadline(engine_setting("CASE_TIMEOUT"))
+        error = self._run_hooks(case.setup_hooks, case, context)
+        if error:
+            return self._case_result(case, [], started, f"用例前置执行失败: {error}")
+        step_results = self._run_steps_sync(requester, case, context, deadline)
+        return self._case_result(case, step_results, started)
+
+    def _run_steps_sync(self, requester, case, context, deadline) -> list:
+        return [self._execute_step_sync(requester, case, step, context, deadline) for step in case.steps]
+
+    async def run_async(self, case, context) -> dict:
+        """STEP_CONCURRENCY 大于 1 时按步骤依赖图并发执行，结果仍按 order 排列"""
+        started = time.perf_counter()
+        requester = self._async_requester(case)
+        deadline = Deadline(engine_setting("CASE_TIMEOUT"))
+        if case.setup_hooks:
+            error = await asyncio.to_thread(self._run_hooks, case.setup_hooks, case, context)
+            if error:
+                return self._case_result(case, [], started, f"用例前置执行失败: {error}")
+        concurrency = engine_setting("STEP_CONCURRENCY")
+        if concurrency <= 1:
+            # 串行时严格按 order 依次等待，依赖图推导不出的隐式依赖同样得到保证
+            step_results = []
+            for step in case.steps:
+                step_results.append(await self._execute_step_async(requester, case, step, context, deadline))
+            return self._case_result(case, step_results, started)
+        graph = case.graph or build_step_graph(case.steps)
+        limit = asyncio.Semaphore(concurrency)
+        tasks = []
+        for index, step in enumerate(case.steps):
+            # 依赖的步骤下标均小于当前下标，按 order 创建任务保证就绪步骤按 order 启动
+            deps = [tasks[i] for i in sorted(graph[index])]
+            tasks.append(asyncio.ensure_future(self._run_step_async(requester, case, step, context, deadline, deps, limit)))
+        step_results = await asyncio.gather(*tasks)
+        return self._case_result(case, list(step_results), started)
+
+    async def _run_step_async(self, requester, case, step, context, deadline, deps, limit) -> dict:
+        if deps:
+            await asyncio.wait(deps)
+        async with limit:
+            return await self._execute_step_async(requester, case, step, context, deadline)
+
+    def _sync_requester(self, case):
+        return HTTPRequester(client_registry.get_client(client_key(case)), self.recorder)
+
+    def _async_requester(self, case):
+        return AsyncHTTPRequester(client_registry.get_async_client(client_key(case)), self.recorder, self._throttle(case))
+
+    def _throttle(self, case):
+        return self.throttles.get(case.base_url) if self.throttles is not None else None
+
+    # ==== 前后置 ====
+    @staticmethod
+    def _run_hooks(hooks, case, context):
+        """执行 SQL 前后置，成功返回 None，失败返回错误信息"""
+        if not hooks:
+            return None
+        try:
+            HookExecutor(hooks, context, case.database).execute_all()
+        except Exception as e:
+            return str(e)
+        return None
+
+    @staticmethod
+    def _apply_teardown(result: dict, error):
+        if error and result["status"] != "SKIP":
+            result["status"] = "ERROR"
+            result["error_message"] = "; ".join(filter(None, [result["error_message"], f"后置执行失败: {error}"]))
+        return result
+
+    # ==== 执行事件 ====
+    def _step_started(self, case, step):
+        if self.events is not None:
+            self.events.emit("step-started", case_id=case.id, step_id=step.id, name=step.name)
+
+    def _step_finished(self, case, result: dict):
+        if self.events is not None:
+            self.events.emit(
+                "step-finished",
+                case_id=case.id,
+                step_id=result["step_id"],
+                name=result["name"],
+                status=result["status"],
+                duration=result["duration"],
+                attempts=len(result["attempts"]),
+                timing=result.get("timing"),
+                error_message=result["error_message"],
+            )
+
+    def _cancelled(self) -> bool:
+        return self.events is not None and self.events.cancelled
+
+    def _execute_step_sync(self, requester, case, step, context, deadline) -> dict:
+        if self._cancelled():
+            return self._step_result(step, "SKIP", time.perf_counter(), error="执行已取消")
+        self._step_started(case, step)
+        result = self._step_sync(requester, case, step, context, deadline)
+        self._step_finished(case, result)
+        return result
+
+    async def _execute_step_async(self, requester, case, step, context, deadline) -> dict:
+        if self._cancelled():
+            return self._step_result(step, "SKIP", time.perf_counter(), error="执行已取消")
+        self._step_started(case, step)
+        result = await self._step_async(requester, case, step, context, deadline)
+        self._step_finished(case, result)
+        return result
+
+    def _step_sync(self, requester, case, step, context, deadline) -> dict:
+        if step.skip:
+            return self._step_result(step, "SKIP", time.perf_counter())
+        if step.error:
+            return self._step_result(step, "ERROR", time.perf_counter(), error=step.error)
+        started = time.perf_counter()
+        error = self._run_hooks(step.setup_hooks, case, context)
+        if error:
+            return self._step_result(step, "ERROR", started, error=f"前置执行失败: {error}")
+        result = self._attempt_step_sync(requester, case, step, context, deadline)
+        return self._apply_teardown(result, self._run_hooks(step.teardown_hooks, case, context))
+
+    async def _step_async(self, requester, case, step, context, deadline) -> dict:
+        if step.skip:
+            return self._step_result(step, "SKIP", time.perf_counter())
+        if step.error:
+            return self._step_result(step, "ERROR", time.perf_counter(), error=step.error)
+        started = time.perf_counter()
+        if step.setup_hooks:
+            error = await asyncio.to_thread(self._run_hooks, step.setup_hooks, case, context)
+            if error:
+                return self._step_result(step, "ERROR", started, error=f"前置执行失败: {error}")
+        result = await self._attempt_step_async(requester, case, step, context, deadline)
+        if step.teardown_hooks:
+            self._apply_teardown(result, await asyncio.to_thread(self._run_hooks, step.teardown_hooks, case, context))
+        return result
+
+    # ==== 重试 ====
+    def _attempt_step_sync(self, requester, case, step, context, deadline, attempts=None, step_started=None) -> dict:
+        """attempts 为已完成的尝试（如 GraphQL 批量请求），计入重试次数，从下一次尝试继续"""
+        policy = step.retry
+        step_started = step_started or time.perf_counter()
+        attempts, result = attempts or [], None
+        for attempt in range(len(attempts), policy.retries + 1):
+            if deadline.expired:
+                result = result or self._step_result(step, "ERROR", step_started, error="超出用例时间预算")
+                break
+            attempt_started = time.perf_counter()
+            request = None
+            try:
+                request = self._prepare_request(case, step, context, deadline)
+                response = requester.send_request(request)
+                result, error = self._check_response(step, context, request, response, attempt_started), None
+            except Exception as e:
+                result, error = self._step_result(step, "ERROR", attempt_started, request=request, error=str(e)), e
+            attempts.append(self._attempt_summary(attempt, result))
+            if not self._should_retry(policy, attempt, result, error):
+                break
+            delay = policy.delay(attempt)
+            if delay >= deadline.remaining():
+                break
+            self._discard(result)
+            time.sleep(delay)
+        return self._finish_step(result, attempts, step_started, context)
+
+    async def _attempt_step_async(self, requester, case, step, context, deadline) -> dict:
+        policy = step.retry
+        step_started = time.perf_counter()
+        attempts, result = [], None
+        for attempt in range(policy.retries + 1):
+            if deadline.expired:
+                result = result or self._step_result(step, "ERROR", step_started, error="超出用例时间预算")
+                break
+            attempt_started = time.perf_counter()
+            request, hedged = None, False
+            try:
+                request = self._prepare_request(case, step, context, deadline)
+                response, hedged = await self._send_async(requester, request, policy)
+                if step.assertions:
+                    # 自定义断言在进程池中执行，等待结果时不阻塞事件循环
+                    result = await asyncio.to_thread(self._check_response, step, context, request, response, attempt_started)
+                else:
+                    result = self._check_response(step, context, request, response, attempt_started)
+                error = None
+            except Exception as e:
+                result, error = self._step_result(step, "ERROR", attempt_started, request=request, error=str(e)), e
+            attempts.append(self._attempt_summary(attempt, result, hedged))
+            if not self._should_retry(policy, attempt, result, error):
+                break
+            delay = policy.delay(attempt)
+            if delay >= deadline.remaining():
+                break
+            self._discard(result)
+            await asyncio.sleep(delay)
+        return self._finish_step(result, attempts, step_started, context)
+
+    @staticmethod
+    async def _send_async(requester, request: dict, policy):
+        """幂等 GET 超过 hedge_delay 未返回时再发一份，取先成功的结果"""
+        if not policy.can_hedge(request):
+            return await requester.send_request(request), False
+        primary = asyncio.ensure_future(requester.send_request(request))
+        done, _ = await asyncio.wait({primary}, timeout=policy.hedge_delay)
+        if done:
+            return primary.result(), False
+        pending = {primary, asyncio.ensure_future(requester.send_request(request))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                responses = [task.result() for task in done if task.exception() is None]
+                if responses:
+                    # 两份请求同时完成时，落选一方落盘的响应体不再使用
+                    for response in responses[1:]:
+                        response["body"].discard()
+                    return responses[0], True
+                error = done.pop().exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _should_retry(policy, attempt, result, error) -> bool:
+        return attempt < policy.retries and policy.should_retry(result, error)
+
+    @staticmethod
+    def _discard(result: dict):
+        """丢弃的尝试不保留落盘的响应体"""
+        if result.get("response_file") and os.path.exists(result["response_file"]):
+            os.unlink(result["response_file"])
+
+    @staticmethod
+    def _attempt_summary(attempt: int, result: dict, hedged=False) -> dict:
+        response = result.get("response") or {}
+        return {
+            "attempt": attempt + 1,
+            "status": result["status"],
+            "status_code": response.get("status_code"),
+            "duration": result["duration"],
+            "hedged": hedged,
+            "error": result["error_message"],
+        }
+
+    @staticmethod
+    def _finish_step(result: dict, attempts: list, started: float, context) -> dict:
+        """只有最后一次尝试提取的变量写入上下文，丢弃的尝试不影响后续步骤"""
+        context.merge(result["extract_result"])
+        result["attempts"] = attempts
+        result["duration"] = time.perf_counter() - started
+        return result
+
+    # ==== 单次请求 ====
+    def _prepare_request(self, case, step, context, deadline) -> dict:
+        """变量替换并补全请求地址，模板在编译执行计划时已预编译；请求超时不超过用例剩余预算"""
+        request = context.render(step.template)
+        request["url"] = join_url(case.base_url, request["url"])
+        request["timeout"] = deadline.timeout(request.get("timeout"))
+        return request
+
+    def _check_response(self, step, context, request: dict, response: dict, started: float) -> dict:
+        """提取变量并执行断言，只有存在提取器或断言时才解析响应体
+
+        提取的变量先写入子作用域，供本次断言使用，确定不再重试后才由 _finish_step 写入上下文。
+        """
+        extractors = step.extractors
+        extract_result = {}
+        status, error = "PASS", None
+        if extractors or step.validators:
+            data = materialize(response)
+            scope = context.fork()
+            Extractor(extractors, scope).extract(data)
+            extract_result = {item["key"]: scope.get(item["key"]) for item in extractors}
+            try:
+                Validator(step.validators, scope, step.assertions).validate(data)
+            except AssertionError as e:
+                status, error = "FAIL", str(e)
+        summary = response_summary(response)
+        result = self._step_result(step, status, started, request, summary, extract_result, error)
+        result["timing"] = response.get("timing")
+        return result
+
+    @staticmethod
+    def _step_result(step, status, started, request=None, response=None, extract_result=None, error=None) -> dict:
+        return {
+            "step_id": step.id,
+            "interface_id": step.interface.id if step.interface else None,
+            "name": step.name,
+            "status": status,
+            "duration": time.perf_counter() - started,
+            "request": request,
+            "response": response,
+            "response_file": response["body_file"] if response else None,
+            "extract_result": extract_result or {},
+            "error_message": error,
+            "attempts": [],
+            "timing": None,
+        }
 
-    async def run_async(self, case: dict, context: dict) -> dict:
-        response = await self.requester.send_request(case["request"])
-        # 执行断言
-        return response
+    @staticmethod
+    def _case_result(case, step_results, started, error=None) -> dict:
+        passed = all(result["status"] in ("PASS", "SKIP") for result in step_results)
+        return {
+            "case_id": case.id,
+            "name": case.name,
+            "status": "ERROR" if error else "PASS" if passed else "FAIL",
+            "duration": time.perf_counter() - started,
+            "steps": step_results,
+            "error_message": error,
+        }
@@ -0,0 +1,214 @@
+# core/http/throttle.py
+# 按环境 base_url 的限流与自适应并发：令牌桶限制请求速率，AIMD 根据 p95 延迟与错误率调整同时发出的请求数
+import asyncio
+import collections
+import math
+import threading
+import time
+from ..common.config import engine_setting
+
+
+class TokenBucket:
+    """令牌桶：rate 为每秒补充的令牌数，burst 为桶容量
+
+    令牌允许透支，排队的请求按取令牌的先后依次等待，不需要唤醒逻辑。
+    """
+
+    def __init__(self, rate: float, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, self.rate))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        return max(0.0, self.updated - now) + max(0.0, -self.tokens) / self.rate
+
+    def pause(self, seconds: float):
+        """被测服务返回 Retry-After 时清空令牌，seconds 秒后再开始补充"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+        self.updated = max(self.updated, now + seconds)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveLimit:
+    """AIMD 并发上限
+
+    每完成 window 个请求评估一次：错误率超过 max_error_rate，或 p95 延迟超过 latency_target
+    （未配置时为基线的 latency_tolerance 倍）时上限乘以 decrease，否则加 1。
+    基线为健康窗口 p95 的平滑值：延迟下降时立即跟随，上升时每个窗口只跟随 10%。
+    """
+
+    def __init__(self, initial: int, minimum=1, maximum=None, window=20, max_error_rate=0.05,
+                 latency_tolerance=2.0, latency_target=None, decrease=0.7):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum or initial)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.latency_tolerance = latency_tolerance
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.inflight = 0
+        self.requests = 0
+        self.decreases = 0
+        self.baseline = None
+        self.p95 = None
+        self.error_rate = None
+        self._latencies = []
+        self._errors = 0
+        self._waiters = collections.deque()
+
+    async def acquire(self):
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 已分到名额但任务被取消（如对冲请求），归还名额
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.inflight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.inflight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.inflight += 1
+                future.set_result(None)
+
+    def record(self, latency: float, error: bool):
+        self.requests += 1
+        self._latencies.append(latency)
+        self._errors += bool(error)
+        if len(self._latencies) >= self.window:
+            self._adjust()
+
+    def _adjust(self):
+        samples = sorted(self._latencies)
+        p95 = samples[max(0, math.ceil(len(samples) * 0.95) - 1)]
+        error_rate = self._errors / len(samples)
+        self._latencies, self._errors = [], 0
+        self.p95, self.error_rate = p95, error_rate
+        target = self.latency_target or (self.baseline * self.latency_tolerance if self.baseline else None)
+        if error_rate > self.max_error_rate or (target is not None and p95 > target):
+            self.limit = max(self.minimum, int(self.limit * self.decrease))
+            self.decreases += 1
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+            self._wake()
+        if error_rate <= self.max_error_rate:
+            self.baseline = p95 if self.baseline is None or p95 < self.baseline else self.baseline + (p95 - self.baseline) * 0.1
+
+
+def _retry_after(response: dict):
+    """只支持秒数形式的 Retry-After"""
+    value = (response.get("headers") or {}).get("retry-after")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class HostThrottle:
+    """单个 base_url 的限流：先取令牌再占并发名额，请求结束后按耗时与状态码调整上限
+
+    THROTTLE_STATUS 中的状态码与请求异常计为错误；对冲请求被取消时不计入统计。
+    """
+
+    def __init__(self, base_url: str, limit: int):
+        self.base_url = base_url
+        rate = engine_setting("RATE_LIMIT")
+        self.bucket = TokenBucket(rate, engine_setting("RATE_LIMIT_BURST")) if rate else None
+        adaptive = engine_setting("ADAPTIVE_CONCURRENCY")
+        self.limit = AdaptiveLimit(
+            limit,
+            minimum=engine_setting("ADAPTIVE_MIN_CONCURRENCY") if adaptive else limit,
+            maximum=engine_setting("ADAPTIVE_MAX_CONCURRENCY") if adaptive else limit,
+            window=engine_setting("ADAPTIVE_WINDOW"),
+            max_error_rate=engine_setting("ADAPTIVE_ERROR_RATE"),
+            latency_tolerance=engine_setting("ADAPTIVE_LATENCY_TOLERANCE"),
+            latency_target=engine_setting("ADAPTIVE_LATENCY_TARGET"),
+            decrease=engine_setting("ADAPTIVE_DECREASE"),
+        )
+        self.error_status = set(engine_setting("THROTTLE_STATUS"))
+
+    async def send(self, send, request_data: dict) -> dict:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        await self.limit.acquire()
+        started = time.perf_counter()
+        error = True
+        try:
+            response = await send(request_data)
+            error = response["status_code"] in self.error_status
+            if error and self.bucket is not None:
+                delay = _retry_after(response)
+                if delay:
+                    self.bucket.pause(delay)
+            return response
+        except asyncio.CancelledError:
+            error = None
+            raise
+        finally:
+            self.limit.release()
+            if error is not None:
+                self.limit.record(time.perf_counter() - started, error)
+
+    def stats(self) -> dict:
+        limit = self.limit
+        return {
+            "rate": self.bucket.rate if self.bucket else None,
+            "limit": limit.limit,
+            "inflight": limit.inflight,
+            "waiting": sum(1 for future in limit._waiters if not future.done()),
+            "requests": limit.requests,
+            "decreases": limit.decreases,
+            "p95": round(limit.p95, 4) if limit.p95 is not None else None,
+            "error_rate": limit.error_rate,
+        }
+
+
+class ThrottleRegistry:
+    """一次任务内按 base_url 共享的限流器；并发上限初始值为 per_host_limit
+
+    调整后的上限在同一任务内的多次事件循环（如串行任务中的参数化用例）之间保留。
+    """
+
+    def __init__(self, per_host_limit=None):
+        self.per_host_limit = per_host_limit or engine_setting("PER_HOST_CONCURRENCY")
+        self._throttles = {}
+        self._lock = threading.Lock()
+
+    def get(self, base_url: str) -> HostThrottle:
+        throttle = self._throttles.get(base_url)
+        if throttle is None:
+            with self._lock:
+                throttle = self._throttles.get(base_url)
+                if throttle is None:
+                    throttle = self._throttles[base_url] = HostThrottle(base_url, self.per_host_limit)
+        return throttle
+
+    def stats(self) -> dict:
+        return {base_url: throttle.stats() for base_url, throttle in list(self._throttles.items())}
@@ -0,0 +1,52 @@
+# core/http/timing.py
+# 请求分阶段耗时：通过 httpcore 的 trace 扩展记录各阶段起止时间，每个请求只多十来次回调
+import time
+
+PHASES = ("pool", "connect", "tls", "upload", "ttfb", "download", "total")
+
+
+class PhaseTimer:
+    """单次请求的阶段计时（秒），通过 extensions={"trace": ...} 传给 httpx
+
+    - pool: 从发起请求到拿到连接（新建连接时到开始建连，复用连接时到开始发送请求头）
+    - connect: 建立 TCP 连接，httpcore 在建连时解析域名，DNS 耗时包含在内
+    - tls: TLS 握手
+    - upload: 发送请求头与请求体
+    - ttfb: 请求发送完毕到收到响应头，即服务端处理耗时
+    - download: 读取响应体
+    未经过 httpcore 的请求（如 MockTransport）只有 total。
+    """
+
+    __slots__ = ("started", "marks")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = {}
+
+    def trace(self, name: str, info: dict):
+        # connection.connect_tcp.started / http11.send_request_headers.complete / http2.receive_response_body.started
+        # 去掉协议前缀；代理隧道会先发送一次 CONNECT，后发生的事件覆盖先发生的
+        self.marks[name.split(".", 1)[-1]] = time.perf_counter()
+
+    async def atrace(self, name: str, info: dict):
+        self.trace(name, info)
+
+    def _span(self, start: str, end: str):
+        marks = self.marks
+        if start in marks and end in marks:
+            return round(marks[end] - marks[start], 6)
+        return None
+
+    def phases(self) -> dict:
+        marks = self.marks
+        first = marks.get("connect_tcp.started", marks.get("send_request_headers.started"))
+        phases = {
+            "pool": round(first - self.started, 6) if first is not None else None,
+            "connect": self._span("connect_tcp.started", "connect_tcp.complete"),
+            "tls": self._span("start_tls.started", "start_tls.complete"),
+            "upload": self._span("send_request_headers.started", "send_request_body.complete"),
+            "ttfb": self._span("send_request_body.complete", "receive_response_headers.complete"),
+            "download": self._span("receive_response_body.started", "receive_response_body.complete"),
+            "total": round(time.perf_counter() - self.started, 6),
+        }
+        return {phase: value for phase, value in phases.items() if value is not None}
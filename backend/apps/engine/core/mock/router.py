@@ -0,0 +1,85 @@
+# core/mock/router.py
+# Mock 路由：接口路径预编译为前缀树，静态路径直接查表，{id} / :id 形式的段匹配为路径参数
+from urllib.parse import urlsplit
+
+ANY_METHOD = "*"
+
+
+def split_path(url: str) -> list:
+    """接口 url 可能是完整地址，只取路径部分按 / 切段"""
+    path = urlsplit(url).path if "://" in url else url.split("?", 1)[0]
+    return [segment for segment in path.split("/") if segment]
+
+
+def _param_name(segment: str):
+    if segment.startswith("{") and segment.endswith("}"):
+        return segment[1:-1]
+    if segment.startswith(":"):
+        return segment[1:]
+    return None
+
+
+class _Node:
+    __slots__ = ("static", "param", "param_name", "routes")
+
+    def __init__(self):
+        self.static = {}
+        self.param = None
+        self.param_name = None
+        self.routes = {}
+
+
+class PathTrie:
+    """路径前缀树
+
+    - 同一位置静态段优先于参数段，静态分支匹配失败时回溯到参数分支
+    - 不含参数的路径额外放入字典，命中时不走树
+    - 路径存在但方法不匹配时 match 返回 (None, None)，由调用方返回 405
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._static = {}
+
+    def add(self, method: str, url: str, route):
+        segments = split_path(url)
+        node = self._root
+        for segment in segments:
+            name = _param_name(segment)
+            if name is None:
+                node = node.static.setdefault(segment, _Node())
+            else:
+                if node.param is None:
+                    node.param, node.param_name = _Node(), name
+                elif node.param_name != name:
+                    raise ValueError(f"路径参数名冲突: {url} 中的 {name} 与已有的 {node.param_name}")
+                node = node.param
+        node.routes[(method or ANY_METHOD).upper()] = route
+        if all(_param_name(segment) is None for segment in segments):
+            self._static["/" + "/".join(segments)] = node
+
+    def match(self, method: str, path: str):
+        """返回 (route, params)；路径不存在返回 None"""
+        node = self._static.get(path.rstrip("/") or "/")
+        params = {}
+        if node is None:
+            node = self._walk(self._root, [segment for segment in path.split("/") if segment], 0, params)
+            if node is None:
+                return None
+        route = node.routes.get(method) or node.routes.get(ANY_METHOD)
+        return (route, params) if route is not None else (None, None)
+
+    def _walk(self, node, segments, index, params):
+        if index == len(segments):
+            return node if node.routes else None
+        child = node.static.get(segments[index])
+        if child is not None:
+            found = self._walk(child, segments, index + 1, params)
+            if found is not None:
+                return found
+        if node.param is not None:
+            found = self._walk(node.param, segments, index + 1, params)
+            if found is not None:
+                params[node.param_name] = segments[index]
+                return found
+        return None
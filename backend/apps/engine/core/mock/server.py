@@ -0,0 +1,222 @@
+# core/mock/server.py
+# Mock 服务：按项目加载 is_mock 接口，预编译路由与响应，以原生 ASGI 应用提供服务，不经过 Django 请求处理
+import asyncio
+import json
+import logging
+import random
+import time
+from urllib.parse import parse_qsl
+from ..common.config import engine_setting
+from ..common.template import compile_template
+from .router import PathTrie
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    def json_dumps(value) -> bytes:
+        return orjson.dumps(value)
+except ImportError:  # orjson 为可选依赖
+    def json_dumps(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+_ENVELOPE_KEYS = {"status_code", "headers", "body", "delay", "error_rate", "error_status"}
+
+
+def _encode(body):
+    """返回 (content-type, 响应体字节)"""
+    if isinstance(body, bytes):
+        return b"application/octet-stream", body
+    if isinstance(body, str):
+        return b"text/plain; charset=utf-8", body.encode("utf-8")
+    return b"application/json", json_dumps(body)
+
+
+def _headers(content_type: bytes, length: int, extra: list) -> list:
+    return [(b"content-type", content_type), (b"content-length", str(length).encode()), *extra]
+
+
+def _simple(status: int, message: str) -> tuple:
+    content_type, body = _encode({"error": message})
+    return status, _headers(content_type, len(body), []), body
+
+
+async def _send(send, response: tuple):
+    status, headers, body = response
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class MockRoute:
+    """单个接口的预编译响应
+
+    mock_response 含 status_code / headers / body / delay / error_rate / error_status 任一键时按响应描述解析，
+    否则整体作为响应体；都为空时使用 response_example。
+    - body 中的 ${name} 用路径参数与查询参数渲染，不含变量的响应体只编码一次
+    - delay: 固定延迟毫秒数，或 [最小, 最大] 区间内均匀取值
+    - error_rate: 按比例返回 error_status 错误响应
+    """
+
+    __slots__ = (
+        "interface_id", "status", "content_type", "extra_headers", "template", "response", "delay", "error_rate", "error",
+    )
+
+    def __init__(self, interface):
+        spec = interface.mock_response or {}
+        if not (isinstance(spec, dict) and _ENVELOPE_KEYS & set(spec)):
+            spec = {"body": spec or interface.response_example or {}}
+        self.interface_id = interface.id
+        self.status = int(spec.get("status_code") or 200)
+        headers = {str(key).lower(): str(value).encode("latin-1") for key, value in (spec.get("headers") or {}).items()}
+        self.content_type = headers.pop("content-type", None)
+        headers.pop("content-length", None)
+        self.extra_headers = [(key.encode("latin-1"), value) for key, value in headers.items()]
+        body = spec.get("body")
+        template = compile_template(body)
+        self.template = template if template.names else None
+        self.response = None if template.names else self._build(body)
+        delay = spec.get("delay", engine_setting("MOCK_LATENCY"))
+        self.delay = tuple(value / 1000 for value in delay) if isinstance(delay, (list, tuple)) else (delay or 0) / 1000
+        self.error_rate = float(spec.get("error_rate", engine_setting("MOCK_ERROR_RATE")) or 0)
+        self.error = _simple(int(spec.get("error_status") or engine_setting("MOCK_ERROR_STATUS")), "mock 注入错误")
+
+    def _build(self, body) -> tuple:
+        content_type, content = _encode(body)
+        return self.status, _headers(self.content_type or content_type, len(content), self.extra_headers), content
+
+    def respond(self, params: dict, query_string: bytes) -> tuple:
+        if self.error_rate and random.random() < self.error_rate:
+            return self.error
+        if self.template is None:
+            return self.response
+        variables = dict(parse_qsl(query_string.decode("latin-1"))) if query_string else {}
+        variables.update(params)
+        return self._build(self.template.render(variables))
+
+    def latency(self) -> float:
+        if isinstance(self.delay, tuple):
+            return random.uniform(*self.delay)
+        return self.delay
+
+
+class MockApp:
+    """单个项目的 Mock 应用，routes 为 (method, url, MockRoute) 列表"""
+
+    def __init__(self, routes, version=None):
+        self.trie = PathTrie()
+        self.version = version
+        self.checked_at = time.monotonic()
+        for method, url, route in routes:
+            try:
+                self.trie.add(method, url, route)
+            except ValueError as e:
+                logger.error(f"注册 mock 接口 {route.interface_id} 时出错: {str(e)}")
+
+    async def handle(self, path: str, scope, send):
+        matched = self.trie.match(scope["method"], path)
+        if matched is None:
+            return await _send(send, _simple(404, f"未找到 mock 接口: {scope['method']} {path}"))
+        route, params = matched
+        if route is None:
+            return await _send(send, _simple(405, f"mock 接口不支持 {scope['method']}"))
+        delay = route.latency()
+        if delay:
+            await asyncio.sleep(delay)
+        await _send(send, route.respond(params, scope.get("query_string") or b""))
+
+
+def project_version(project_id: int) -> tuple:
+    """接口数量与最近修改时间，变化时重新加载"""
+    from django.db.models import Count, Max
+    from ...models import ApiInterface
+
+    aggregate = ApiInterface.objects.filter(project_id=project_id, is_mock=True, is_active=True).aggregate(
+        count=Count("id"), updated_at=Max("updated_at")
+    )
+    return aggregate["count"], aggregate["updated_at"]
+
+
+def load_project(project_id: int) -> MockApp:
+    from ...models import ApiInterface
+
+    interfaces = ApiInterface.objects.filter(project_id=project_id, is_mock=True, is_active=True).order_by("id")
+    routes = [(interface.method, interface.url or "/", MockRoute(interface)) for interface in interfaces]
+    return MockApp(routes, project_version(project_id))
+
+
+class MockGateway:
+    """Mock 服务入口（ASGI）
+
+    - prefix: 挂载前缀，路径形如 {prefix}{project_id}/接口路径；指定 project_id 时路径直接为接口路径
+    - 每个项目的路由首次访问时加载，之后最多每 MOCK_RELOAD_INTERVAL 秒检查一次接口是否变更
+    """
+
+    def __init__(self, prefix="", project_id=None):
+        self.prefix = prefix.rstrip("/")
+        self.project_id = project_id
+        self.reload_interval = engine_setting("MOCK_RELOAD_INTERVAL")
+        self._apps = {}
+        self._locks = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        path = scope["path"][len(self.prefix):]
+        project_id = self.project_id
+        if project_id is None:
+            head, _, rest = path.lstrip("/").partition("/")
+            if not head.isdigit():
+                return await _send(send, _simple(404, "路径中缺少项目 ID"))
+            project_id, path = int(head), "/" + rest
+        app = await self.project_app(project_id)
+        await app.handle(path, scope, send)
+
+    async def project_app(self, project_id: int) -> MockApp:
+        app = self._apps.get(project_id)
+        if app is not None and time.monotonic() - app.checked_at < self.reload_interval:
+            return app
+        from asgiref.sync import sync_to_async
+
+        lock = self._locks.setdefault(project_id, asyncio.Lock())
+        async with lock:
+            app = self._apps.get(project_id)
+            if app is not None and time.monotonic() - app.checked_at < self.reload_interval:
+                return app
+            if app is None or await sync_to_async(project_version)(project_id) != app.version:
+                app = await sync_to_async(load_project)(project_id)
+                self._apps[project_id] = app
+            app.checked_at = time.monotonic()
+            return app
+
+
+def mount(application, prefix=None):
+    """挂载到 Django ASGI 应用旁：prefix 下的 HTTP 请求由 Mock 服务处理，其余交给原应用"""
+    prefix = prefix or engine_setting("MOCK_PREFIX")
+    gateway = MockGateway(prefix)
+
+    async def app(scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(prefix):
+            return await gateway(scope, receive, send)
+        return await application(scope, receive, send)
+
+    return app
+
+
+def create_app(project_id=None):
+    """独立运行：uvicorn --factory apps.engine.core.mock.server:create_app"""
+    import os
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tsadmin.settings")
+    django.setup()
+    project_id = project_id or os.getenv("MOCK_PROJECT_ID")
+    return MockGateway(project_id=int(project_id) if project_id else None)
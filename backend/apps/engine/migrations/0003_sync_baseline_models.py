@@ -0,0 +1,1115 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.deletion
+import taggit.managers
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0002_rename_testapi_testinterface'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActionType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('display_name', models.CharField(max_length=100)),
+                ('category', models.CharField(choices=[('HTTP', 'HTTP'), ('UI', 'UI'), ('RPC', 'RPC'), ('DB', 'Database')], max_length=50)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ApiInterface',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('name', models.CharField(max_length=200)),
+                ('protocol', models.CharField(choices=[('HTTP', 'HTTP'), ('GRAPHQL', 'GraphQL')], max_length=20)),
+                ('method', models.CharField(blank=True, max_length=10, null=True)),
+                ('url', models.CharField(blank=True, max_length=500, null=True)),
+                ('headers', models.JSONField(default=dict)),
+                ('params', models.JSONField(default=dict)),
+                ('body', models.JSONField(default=dict)),
+                ('graphql_query', models.TextField(blank=True, null=True)),
+                ('timeout', models.IntegerField(default=30)),
+                ('response_example', models.JSONField(default=dict)),
+                ('is_mock', models.BooleanField(default=False)),
+                ('mock_response', models.JSONField(default=dict)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Database',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('name', models.CharField(max_length=100)),
+                ('db_type', models.CharField(choices=[('MYSQL', 'MySQL'), ('POSTGRESQL', 'PostgreSQL')], max_length=20)),
+                ('host', models.CharField(max_length=100)),
+                ('port', models.IntegerField()),
+                ('username', models.CharField(max_length=100)),
+                ('password', models.CharField(max_length=100)),
+                ('db_name', models.CharField(max_length=100)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DataGenerator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('name', models.CharField(max_length=100)),
+                ('config', models.JSONField(default=dict)),
+                ('script', models.TextField()),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Environment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('name', models.CharField(max_length=100)),
+                ('base_url', models.URLField()),
+                ('variables', models.JSONField(default=dict)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='GlobalVariable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('variables', models.JSONField(default=dict)),
+                ('is_overridable', models.BooleanField(default=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PerformanceScenario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('name', models.CharField(max_length=200)),
+                ('locust_script', models.TextField()),
+                ('users', models.PositiveIntegerField()),
+                ('spawn_rate', models.PositiveIntegerField()),
+                ('run_time', models.CharField(max_length=50)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('variables', models.JSONField(default=dict)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='StepHook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('enable', models.BooleanField(default=True)),
+                ('position', models.CharField(choices=[('SETUP', '前置'), ('TEARDOWN', '后置')], max_length=10)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TestLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('trace_id', models.CharField(max_length=100, unique=True)),
+                ('content', models.TextField()),
+                ('loki_url', models.URLField(blank=True, null=True)),
+                ('response_file', models.FileField(blank=True, null=True, upload_to='response_files/')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ToolFunction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('script', models.TextField()),
+                ('language', models.CharField(choices=[('PYTHON', 'Python')], default='PYTHON', max_length=20)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='VariableSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('variables', models.JSONField(default=dict)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RemoveField(
+            model_name='testcaseparam',
+            name='created_by',
+        ),
+        migrations.RemoveField(
+            model_name='testcaseparam',
+            name='testcase',
+        ),
+        migrations.RemoveField(
+            model_name='testcaseparam',
+            name='updated_by',
+        ),
+        migrations.RemoveField(
+            model_name='testinterface',
+            name='created_by',
+        ),
+        migrations.RemoveField(
+            model_name='testinterface',
+            name='updated_by',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='api',
+        ),
+        migrations.RemoveIndex(
+            model_name='casereport',
+            name='engine_case_created_afee6c_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='casereport',
+            name='engine_case_updated_08e083_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='celerytaskrecord',
+            name='engine_cele_created_4b4ef2_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='celerytaskrecord',
+            name='engine_cele_updated_97d218_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customassertion',
+            name='engine_cust_created_8933a1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customassertion',
+            name='engine_cust_updated_6b77ec_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='exceptioncategory',
+            name='engine_exce_created_3b1d0e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='exceptioncategory',
+            name='engine_exce_updated_401f2a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='exceptionrecord',
+            name='engine_exce_created_9c1832_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='exceptionrecord',
+            name='engine_exce_updated_bcdf07_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='hooktemplate',
+            name='engine_hook_created_927cf9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='hooktemplate',
+            name='engine_hook_updated_252e03_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='scheduleplan',
+            name='engine_sche_created_5c0069_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='scheduleplan',
+            name='engine_sche_updated_7e8acf_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='stepreport',
+            name='engine_step_created_74cbfe_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='stepreport',
+            name='engine_step_updated_740252_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testcase',
+            name='engine_test_created_5ae706_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testcase',
+            name='engine_test_updated_a20f50_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testjob',
+            name='engine_test_created_5e275b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testjob',
+            name='engine_test_updated_ae79c8_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testreport',
+            name='engine_test_created_164a49_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testreport',
+            name='engine_test_updated_760200_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='teststep',
+            name='engine_test_created_a566a1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='teststep',
+            name='engine_test_updated_6206ff_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testsuite',
+            name='engine_test_created_4978c0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='testsuite',
+            name='engine_test_updated_cfde6d_idx',
+        ),
+        migrations.RemoveField(
+            model_name='hooktemplate',
+            name='type',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='extractors',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='request_config',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='setup_hooks',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='teardown_hooks',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='validators',
+        ),
+        migrations.RemoveField(
+            model_name='testcase',
+            name='variables',
+        ),
+        migrations.RemoveField(
+            model_name='testjob',
+            name='run_type',
+        ),
+        migrations.RemoveField(
+            model_name='teststep',
+            name='request_config',
+        ),
+        migrations.RemoveField(
+            model_name='testsuite',
+            name='tags',
+        ),
+        migrations.AddField(
+            model_name='hooktemplate',
+            name='hook_type',
+            field=models.CharField(choices=[('SETUP', '前置'), ('TEARDOWN', '后置')], default='SETUP', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='hooktemplate',
+            name='language',
+            field=models.CharField(choices=[('SQL', 'SQL'), ('PYTHON', 'Python')], default='PYTHON', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='scheduleplan',
+            name='enabled',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='execution_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='skip',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='testjob',
+            name='result_summary',
+            field=models.JSONField(default=dict),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='testjob',
+            name='run_mode',
+            field=models.CharField(choices=[('ALL', '全量'), ('SELECTED', '指定用例')], default='ALL', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='testreport',
+            name='report_type',
+            field=models.CharField(choices=[('DEBUG', '接口调试'), ('CASE', '用例运行'), ('SUITE', '集成用例'), ('SCHEDULE', '定时轮询')], default='DEBUG', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='testreport',
+            name='response_file',
+            field=models.FileField(blank=True, null=True, upload_to='response_files/'),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='body',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='graphql_query',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='headers',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='params',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='raw_request_config',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='skip',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='trace_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='casereport',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='casereport',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='casereport',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='casereport',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='casereport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='casereport',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='celerytaskrecord',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='celerytaskrecord',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='celerytaskrecord',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='celerytaskrecord',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='celerytaskrecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='celerytaskrecord',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='script',
+            field=models.TextField(),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='customassertion',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='exceptioncategory',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptioncategory',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='exceptioncategory',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptioncategory',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptioncategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptioncategory',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='exceptionrecord',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptionrecord',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='exceptionrecord',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptionrecord',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptionrecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='exceptionrecord',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='hooktemplate',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='hooktemplate',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='hooktemplate',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='hooktemplate',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='hooktemplate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='hooktemplate',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='scheduleplan',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='scheduleplan',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='scheduleplan',
+            name='cron',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='scheduleplan',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='scheduleplan',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='scheduleplan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='scheduleplan',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='stepreport',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='stepreport',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='stepreport',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='stepreport',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='stepreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='stepreport',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='name',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='order',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='protocol',
+            field=models.CharField(choices=[('HTTP', 'HTTP'), ('GRAPHQL', 'GraphQL'), ('UI', 'UI'), ('GRPC', 'gRPC'), ('DUBBO', 'Dubbo')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='retries',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='suite',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cases', to='engine.testsuite'),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testcase',
+            name='version',
+            field=models.CharField(default='v1.0', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='testjob',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='testjob',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testjob',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='testjob',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='testjob',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='testjob',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.testjob'),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='teststep',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='teststep',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='teststep',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='teststep',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='teststep',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='teststep',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='is_public',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.testsuite'),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='testsuite',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='teststep',
+            name='action_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='engine.actiontype'),
+        ),
+        migrations.AddField(
+            model_name='apiinterface',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='apiinterface',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='api_interface',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.apiinterface'),
+        ),
+        migrations.AddField(
+            model_name='database',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='database',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='datagenerator',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='datagenerator',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='environment',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='environment',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='environment',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, to='engine.environment'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='testjob',
+            name='environment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.environment'),
+        ),
+        migrations.AddField(
+            model_name='globalvariable',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='globalvariable',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='performancescenario',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='performancescenario',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tags',
+            field=taggit.managers.TaggableManager(blank=True, help_text='A comma-separated list of tags.', through='taggit.TaggedItem', to='taggit.Tag', verbose_name='Tags'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='environment',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='environments', to='engine.project'),
+        ),
+        migrations.AddField(
+            model_name='database',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.project'),
+        ),
+        migrations.AddField(
+            model_name='apiinterface',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.project'),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='project',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, to='engine.project'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='testsuite',
+            name='project',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, to='engine.project'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='stephook',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='stephook',
+            name='hook_template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.hooktemplate'),
+        ),
+        migrations.AddField(
+            model_name='stephook',
+            name='step',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hook_scripts', to='engine.teststep'),
+        ),
+        migrations.AddField(
+            model_name='stephook',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='testlog',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='testlog',
+            name='step',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.teststep'),
+        ),
+        migrations.AddField(
+            model_name='testlog',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='teststep',
+            name='log',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.testlog'),
+        ),
+        migrations.AddField(
+            model_name='toolfunction',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='toolfunction',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='variableset',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='variableset',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.project'),
+        ),
+        migrations.AddField(
+            model_name='variableset',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='variable_set',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.variableset'),
+        ),
+        migrations.DeleteModel(
+            name='TestCaseParam',
+        ),
+        migrations.DeleteModel(
+            name='TestInterface',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0003_sync_baseline_models'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='testreport',
+            name='job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='engine.testjob'),
+        ),
+    ]
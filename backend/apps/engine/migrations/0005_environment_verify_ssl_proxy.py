@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0004_testreport_job_nullable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='environment',
+            name='proxy',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='environment',
+            name='verify_ssl',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0005_environment_verify_ssl_proxy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stepreport',
+            name='trace_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0006_stepreport_trace_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stepreport',
+            name='attempts',
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0007_stepreport_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casereport',
+            name='row_results',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='parameters',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0008_case_parameters_row_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='database',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.database'),
+        ),
+        migrations.AlterField(
+            model_name='database',
+            name='db_type',
+            field=models.CharField(choices=[('MYSQL', 'MySQL'), ('POSTGRESQL', 'PostgreSQL'), ('SQLITE', 'SQLite')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0009_testcase_database'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casereport',
+            name='carried_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='carried_reports', to='engine.casereport'),
+        ),
+        migrations.AddField(
+            model_name='casereport',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
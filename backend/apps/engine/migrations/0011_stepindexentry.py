@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0010_casereport_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StepIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('INTERFACE', '接口'), ('ENDPOINT', '端点'), ('PRODUCES', '产出变量'), ('CONSUMES', '引用变量')], max_length=20)),
+                ('key', models.CharField(max_length=500)),
+                ('step', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_entries', to='engine.teststep')),
+                ('suite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.testsuite')),
+                ('testcase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engine.testcase')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'key'], name='engine_step_kind_65b32d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0011_stepindexentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casereport',
+            name='latency',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='stepreport',
+            name='latency',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='testreport',
+            name='latency',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.CreateModel(
+            name='InterfaceLatency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('histogram', models.TextField()),
+                ('count', models.PositiveIntegerField()),
+                ('p50', models.FloatField()),
+                ('p90', models.FloatField()),
+                ('p99', models.FloatField()),
+                ('max', models.FloatField()),
+                ('interface', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latencies', to='engine.apiinterface')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interface_latencies', to='engine.testreport')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['interface', 'report'], name='engine_inte_interfa_4504db_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0012_latency_histograms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stepreport',
+            name='timing',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
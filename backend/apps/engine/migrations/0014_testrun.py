@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0013_stepreport_timing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('description', models.TextField(blank=True)),
+                ('record', models.CharField(blank=True, default='', max_length=20)),
+                ('idempotency_key', models.CharField(max_length=128)),
+                ('task_id', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(choices=[('PENDING', '排队中'), ('RUNNING', '执行中'), ('SUCCESS', '成功'), ('FAILED', '失败'), ('CANCELLED', '已取消')], default='PENDING', max_length=20)),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('partial', models.JSONField(default=list)),
+                ('summary', models.JSONField(default=dict)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(class)s', to=settings.AUTH_USER_MODEL)),
+                ('environment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.environment')),
+                ('report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='engine.testreport')),
+                ('testcase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runs', to='engine.testcase')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(class)s', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['idempotency_key', 'created_at'], name='engine_test_idempot_c52ac8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engine', '0014_testrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casereport',
+            name='write_token',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=32),
+        ),
+    ]
@@ -43,6 +43,8 @@ class Environment(BaseModel):
     project = models.ForeignKey(Project, related_name="environments", on_delete=models.CASCADE)
     base_url = models.URLField()
     variables = models.JSONField(default=dict)
+    verify_ssl = models.BooleanField(default=True)
+    proxy = models.CharField(max_length=200, blank=True, null=True)
 
 class VariableSet(BaseModel):
     variables = models.JSONField(default=dict)
@@ -52,7 +54,7 @@ class VariableSet(BaseModel):
 class Database(BaseModel):
     name = models.CharField(max_length=100)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
-    db_type = models.CharField(max_length=20, choices=[("MYSQL", "MySQL"), ("POSTGRESQL", "PostgreSQL")])
+    db_type = models.CharField(max_length=20, choices=[("MYSQL", "MySQL"), ("POSTGRESQL", "PostgreSQL"), ("SQLITE", "SQLite")])
     host = models.CharField(max_length=100)
     port = models.IntegerField()
     username = models.CharField(max_length=100)
@@ -94,9 +96,11 @@ class TestCase(BaseModel):
     environment = models.ForeignKey(Environment, on_delete=models.CASCADE)
     protocol = models.CharField(max_length=20, choices=[("HTTP", "HTTP"), ("GRAPHQL", "GraphQL"), ("UI", "UI"), ("GRPC", "gRPC"), ("DUBBO", "Dubbo")])
     variable_set = models.ForeignKey(VariableSet, null=True, blank=True, on_delete=models.SET_NULL)
+    database = models.ForeignKey(Database, null=True, blank=True, on_delete=models.SET_NULL)  # SQL 前后置使用的数据库
     order = models.PositiveIntegerField(default=0)
     retries = models.PositiveIntegerField(default=0)
     execution_count = models.PositiveIntegerField(default=1)
+    parameters = models.JSONField(default=dict, blank=True)  # 参数表：rows / matrix / variable_set / file
     skip = models.BooleanField(default=False)
     version = models.CharField(max_length=50, default="v1.0")
     
@@ -118,7 +122,7 @@ class TestStep(BaseModel):
     retries = models.PositiveIntegerField(default=0)
     skip = models.BooleanField(default=False)
     trace_id = models.CharField(max_length=100, blank=True, null=True)
-    log = models.ForeignKey(TestLog, null=True, blank=True, on_delete=models.SET_NULL)
+    log = models.ForeignKey("TestLog", null=True, blank=True, on_delete=models.SET_NULL)
 
 # ==== Hook & 断言脚本 & SQL 前后置 ====
 class HookTemplate(BaseModel):
@@ -172,13 +176,35 @@ class CeleryTaskRecord(BaseModel):
     started_at = models.DateTimeField(null=True, blank=True)
     finished_at = models.DateTimeField(null=True, blank=True)
 
+# 提交执行的单用例运行：接口只建记录并投递，由 worker 执行，运行 ID 用于查询状态、取消与获取部分结果
+class TestRun(BaseModel):
+    STATUS_CHOICES = [("PENDING", "排队中"), ("RUNNING", "执行中"), ("SUCCESS", "成功"), ("FAILED", "失败"), ("CANCELLED", "已取消")]
+
+    testcase = models.ForeignKey(TestCase, related_name="runs", on_delete=models.CASCADE)
+    environment = models.ForeignKey(Environment, null=True, blank=True, on_delete=models.SET_NULL)
+    record = models.CharField(max_length=20, blank=True, default="")  # 录制/回放模式
+    idempotency_key = models.CharField(max_length=128)
+    task_id = models.CharField(max_length=100, blank=True, default="")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    cancel_requested = models.BooleanField(default=False)
+    partial = models.JSONField(default=list)  # 已完成步骤的结果摘要，执行中定期写回
+    summary = models.JSONField(default=dict)
+    report = models.ForeignKey("TestReport", null=True, blank=True, on_delete=models.SET_NULL)
+    error_message = models.TextField(blank=True, null=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["idempotency_key", "created_at"])]
+
 # ==== 报告系统 ====
 class TestReport(BaseModel):
-    job = models.ForeignKey(TestJob, on_delete=models.CASCADE)
+    job = models.ForeignKey(TestJob, null=True, blank=True, on_delete=models.CASCADE)  # 单用例调试无任务
     report_type = models.CharField(max_length=20, choices=[("DEBUG", "接口调试"), ("CASE", "用例运行"), ("SUITE", "集成用例"), ("SCHEDULE", "定时轮询")])
     summary = models.JSONField()
     logs = models.TextField(blank=True)
     response_file = models.FileField(upload_to="response_files/", null=True, blank=True)
+    latency = models.TextField(blank=True, default="")  # 全部步骤耗时直方图的合并（编码）
 
 class CaseReport(BaseModel):
     report = models.ForeignKey(TestReport, related_name="case_reports", on_delete=models.CASCADE)
@@ -188,6 +214,11 @@ class CaseReport(BaseModel):
     extract_result = models.JSONField()
     validator_result = models.JSONField(default=list)
     error_message = models.TextField(blank=True, null=True)
+    row_results = models.JSONField(default=list)  # 参数化执行的逐行结果
+    content_hash = models.CharField(max_length=64, blank=True, default="")  # 执行时用例定义的内容哈希
+    carried_from = models.ForeignKey('self', null=True, blank=True, related_name="carried_reports", on_delete=models.SET_NULL)  # 增量执行沿用的原始报告
+    latency = models.TextField(blank=True, default="")  # 各步骤耗时直方图的合并（编码）
+    write_token = models.CharField(max_length=32, blank=True, default="", db_index=True)  # 批量写入时回查主键的行标识
 
 class StepReport(BaseModel):
     case_report = models.ForeignKey(CaseReport, related_name="step_reports", on_delete=models.CASCADE)
@@ -197,8 +228,39 @@ class StepReport(BaseModel):
     extract_result = models.JSONField()
     validator_result = models.JSONField(default=list)
     error_message = models.TextField(blank=True, null=True)
+    trace_id = models.CharField(max_length=100, blank=True, null=True)  # 大响应体对应的 TestLog
+    attempts = models.JSONField(default=list)  # 每次尝试的状态、耗时与是否对冲
+    latency = models.TextField(blank=True, default="")  # 每次尝试耗时的直方图（编码，参数化用例含所有行）
+    timing = models.JSONField(null=True, blank=True)  # 最后一次请求的分阶段耗时：pool / connect / tls / upload / ttfb / download
 
 
+# 单次报告内按接口合并的耗时直方图，分位数冗余存储便于跨执行查询
+class InterfaceLatency(models.Model):
+    report = models.ForeignKey(TestReport, related_name="interface_latencies", on_delete=models.CASCADE)
+    interface = models.ForeignKey(ApiInterface, related_name="latencies", on_delete=models.CASCADE)
+    histogram = models.TextField()
+    count = models.PositiveIntegerField()
+    p50 = models.FloatField()
+    p90 = models.FloatField()
+    p99 = models.FloatField()
+    max = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=["interface", "report"])]
+
+
+# ==== 依赖反向索引：接口 / 端点 / 变量 -> 步骤、用例、套件 ====
+class StepIndexEntry(models.Model):
+    KIND_CHOICES = [("INTERFACE", "接口"), ("ENDPOINT", "端点"), ("PRODUCES", "产出变量"), ("CONSUMES", "引用变量")]
+
+    step = models.ForeignKey(TestStep, related_name="index_entries", on_delete=models.CASCADE)
+    testcase = models.ForeignKey(TestCase, on_delete=models.CASCADE)
+    suite = models.ForeignKey(TestSuite, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    key = models.CharField(max_length=500)  # 接口 ID / "METHOD 路径模式" / 变量名
+
+    class Meta:
+        indexes = [models.Index(fields=["kind", "key"])]
 
 # ==== 异常记录 ====
 class ExceptionCategory(BaseModel):
@@ -224,7 +286,7 @@ class DataGenerator(BaseModel):
 
 # ==== 集成 Locust 性能测试 ====
 class PerformanceScenario(BaseModel):
-    name = models.CharField(...)
+    name = models.CharField(max_length=200)
     locust_script = models.TextField()
     users = models.PositiveIntegerField()
     spawn_rate = models.PositiveIntegerField()
@@ -1,7 +1,9 @@
 # engine/api/__init__.py
 from ninja import Router
-from . import testcase, project
+from . import testcase, testcase_run, project, dependency
 
 router = Router()
 router.add_router("/testcases", testcase.router)
+router.add_router("/testcases", testcase_run.router)
 router.add_router("/projects", project.router)
+router.add_router("/dependencies", dependency.router)
@@ -0,0 +1,52 @@
+import logging
+from ninja import Router
+from django.shortcuts import get_object_or_404
+from ..models import ApiInterface, Environment, TestJob
+from ..core.common import dependency_index
+from ..core.common.runs import submit_job
+from .schemas import TestJobRunResponse
+
+logger = logging.getLogger(__name__)
+router = Router()
+
+# ==== 依赖反向索引 ====
+@router.get("/interfaces/{interface_id}", response=dict)
+def get_interface_impact(request, interface_id: int):
+    """引用该接口的步骤、用例与套件"""
+    return dependency_index.interface_impact(interface_id)
+
+@router.get("/endpoints", response=dict)
+def get_endpoint_impact(request, url: str, method: str = None):
+    """按方法与路径查询，路径参数段（{id}、:id、${var}）与任意值匹配"""
+    return dependency_index.endpoint_impact(method, url)
+
+@router.get("/variables/{name}", response=dict)
+def get_variable_usage(request, name: str):
+    """产出与引用该变量的步骤"""
+    return dependency_index.variable_usage(name)
+
+@router.post("/rebuild", response=dict)
+def rebuild_index(request):
+    """全量重建索引（批量导入或直接改库之后）"""
+    return {"entries": dependency_index.rebuild()}
+
+@router.post("/interfaces/{interface_id}/run", response=TestJobRunResponse)
+def run_interface_impact(request, interface_id: int, environment_id: int, parallel: bool = True):
+    """只执行引用该接口的用例：创建 SELECTED 模式的任务并提交执行，立即返回任务与报告 ID"""
+    interface = get_object_or_404(ApiInterface, id=interface_id)
+    environment = get_object_or_404(Environment, id=environment_id)
+    case_ids = dependency_index.interface_impact(interface_id)["cases"]
+    if not case_ids:
+        return TestJobRunResponse(success=False, message="没有用例引用该接口")
+    job = TestJob.objects.create(
+        name=f"接口变更回归: {interface.name}", environment=environment, run_mode="SELECTED",
+        parallel=parallel, result_summary={},
+    )
+    job.testcases.set(case_ids)
+    report = submit_job(job)
+    return TestJobRunResponse(
+        success=True,
+        message=f"已提交受影响的 {len(case_ids)} 个用例",
+        job_id=job.id,
+        report_id=report.id
+    )
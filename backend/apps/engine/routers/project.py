@@ -3,16 +3,16 @@ from typing import List
 from django.shortcuts import get_object_or_404
 from ..models import Project, Environment, VariableSet, Database
 from .schemas import (
-    ProjectSchema,
+    ProjectDetailSchema,
     ProjectCreateSchema,
     ProjectUpdateSchema,
-    EnvironmentSchema,
+    EnvironmentDetailSchema,
     EnvironmentCreateSchema,
     EnvironmentUpdateSchema,
-    VariableSetSchema,
+    VariableSetDetailSchema,
     VariableSetCreateSchema,
     VariableSetUpdateSchema,
-    DatabaseSchema,
+    DatabaseDetailSchema,
     DatabaseCreateSchema,
     DatabaseUpdateSchema
 )
@@ -20,20 +20,20 @@ from .schemas import (
 router = Router()
 
 # ===== 项目管理 =====
-@router.post("/projects/", response=ProjectSchema)
+@router.post("/projects/", response=ProjectDetailSchema)
 def create_project(request, data: ProjectCreateSchema):
     project = Project.objects.create(**data.dict())
     return project
 
-@router.get("/projects/", response=List[ProjectSchema])
+@router.get("/projects/", response=List[ProjectDetailSchema])
 def list_projects(request):
     return Project.objects.all()
 
-@router.get("/projects/{project_id}/", response=ProjectSchema)
+@router.get("/projects/{project_id}/", response=ProjectDetailSchema)
 def get_project(request, project_id: int):
     return get_object_or_404(Project, id=project_id)
 
-@router.put("/projects/{project_id}/", response=ProjectSchema)
+@router.put("/projects/{project_id}/", response=ProjectDetailSchema)
 def update_project(request, project_id: int, data: ProjectUpdateSchema):
     project = get_object_or_404(Project, id=project_id)
     for key, value in data.dict(exclude_unset=True).items():
@@ -48,20 +48,20 @@ def delete_project(request, project_id: int):
     return {"success": True}
 
 # ===== 环境管理 =====
-@router.post("/environments/", response=EnvironmentSchema)
+@router.post("/environments/", response=EnvironmentDetailSchema)
 def create_environment(request, data: EnvironmentCreateSchema):
     environment = Environment.objects.create(**data.dict())
     return environment
 
-@router.get("/environments/", response=List[EnvironmentSchema])
+@router.get("/environments/", response=List[EnvironmentDetailSchema])
 def list_environments(request):
     return Environment.objects.all()
 
-@router.get("/environments/{environment_id}/", response=EnvironmentSchema)
+@router.get("/environments/{environment_id}/", response=EnvironmentDetailSchema)
 def get_environment(request, environment_id: int):
     return get_object_or_404(Environment, id=environment_id)
 
-@router.put("/environments/{environment_id}/", response=EnvironmentSchema)
+@router.put("/environments/{environment_id}/", response=EnvironmentDetailSchema)
 def update_environment(request, environment_id: int, data: EnvironmentUpdateSchema):
     environment = get_object_or_404(Environment, id=environment_id)
     for key, value in data.dict(exclude_unset=True).items():
@@ -76,20 +76,20 @@ def delete_environment(request, environment_id: int):
     return {"success": True}
 
 # ===== 变量集管理 =====
-@router.post("/variable-sets/", response=VariableSetSchema)
+@router.post("/variable-sets/", response=VariableSetDetailSchema)
 def create_variable_set(request, data: VariableSetCreateSchema):
     variable_set = VariableSet.objects.create(**data.dict())
     return variable_set
 
-@router.get("/variable-sets/", response=List[VariableSetSchema])
+@router.get("/variable-sets/", response=List[VariableSetDetailSchema])
 def list_variable_sets(request):
     return VariableSet.objects.all()
 
-@router.get("/variable-sets/{variable_set_id}/", response=VariableSetSchema)
+@router.get("/variable-sets/{variable_set_id}/", response=VariableSetDetailSchema)
 def get_variable_set(request, variable_set_id: int):
     return get_object_or_404(VariableSet, id=variable_set_id)
 
-@router.put("/variable-sets/{variable_set_id}/", response=VariableSetSchema)
+@router.put("/variable-sets/{variable_set_id}/", response=VariableSetDetailSchema)
 def update_variable_set(request, variable_set_id: int, data: VariableSetUpdateSchema):
     variable_set = get_object_or_404(VariableSet, id=variable_set_id)
     for key, value in data.dict(exclude_unset=True).items():
@@ -104,20 +104,20 @@ def delete_variable_set(request, variable_set_id: int):
     return {"success": True}
 
 # ===== 数据库管理 =====
-@router.post("/databases/", response=DatabaseSchema)
+@router.post("/databases/", response=DatabaseDetailSchema)
 def create_database(request, data: DatabaseCreateSchema):
     database = Database.objects.create(**data.dict())
     return database
 
-@router.get("/databases/", response=List[DatabaseSchema])
+@router.get("/databases/", response=List[DatabaseDetailSchema])
 def list_databases(request):
     return Database.objects.all()
 
-@router.get("/databases/{database_id}/", response=DatabaseSchema)
+@router.get("/databases/{database_id}/", response=DatabaseDetailSchema)
 def get_database(request, database_id: int):
     return get_object_or_404(Database, id=database_id)
 
-@router.put("/databases/{database_id}/", response=DatabaseSchema)
+@router.put("/databases/{database_id}/", response=DatabaseDetailSchema)
 def update_database(request, database_id: int, data: DatabaseUpdateSchema):
     database = get_object_or_404(Database, id=database_id)
     for key, value in data.dict(exclude_unset=True).items():
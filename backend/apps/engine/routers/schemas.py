@@ -1,6 +1,7 @@
+from datetime import datetime
 from ninja import Schema, ModelSchema
-from typing import Optional, List,datetime
-from models import (
+from typing import Optional, List
+from ..models import (
     Project, Environment, VariableSet, Database, ApiInterface,
     TestSuite, TestCase, TestStep, TestJob, SchedulePlan,
     CeleryTaskRecord, TestReport, CaseReport, StepReport,
@@ -27,11 +28,15 @@ class EnvironmentCreateSchema(Schema):
     project_id: int
     base_url: str
     variables: Optional[dict] = {}
+    verify_ssl: bool = True
+    proxy: Optional[str] = None
 
 class EnvironmentUpdateSchema(Schema):
     name: Optional[str]
     base_url: Optional[str]
     variables: Optional[dict]
+    verify_ssl: Optional[bool]
+    proxy: Optional[str]
 
 class EnvironmentDetailSchema(ModelSchema):
     class Config:
@@ -86,7 +91,7 @@ class ApiInterfaceCreateSchema(Schema):
     method: Optional[str] = None
     url: Optional[str] = None
     headers: Optional[dict] = {}
-    query_params: Optional[dict] = {}
+    params: Optional[dict] = {}
     body: Optional[dict] = {}
     graphql_query: Optional[str] = None
     timeout: Optional[int] = 30
@@ -99,7 +104,7 @@ class ApiInterfaceUpdateSchema(Schema):
     method: Optional[str]
     url: Optional[str]
     headers: Optional[dict]
-    query_params: Optional[dict]
+    params: Optional[dict]
     body: Optional[dict]
     graphql_query: Optional[str]
     timeout: Optional[int]
@@ -134,9 +139,11 @@ class TestCaseCreateSchema(Schema):
     environment: int
     protocol: str
     variable_set: Optional[int] = None
+    database: Optional[int] = None
     order: int = 0
     retries: int = 0
     execution_count: int = 1
+    parameters: dict = {}
     skip: bool = False
     version: str = "v1.0"
 
@@ -243,6 +250,9 @@ class CaseReportCreateSchema(Schema):
     extract_result: dict
     validator_result: List = []
     error_message: Optional[str] = None
+    row_results: List = []
+    content_hash: str = ""
+    carried_from: Optional[int] = None
 
 class CaseReportUpdateSchema(CaseReportCreateSchema):
     pass
@@ -261,6 +271,8 @@ class StepReportCreateSchema(Schema):
     extract_result: dict
     validator_result: List = []
     error_message: Optional[str] = None
+    trace_id: Optional[str] = None
+    attempts: List = []
 
 class StepReportUpdateSchema(StepReportCreateSchema):
     pass
@@ -353,3 +365,43 @@ class DataGeneratorDetailSchema(DataGeneratorCreateSchema):
     id: int
     created_at: datetime
     updated_at: datetime
+
+# ==== 接口导入 ====
+class ImportResponse(Schema):
+    success: bool
+    message: str
+    data: List[dict] = []
+
+# ==== 用例执行 ====
+class TestCaseRunSchema(Schema):
+    environment_id: Optional[int] = None
+    record: Optional[str] = None  # 录制/回放模式：record / replay / refresh
+    idempotency_key: Optional[str] = None  # 也可通过 Idempotency-Key 请求头传入
+
+class TestRunSchema(Schema):
+    run_id: int
+    case_id: int
+    status: str  # PENDING / RUNNING / SUCCESS / FAILED / CANCELLED
+    cancel_requested: bool = False
+    report_id: Optional[int] = None
+    summary: dict = {}
+    error_message: Optional[str] = None
+
+class TestRunResultsSchema(Schema):
+    run_id: int
+    status: str
+    report_id: Optional[int] = None
+    steps: List[dict] = []  # 已完成步骤：step_id / name / status / duration / attempts / timing / error_message
+
+class TestCaseRunResponse(Schema):
+    success: bool
+    message: str
+    deduplicated: bool = False
+    data: Optional[TestRunSchema] = None
+
+class TestJobRunResponse(Schema):
+    success: bool
+    message: str
+    job_id: Optional[int] = None
+    report_id: Optional[int] = None
+    summary: dict = {}
@@ -1,38 +1,31 @@
 import logging
-from typing import List, Dict, Any, Optional
-from ninja import Router, File
+from typing import List, Dict, Any
+from ninja import Router, File, Body
 from ninja.files import UploadedFile
-from typing import List
 from django.shortcuts import get_object_or_404
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from apps.engine.utils.apifox_importer import ApifoxImporter
+from ..core.graphql.document import check_variables, document_cache
+from ..core.graphql.requester import GraphQLRequester
+from ..core.common.plan import build_interface_request
+from ..core.http.client_pool import client_registry
 
-from ..models import TestSuite, TestCase, TestStep, TestJob, TestReport, TestInterface, ApiInterface
+from ..models import TestSuite, TestCase, TestJob, ApiInterface, Environment
 from .schemas import (
     ImportResponse,
-    InterfaceSchema,
-    CreateInterfaceSchema,
-    UpdateInterfaceSchema,
-    InterfaceResponseSchema,
-    CreateTestSuiteSchema,
-    UpdateTestSuiteSchema,
-    TestSuiteResponseSchema,
-    CreateTestCaseSchema,
-    UpdateTestCaseSchema,
-    TestCaseResponseSchema,
-    CreateTestJobSchema,
-    UpdateTestJobSchema,
-    TestJobResponseSchema,
-    ApiInterfaceSchema,
+    ApiInterfaceDetailSchema,
     ApiInterfaceCreateSchema,
     ApiInterfaceUpdateSchema,
-    TestCaseSchema,
-    TestCaseCreateSchema,
-    TestCaseUpdateSchema,
-    TestSuiteSchema,
+    TestSuiteDetailSchema,
     TestSuiteCreateSchema,
     TestSuiteUpdateSchema,
+    TestCaseDetailSchema,
+    TestCaseCreateSchema,
+    TestCaseUpdateSchema,
+    TestJobDetailSchema,
+    TestJobCreateSchema,
+    TestJobUpdateSchema,
 )
 from tsadmin.utils.fu_auth import require_permissions, AuthBearer
 # from django.contrib.auth.decorators import login_required
@@ -43,12 +36,12 @@ router = Router(tags=["engine"], auth=AuthBearer()) # 使用自定义认证类
 
 # 定义导入接口
 @router.post("/import/apifox/file", response=ImportResponse)
-def import_apifox_file(request, file: UploadedFile = File(...)):
+def import_apifox_file(request, project_id: int, file: UploadedFile = File(...)):
     """
-    通过上传文件导入 Apifox 接口
+    通过上传文件导入 Apifox 接口到指定项目
     """
     try:
-        importer = ApifoxImporter()
+        importer = ApifoxImporter(project_id)
         
         # 保存上传的文件
         file_path = default_storage.save(f'apifox_imports/{file.name}', ContentFile(file.read()))
@@ -81,12 +74,12 @@ def import_apifox_file(request, file: UploadedFile = File(...)):
 
 # 定义 JSON 导入接口
 @router.post("/import/apifox/json", response=ImportResponse)
-def import_apifox_json(request, data: Dict[str, Any]):
+def import_apifox_json(request, project_id: int, data: Dict[str, Any]):
     """
-    通过 JSON 数据导入 Apifox 接口
+    通过 JSON 数据导入 Apifox 接口到指定项目
     """
     try:
-        importer = ApifoxImporter()
+        importer = ApifoxImporter(project_id)
         imported_interfaces = importer.import_from_json(data)
         
         # 返回导入结果
@@ -108,49 +101,12 @@ def import_apifox_json(request, data: Dict[str, Any]):
             'message': f'导入失败: {str(e)}'
         }
 # ==== 单接口 API ====
-
-@router.get("/interface", response=List[InterfaceResponseSchema])
-def list_interfaces(request):
-    """获取所有单接口"""
-    return TestInterface.objects.all()
-
-
-@router.post("/interface", response=InterfaceResponseSchema)
-# @login_required
-def create_interface(request, data: CreateInterfaceSchema):
-    """创建单接口"""
-    api = TestInterface.objects.create(**data.dict())
-    return api
-
-
-@router.get("/interface/{interface_id}", response=InterfaceResponseSchema)
-def get_interface(request, interface_id: int):
-    """获取单个单接口"""
-    return get_object_or_404(TestInterface, id=interface_id)
-
-
-@router.put("/interface/{interface_id}", response=InterfaceResponseSchema)
-def update_interface(request, interface_id: int, data: UpdateInterfaceSchema):
-    """更新单接口"""
-    api = get_object_or_404(TestInterface, id=interface_id)
-    for attr, value in data.dict().items():
-        setattr(api, attr, value)
-    api.save()
-    return api
-
-
-@router.delete("/interface/{interface_id}")
-def delete_interface(request, interface_id: int):
-    """删除单接口"""
-    api = get_object_or_404(TestInterface, id=interface_id)
-    api.delete()
-    return {"success": True}
-
+# 接口的增删改查见下方 ApiInterface 管理（/interfaces/）
 
 @router.post("/interface/{interface_id}/upload", response=dict)
 def upload_file(request, interface_id: int, file: UploadedFile = File(...)):
     """上传文件到单接口"""
-    api = get_object_or_404(TestInterface, id=interface_id)
+    api = get_object_or_404(ApiInterface, id=interface_id)
     # 假设文件内容需要存储到接口的 `mock_response` 字段
     api.mock_response = {"file_name": file.name, "file_size": file.size}
     api.save()
@@ -158,34 +114,44 @@ def upload_file(request, interface_id: int, file: UploadedFile = File(...)):
 
 
 @router.post("/interface/{interface_id}/graphql", response=dict)
-def execute_graphql_query(request, interface_id: int, query: str):
-    """执行 GraphQL 查询"""
-    api = get_object_or_404(TestInterface, id=interface_id)
-    if api.protocol != "GraphQL":
+def execute_graphql_query(
+    request, interface_id: int, environment_id: int = None, query: str = None, variables: Dict[str, Any] = Body(None)
+):
+    """执行 GraphQL 查询，variables 为请求体；未传 query / variables 时使用接口保存的查询与 body；按 environment_id 的 base_url、变量、TLS 与代理发送"""
+    api = get_object_or_404(ApiInterface, id=interface_id)
+    if api.protocol != "GRAPHQL":
         return {"error": "该接口不是 GraphQL 类型"}
-    # 模拟 GraphQL 查询执行
-    response = {"data": {"message": "GraphQL 查询成功", "query": query}}
-    return response
+    environment = get_object_or_404(Environment, id=environment_id) if environment_id else None
+    try:
+        graphql_request, key = build_interface_request(api, environment, query, variables)
+        if "document" not in graphql_request:
+            return {"error": "未提供 GraphQL 查询"}
+        check_variables(document_cache.get(graphql_request["document"]), graphql_request["variables"])
+        response = GraphQLRequester(client_registry.get_client(key)).send_request(graphql_request)
+    except Exception as e:
+        logger.error(f"执行 GraphQL 查询时发生错误: {str(e)}")
+        return {"error": str(e)}
+    return {"status_code": response["status_code"], "body": response["body"].parse()}
 
 # ==== 测试套件 ====
-@router.get("/test-suites", response=List[TestSuiteResponseSchema])
+@router.get("/test-suites", response=List[TestSuiteDetailSchema])
 def list_test_suites(request):
     return TestSuite.objects.all()
 
 
-@router.post("/test-suites", response=TestSuiteResponseSchema)
-def create_test_suite(request, data: CreateTestSuiteSchema):
+@router.post("/test-suites", response=TestSuiteDetailSchema)
+def create_test_suite(request, data: TestSuiteCreateSchema):
     suite = TestSuite.objects.create(**data.dict())
     return suite
 
 
-@router.get("/test-suites/{suite_id}", response=TestSuiteResponseSchema)
+@router.get("/test-suites/{suite_id}", response=TestSuiteDetailSchema)
 def get_test_suite(request, suite_id: int):
     return get_object_or_404(TestSuite, id=suite_id)
 
 
-@router.put("/test-suites/{suite_id}", response=TestSuiteResponseSchema)
-def update_test_suite(request, suite_id: int, data: UpdateTestSuiteSchema):
+@router.put("/test-suites/{suite_id}", response=TestSuiteDetailSchema)
+def update_test_suite(request, suite_id: int, data: TestSuiteUpdateSchema):
     suite = get_object_or_404(TestSuite, id=suite_id)
     for attr, value in data.dict().items():
         setattr(suite, attr, value)
@@ -201,27 +167,27 @@ def delete_test_suite(request, suite_id: int):
 
 
 # ==== 测试用例 ====
-@router.get("/test-cases", response=List[TestCaseResponseSchema])
+@router.get("/test-cases", response=List[TestCaseDetailSchema])
 def list_test_cases(request):
     """获取所有测试用例"""
     return TestCase.objects.all()
 
 
-@router.post("/test-cases", response=TestCaseResponseSchema)
-def create_test_case(request, data: CreateTestCaseSchema):
+@router.post("/test-cases", response=TestCaseDetailSchema)
+def create_test_case(request, data: TestCaseCreateSchema):
     """创建测试用例"""
     test_case = TestCase.objects.create(**data.dict())
     return test_case
 
 
-@router.get("/test-cases/{case_id}", response=TestCaseResponseSchema)
+@router.get("/test-cases/{case_id}", response=TestCaseDetailSchema)
 def get_test_case(request, case_id: int):
     """获取单个测试用例"""
     return get_object_or_404(TestCase, id=case_id)
 
 
-@router.put("/test-cases/{case_id}", response=TestCaseResponseSchema)
-def update_test_case(request, case_id: int, data: UpdateTestCaseSchema):
+@router.put("/test-cases/{case_id}", response=TestCaseDetailSchema)
+def update_test_case(request, case_id: int, data: TestCaseUpdateSchema):
     """更新测试用例"""
     test_case = get_object_or_404(TestCase, id=case_id)
     for attr, value in data.dict().items():
@@ -239,24 +205,24 @@ def delete_test_case(request, case_id: int):
 
 
 # ==== 测试任务 ====
-@router.get("/test-jobs", response=List[TestJobResponseSchema])
+@router.get("/test-jobs", response=List[TestJobDetailSchema])
 def list_test_jobs(request):
     return TestJob.objects.all()
 
 
-@router.post("/test-jobs", response=TestJobResponseSchema)
-def create_test_job(request, data: CreateTestJobSchema):
+@router.post("/test-jobs", response=TestJobDetailSchema)
+def create_test_job(request, data: TestJobCreateSchema):
     job = TestJob.objects.create(**data.dict())
     return job
 
 
-@router.get("/test-jobs/{job_id}", response=TestJobResponseSchema)
+@router.get("/test-jobs/{job_id}", response=TestJobDetailSchema)
 def get_test_job(request, job_id: int):
     return get_object_or_404(TestJob, id=job_id)
 
 
-@router.put("/test-jobs/{job_id}", response=TestJobResponseSchema)
-def update_test_job(request, job_id: int, data: UpdateTestJobSchema):
+@router.put("/test-jobs/{job_id}", response=TestJobDetailSchema)
+def update_test_job(request, job_id: int, data: TestJobUpdateSchema):
     job = get_object_or_404(TestJob, id=job_id)
     for attr, value in data.dict().items():
         setattr(job, attr, value)
@@ -272,23 +238,23 @@ def delete_test_job(request, job_id: int):
 
 
 # ===== ApiInterface 管理 =====
-@router.post("/interfaces/", response=ApiInterfaceSchema)
+@router.post("/interfaces/", response=ApiInterfaceDetailSchema)
 def create_api_interface(request, data: ApiInterfaceCreateSchema):
     """创建接口"""
     interface = ApiInterface.objects.create(**data.dict())
     return interface
 
-@router.get("/interfaces/", response=List[ApiInterfaceSchema])
+@router.get("/interfaces/", response=List[ApiInterfaceDetailSchema])
 def list_api_interfaces(request):
     """获取所有接口"""
     return ApiInterface.objects.all()
 
-@router.get("/interfaces/{interface_id}/", response=ApiInterfaceSchema)
+@router.get("/interfaces/{interface_id}/", response=ApiInterfaceDetailSchema)
 def get_api_interface(request, interface_id: int):
     """获取单个接口"""
     return get_object_or_404(ApiInterface, id=interface_id)
 
-@router.put("/interfaces/{interface_id}/", response=ApiInterfaceSchema)
+@router.put("/interfaces/{interface_id}/", response=ApiInterfaceDetailSchema)
 def update_api_interface(request, interface_id: int, data: ApiInterfaceUpdateSchema):
     """更新接口"""
     interface = get_object_or_404(ApiInterface, id=interface_id)
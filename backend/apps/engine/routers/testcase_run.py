@@ -1,189 +1,123 @@
 import logging
-from typing import Dict, Any, Optional
 from ninja import Router
 from django.shortcuts import get_object_or_404
-from django.db import transaction
-from ..models import TestCase, TestStep, TestReport, CaseReport, StepReport
-from ..utils.variable_handler import VariableHandler
-from ..utils.sql_executor import SQLExecutor
-from ..utils.assertion_handler import AssertionHandler
-from ..utils.api_request import APIRequest
+from ..models import ApiInterface, TestCase, TestJob, TestRun, Environment, TestReport
+from ..core.common.report import interface_latency, report_latency
+from ..core.common.runs import FINISHED, cancel_run, submit_job, submit_run
+from ..core.common.assertion import assertion_pool
+from ..core.common.config import engine_setting
+from ..core.common.db_executor import db_pools
+from ..core.common.expression import expression_cache
+from ..core.graphql.document import document_cache
+from ..core.http.client_pool import client_registry
+from ..core.http.recorder import RecordStore, record_dir
 from .schemas import (
     TestCaseRunSchema,
     TestCaseRunResponse,
-    StepResultSchema,
-    CaseResultSchema
+    TestJobRunResponse,
+    TestRunSchema,
+    TestRunResultsSchema
 )
 
 logger = logging.getLogger(__name__)
 router = Router()
 
-class TestCaseRunner:
-    def __init__(self, test_case: TestCase, environment_id: int):
-        self.test_case = test_case
-        self.environment_id = environment_id
-        self.variable_handler = VariableHandler()
-        self.sql_executor = SQLExecutor()
-        self.assertion_handler = AssertionHandler()
-        self.api_request = APIRequest()
-        self.step_results = []
-        self.case_result = None
-
-    def run(self) -> CaseResultSchema:
-        """执行测试用例"""
-        try:
-            # 1. 加载测试用例和相关配置
-            self._load_test_case_config()
-            
-            # 2. 执行前置 SQL 脚本
-            self._execute_pre_sql()
-            
-            # 3. 执行测试步骤
-            for step in self.test_case.steps.all().order_by('order'):
-                step_result = self._execute_step(step)
-                self.step_results.append(step_result)
-            
-            # 4. 执行后置 SQL 脚本
-            self._execute_post_sql()
-            
-            # 5. 生成测试报告
-            self.case_result = self._generate_report()
-            
-            return self.case_result
-            
-        except Exception as e:
-            logger.error(f"执行测试用例时发生错误: {str(e)}")
-            raise
-
-    def _load_test_case_config(self):
-        """加载测试用例配置"""
-        # 加载环境变量
-        self.variable_handler.load_environment_variables(self.environment_id)
-        
-        # 加载变量集
-        if self.test_case.variable_set:
-            self.variable_handler.load_variable_set(self.test_case.variable_set.id)
-        
-        # 加载测试用例变量
-        self.variable_handler.load_test_case_variables(self.test_case.id)
-
-    def _execute_pre_sql(self):
-        """执行前置 SQL 脚本"""
-        if self.test_case.pre_sql:
-            self.sql_executor.execute_sql(
-                self.test_case.pre_sql,
-                self.test_case.database,
-                self.variable_handler.get_variables()
-            )
-
-    def _execute_step(self, step: TestStep) -> StepResultSchema:
-        """执行单个测试步骤"""
-        try:
-            # 1. 处理变量替换
-            processed_request = self.variable_handler.replace_variables(step.request_config)
-            
-            # 2. 发送 API 请求
-            response = self.api_request.send_request(
-                step.api_interface,
-                processed_request,
-                self.variable_handler.get_variables()
-            )
-            
-            # 3. 提取响应数据
-            extracted_data = self.variable_handler.extract_data(
-                response,
-                step.extractors
-            )
-            
-            # 4. 执行断言
-            assertion_results = self.assertion_handler.validate(
-                response,
-                step.validators,
-                self.variable_handler.get_variables()
-            )
-            
-            # 5. 记录步骤结果
-            return StepResultSchema(
-                step_id=step.id,
-                status="PASS" if all(r.success for r in assertion_results) else "FAIL",
-                request=processed_request,
-                response=response,
-                extracted_data=extracted_data,
-                assertion_results=assertion_results,
-                error_message=None
-            )
-            
-        except Exception as e:
-            logger.error(f"执行测试步骤时发生错误: {str(e)}")
-            return StepResultSchema(
-                step_id=step.id,
-                status="ERROR",
-                request=processed_request,
-                response=None,
-                extracted_data={},
-                assertion_results=[],
-                error_message=str(e)
-            )
-
-    def _execute_post_sql(self):
-        """执行后置 SQL 脚本"""
-        if self.test_case.post_sql:
-            self.sql_executor.execute_sql(
-                self.test_case.post_sql,
-                self.test_case.database,
-                self.variable_handler.get_variables()
-            )
-
-    def _generate_report(self) -> CaseResultSchema:
-        """生成测试报告"""
-        # 计算用例状态
-        step_statuses = [result.status for result in self.step_results]
-        case_status = "PASS" if all(status == "PASS" for status in step_statuses) else "FAIL"
-        
-        # 创建测试报告
-        with transaction.atomic():
-            # 创建主报告
-            report = TestReport.objects.create(
-                test_case=self.test_case,
-                status=case_status,
-                environment_id=self.environment_id
-            )
-            
-            # 创建用例报告
-            case_report = CaseReport.objects.create(
-                report=report,
-                test_case=self.test_case,
-                status=case_status
-            )
-            
-            # 创建步骤报告
-            for step_result in self.step_results:
-                StepReport.objects.create(
-                    case_report=case_report,
-                    step_id=step_result.step_id,
-                    status=step_result.status,
-                    request=step_result.request,
-                    response=step_result.response,
-                    extracted_data=step_result.extracted_data,
-                    assertion_results=step_result.assertion_results,
-                    error_message=step_result.error_message
-                )
-        
-        return CaseResultSchema(
-            case_id=self.test_case.id,
-            status=case_status,
-            step_results=self.step_results,
-            report_id=report.id
-        )
+def run_schema(run: TestRun) -> TestRunSchema:
+    return TestRunSchema(
+        run_id=run.id,
+        case_id=run.testcase_id,
+        status=run.status,
+        cancel_requested=run.cancel_requested,
+        report_id=run.report_id,
+        summary=run.summary,
+        error_message=run.error_message
+    )
 
 @router.post("/test-cases/{case_id}/run", response=TestCaseRunResponse)
 def run_test_case(request, case_id: int, data: TestCaseRunSchema):
-    """执行测试用例"""
+    """提交执行测试用例，立即返回运行 ID；进度通过 /runs/{run_id} 查询或订阅 events/run/{run_id}
+    相同幂等键（Idempotency-Key 请求头或 idempotency_key，缺省为用例+环境+录制模式）在 RUN_DEDUP_WINDOW 秒内只执行一次"""
     test_case = get_object_or_404(TestCase, id=case_id)
-    runner = TestCaseRunner(test_case, data.environment_id)
-    result = runner.run()
+    environment = get_object_or_404(Environment, id=data.environment_id) if data.environment_id else None
+    key = request.headers.get("Idempotency-Key") or data.idempotency_key
+    run, deduplicated = submit_run(test_case, environment, data.record, key)
     return TestCaseRunResponse(
         success=True,
-        message="测试用例执行完成",
-        data=result
+        message="已有相同的运行" if deduplicated else "测试用例已提交执行",
+        deduplicated=deduplicated,
+        data=run_schema(run)
     )
+
+@router.get("/runs/{run_id}", response=TestRunSchema)
+def get_run(request, run_id: int):
+    """查询运行状态"""
+    return run_schema(get_object_or_404(TestRun, id=run_id))
+
+@router.post("/runs/{run_id}/cancel", response=TestCaseRunResponse)
+def cancel_test_run(request, run_id: int):
+    """取消运行：排队中的直接取消，执行中的在下一个步骤前停止，剩余步骤记为 SKIP"""
+    run = get_object_or_404(TestRun, id=run_id)
+    if run.status in FINISHED:
+        return TestCaseRunResponse(success=False, message="运行已结束", data=run_schema(run))
+    run = cancel_run(run_id)
+    return TestCaseRunResponse(success=True, message="已请求取消", data=run_schema(run))
+
+@router.get("/runs/{run_id}/results", response=TestRunResultsSchema)
+def get_run_results(request, run_id: int):
+    """已完成步骤的结果，执行中每 PROGRESS_INTERVAL 秒更新；完整结果见 report_id 对应的报告"""
+    run = get_object_or_404(TestRun, id=run_id)
+    return TestRunResultsSchema(run_id=run.id, status=run.status, report_id=run.report_id, steps=run.partial)
+
+@router.post("/test-jobs/{job_id}/run", response=TestJobRunResponse)
+def run_test_job(request, job_id: int, distributed: bool = False, shards: int = None, smart: bool = False):
+    """提交执行测试任务，立即返回报告 ID；parallel=True 时用例并发执行；distributed=True 时分片到 Celery worker 执行；
+    smart=True 时只执行上次未通过或定义有变更的用例。进度见任务状态或订阅 events/job/{job_id}"""
+    job = get_object_or_404(TestJob, id=job_id)
+    report = submit_job(job, distributed, shards, smart)
+    return TestJobRunResponse(
+        success=True,
+        message="测试任务已提交执行",
+        job_id=job.id,
+        report_id=report.id
+    )
+
+@router.get("/reports/{report_id}/latency", response=dict)
+def get_report_latency(request, report_id: int):
+    """报告整体与各接口的耗时 p50/p90/p99/max，按 p99 降序"""
+    return report_latency(get_object_or_404(TestReport, id=report_id))
+
+@router.get("/interfaces/{interface_id}/latency", response=dict)
+def get_interface_latency(request, interface_id: int, runs: int = None):
+    """接口最近若干次执行的耗时分位数及合并结果，用于发现尾延迟回退"""
+    get_object_or_404(ApiInterface, id=interface_id)
+    return interface_latency(interface_id, runs or engine_setting("LATENCY_HISTORY_RUNS"))
+
+@router.get("/http-pools", response=list)
+def list_http_pools(request):
+    """查看 HTTP 连接池占用情况"""
+    return client_registry.metrics()
+
+@router.get("/db-pools", response=list)
+def list_db_pools(request):
+    """查看被测数据库连接池"""
+    return db_pools.metrics()
+
+@router.get("/expression-cache", response=dict)
+def get_expression_cache_stats(request):
+    """查看 JMESPath 编译缓存命中情况"""
+    return expression_cache.stats()
+
+@router.get("/assertion-pool", response=dict)
+def get_assertion_pool_stats(request):
+    """查看自定义断言进程池与脚本编译缓存"""
+    return assertion_pool.metrics()
+
+@router.get("/graphql-documents", response=dict)
+def get_graphql_document_stats(request):
+    """查看 GraphQL 文档解析缓存命中情况"""
+    return document_cache.stats()
+
+@router.get("/records", response=dict)
+def get_record_stats(request):
+    """查看录制目录中的条目数与占用空间"""
+    return RecordStore(record_dir()).stats()
@@ -0,0 +1,54 @@
+# 依赖反向索引的增量维护：步骤、接口、Hook 变更时重建受影响步骤的索引条目
+# 通过 QuerySet.update / bulk_create 的批量修改不会触发信号，需调用 dependency_index.rebuild()
+import logging
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .core.common import dependency_index
+from .models import ApiInterface, HookTemplate, StepHook, StepIndexEntry, TestCase, TestStep
+
+logger = logging.getLogger(__name__)
+
+
+def _reindex(queryset):
+    try:
+        dependency_index.index_steps(queryset)
+    except Exception as e:
+        logger.error(f"更新依赖索引时出错: {str(e)}")
+
+
+@receiver(post_save, sender=TestStep)
+def index_step(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _reindex(TestStep.objects.filter(id=instance.id))
+
+
+@receiver(post_save, sender=ApiInterface)
+def index_interface_steps(sender, instance, raw=False, **kwargs):
+    """接口的方法、地址、请求体变化会影响端点与变量条目"""
+    if not raw:
+        _reindex(TestStep.objects.filter(api_interface_id=instance.id))
+
+
+@receiver(post_delete, sender=ApiInterface)
+def unindex_interface(sender, instance, **kwargs):
+    # 步骤外键已置空，按旧条目找到受影响的步骤重建
+    step_ids = StepIndexEntry.objects.filter(kind="INTERFACE", key=str(instance.id)).values_list("step_id", flat=True)
+    _reindex(TestStep.objects.filter(id__in=list(step_ids)))
+
+
+@receiver(post_save, sender=TestCase)
+def move_case(sender, instance, raw=False, **kwargs):
+    if not raw:
+        dependency_index.move_case(instance)
+
+
+@receiver([post_save, post_delete], sender=StepHook)
+def index_hook_step(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _reindex(TestStep.objects.filter(id=instance.step_id))
+
+
+@receiver(post_save, sender=HookTemplate)
+def index_template_steps(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _reindex(TestStep.objects.filter(hook_scripts__hook_template_id=instance.id).distinct())
@@ -0,0 +1,33 @@
+# Celery 任务
+from celery import shared_task
+from django.utils import timezone
+from .core.common.distributed import run_shard
+from .core.common.runs import execute_job, execute_run
+from .models import CeleryTaskRecord
+
+
+@shared_task(bind=True)
+def run_job_shard(self, job_id: int, report_id: int, shard: int, case_ids: list, key: str):
+    """执行任务的一个分片，用例结果写入结果流，由协调者合并"""
+    records = CeleryTaskRecord.objects.filter(task_id=self.request.id)
+    records.update(status="RUNNING", started_at=timezone.now())
+    try:
+        run_shard(job_id, report_id, shard, case_ids, key)
+    except Exception:
+        records.update(status="FAILURE", finished_at=timezone.now())
+        raise
+    records.update(status="SUCCESS", finished_at=timezone.now())
+    return {"shard": shard, "cases": len(case_ids)}
+
+
+@shared_task
+def run_test_case(run_id: int):
+    """执行一次提交的用例运行，状态与结果写回 TestRun"""
+    execute_run(run_id)
+
+
+@shared_task
+def run_test_job(job_id: int, report_id: int, distributed: bool = False, shards: int = None, smart: bool = False):
+    """执行测试任务；分布式执行时作为协调者投递分片并合并结果"""
+    report = execute_job(job_id, report_id, distributed, shards, smart)
+    return {"report_id": report.id, "summary": report.summary}
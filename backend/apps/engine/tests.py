@@ -1,172 +1,2072 @@
-from django.urls import reverse
-from ninja import NinjaAPI
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+from django.core.files.storage import FileSystemStorage
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
 from ninja.testing import TestClient
-from .models import TestInterface, TestSuite, TestCase, TestJob
-from .schemas import CreateInterfaceSchema, CreateTestSuiteSchema, CreateTestCaseSchema, CreateTestJobSchema
-
-# 创建 Ninja API 实例
-api = NinjaAPI()
-
-class APITests(TestClient):
-
-    def setUp(self):
-        # 创建测试数据
-        self.test_interface_data = {
-            "name": "Test Interface",
-            "protocol": "HTTP",
-            "method": "GET",
-            "url": "https://uppapi.bbxlk.cc/api/payees/template?payment_channel=WF&currency=GBP&region=GB",
-            "headers": {"Content-Type": "application/json"},
-            "body": {},
-            "query_params": {},
-            "timeout": 30,
-            "is_mock": False,
-            "mock_response": {}
-        }
-        self.test_suite_data = {
-            "name": "Test Suite",
-            "tags": ["tag1", "tag2"],
-            "is_public": True,
-            "parent": None
-        }
-        self.test_case_data = {
-            "name": "Test Case",
-            "suite": 1,  # 假设 suite ID 为 1
-            "api": None,
-            "protocol": "HTTP",
-            "request_config": {},
-            "variables": {},
-            "extractors": [],
-            "validators": [],
-            "setup_hooks": [],
-            "teardown_hooks": [],
-            "order": 1,
-            "retries": 0,
-            "version": "1.0"
+
+from tsadmin.celery import app as celery_app
+from tsadmin.utils.fu_auth import AuthBearer
+
+from .core.common import dependency_index, report as report_module, retry as retry_module, runs
+from .core.common.assertion import AssertionPool, AssertionScript, AssertionTimeout, ScriptCache, script_digest
+from .core.common.dag import build_step_graph
+from .core.common.db_executor import DatabasePool, DatabasePoolRegistry, SqlStatement
+from .core.common.dispatcher import EngineDispatcher
+from .core.common.distributed import DistributedJobRunner, split_round_robin
+from .core.common.expression import ExpressionCache, precompile_step
+from .core.common.histogram import LatencyHistogram, merge_encoded, step_histogram
+from .core.common.parameters import case_rows, expand_matrix
+from .core.common.plan import CasePlan, PlanCompiler, StepPlan, build_interface_request, hoist_setup_hooks
+from .core.common.prepost import normalize_hook
+from .core.common.report import ReportWriter, bulk_write_case_reports, interface_latency, report_latency
+from .core.common.retry import RetryPolicy
+from .core.common.runner import JobRunner
+from .core.common.sharding import plan_lpt
+from .core.common.stream import MemoryResultStream
+from .core.common.template import TemplateCache, compile_template
+from .core.common.variables import ScopeRegistry, VariableContext
+from .core.events.bus import event_worker, get_hub, get_publisher
+from .core.events.server import mount
+from .core.graphql.document import DocumentCache, check_variables, parse_document
+from .core.graphql.requester import AsyncGraphQLRequester, GraphQLRequester
+from .core.http import client_pool, response as response_module
+from .core.http.client_pool import ClientKey
+from .core.http.recorder import Recorder, RecordMissing, RecordStore, fingerprint
+from .core.http.requester import HTTPRequester
+from .core.http.response import ResponseBody, ResponseTooLarge
+from .core.http.runner import HTTPRunner
+from .core.http.throttle import AdaptiveLimit, ThrottleRegistry, TokenBucket
+from .core.http.timing import PhaseTimer
+from .core.mock.router import PathTrie
+from .core.mock.server import MockApp, MockGateway, MockRoute
+from .models import (
+    ActionType, ApiInterface, CaseReport, CeleryTaskRecord, CustomAssertion, Environment, GlobalVariable, HookTemplate,
+    Project, StepHook, StepIndexEntry, StepReport, TestCase, TestJob, TestLog, TestReport, TestRun, TestStep, TestSuite,
+    VariableSet,
+)
+from .routers import dependency, testcase, testcase_run
+from .tasks import run_job_shard
+
+# patch 之后 httpx.AsyncClient / httpx.Client 指向替身，这里保留原始类
+_AsyncClient, _Client = httpx.AsyncClient, httpx.Client
+
+
+# ==== 接口 ====
+@override_settings(ENGINE={"RUN_BACKEND": "thread", "EVENT_BACKEND": "memory", "PROGRESS_INTERVAL": 0.01})
+class EngineRouterTests(TransactionTestCase):
+
+    def setUp(self):
+        self.project = Project.objects.create(name="api")
+        self.environment = Environment.objects.create(name="dev", project=self.project, base_url="http://svc.local")
+        suite = TestSuite.objects.create(name="suite", project=self.project)
+        action, _ = ActionType.objects.get_or_create(name="http", defaults={"display_name": "HTTP", "category": "HTTP"})
+        self.case = TestCase.objects.create(
+            name="case", suite=suite, project=self.project, environment=self.environment, protocol="HTTP",
+        )
+        self.interface = ApiInterface.objects.create(
+            name="user", project=self.project, protocol="HTTP", method="GET", url="/users/{id}",
+        )
+        TestStep.objects.create(testcase=self.case, name="step", action_type=action, api_interface=self.interface, order=0)
+        self.runs = TestClient(testcase_run.router)
+        self.deps = TestClient(dependency.router)
+        self.api = TestClient(testcase.router, headers={"Authorization": "Bearer token"})
+        patcher = mock.patch.object(AuthBearer, "authenticate", return_value={"user_id": 1})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        client_pool.client_registry.close()
+        self.addCleanup(client_pool.client_registry.close)
+
+    @mock.patch.object(runs, "enqueue_run")
+    def test_submit_status_cancel(self, enqueue_run):
+        response = self.runs.post(f"/test-cases/{self.case.id}/run", json={"environment_id": self.environment.id})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body["success"])
+        self.assertFalse(body["deduplicated"])
+        run_id = body["data"]["run_id"]
+        enqueue_run.assert_called_once()
+
+        again = self.runs.post(f"/test-cases/{self.case.id}/run", json={"environment_id": self.environment.id}).json()
+        self.assertEqual((again["data"]["run_id"], again["deduplicated"]), (run_id, True))
+        self.assertEqual(self.runs.get(f"/runs/{run_id}").json()["status"], "PENDING")
+
+        cancelled = self.runs.post(f"/runs/{run_id}/cancel").json()
+        self.assertTrue(cancelled["success"])
+        self.assertEqual(cancelled["data"]["status"], "CANCELLED")
+        self.assertEqual(self.runs.get(f"/runs/{run_id}").json()["status"], "CANCELLED")
+        self.assertFalse(self.runs.post(f"/runs/{run_id}/cancel").json()["success"])
+        self.assertEqual(self.runs.get("/runs/0").status_code, 404)
+
+    @mock.patch.object(runs, "enqueue_run")
+    def test_results_and_latency_after_run(self, enqueue_run):
+        run_id = self.runs.post(f"/test-cases/{self.case.id}/run", json={}).json()["data"]["run_id"]
+        handler = lambda request: httpx.Response(200, json={"id": 1})
+        fake = lambda **kwargs: _Client(transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"))
+        with mock.patch.object(client_pool.httpx, "Client", fake):
+            runs.execute_run(run_id)
+
+        results = self.runs.get(f"/runs/{run_id}/results").json()
+        self.assertEqual(results["status"], "SUCCESS")
+        self.assertEqual([step["status"] for step in results["steps"]], ["PASS"])
+        report_id = TestRun.objects.get(id=run_id).report_id
+        self.assertEqual(results["report_id"], report_id)
+
+        latency = self.runs.get(f"/reports/{report_id}/latency")
+        self.assertEqual(latency.status_code, 200)
+        self.assertTrue(latency.json())
+        history = self.runs.get(f"/interfaces/{self.interface.id}/latency")
+        self.assertEqual(history.status_code, 200)
+        self.assertTrue(history.json())
+        self.assertEqual(self.runs.get("/interfaces/0/latency").status_code, 404)
+
+    def test_dependency_endpoints(self):
+        impact = self.deps.get(f"/interfaces/{self.interface.id}").json()
+        self.assertEqual(impact["cases"], [self.case.id])
+        endpoint = self.deps.get("/endpoints?url=/users/42&method=GET").json()
+        self.assertEqual(endpoint["cases"], [self.case.id])
+        self.assertEqual(self.deps.get("/endpoints?url=/orders/1").json()["cases"], [])
+        self.assertGreater(self.deps.post("/rebuild").json()["entries"], 0)
+
+    def test_graphql_endpoint(self):
+        graphql = ApiInterface.objects.create(
+            name="item", project=self.project, protocol="GRAPHQL", method="POST", url="/graphql",
+            graphql_query="query Item($id: ID!) { item(id: $id) { id } }",
+        )
+        stub = GraphQLStub()
+        with mock.patch.object(client_pool.httpx, "Client", stub.client):
+            response = self.api.post(
+                f"/interface/{graphql.id}/graphql?environment_id={self.environment.id}",
+                json={"id": "7"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status_code"], 200)
+        self.assertEqual(response.json()["body"]["data"]["variables"], {"id": "7"})
+        self.assertEqual(len(stub.requests), 1)
+        # 非 GraphQL 接口与缺少必填变量都返回错误而不发请求
+        self.assertIn("error", self.api.post(f"/interface/{self.interface.id}/graphql", json={}).json())
+        self.assertIn("error", self.api.post(f"/interface/{graphql.id}/graphql", json={}).json())
+        self.assertEqual(len(stub.requests), 1)
+
+    def test_interface_crud_and_auth(self):
+        payload = {"name": "order", "project_id": self.project.id, "protocol": "HTTP", "method": "GET", "url": "/orders"}
+        created = self.api.post("/interfaces/", json=payload)
+        self.assertEqual(created.status_code, 200)
+        interface_id = created.json()["id"]
+        self.assertEqual(self.api.get(f"/interfaces/{interface_id}/").json()["url"], "/orders")
+        self.assertEqual(self.api.delete(f"/interfaces/{interface_id}/").status_code, 200)
+        self.assertFalse(ApiInterface.objects.filter(id=interface_id).exists())
+
+        AuthBearer.authenticate.return_value = None
+        self.assertEqual(self.api.get("/interfaces/").status_code, 401)
+
+
+# ==== 模板 ====
+class TemplateTests(SimpleTestCase):
+
+    def test_whole_reference_keeps_type(self):
+        template = compile_template({"id": "${id}", "ids": ["${id}", "${flag}"], "limit": 10})
+        self.assertEqual(template.render({"id": 7, "flag": None}), {"id": 7, "ids": [7, None], "limit": 10})
+        self.assertEqual(template.names, {"id", "flag"})
+
+    def test_interpolation_and_missing_variables(self):
+        template = compile_template("/users/${id}/orders/${order}?t=${id}")
+        self.assertEqual(template.render({"id": 1, "order": "a"}), "/users/1/orders/a?t=1")
+        # 未定义的变量保留原文，整串引用同样如此
+        self.assertEqual(template.render({"id": 1}), "/users/1/orders/${order}?t=1")
+        self.assertEqual(compile_template("${missing}").render({}), "${missing}")
+
+    def test_text_that_is_not_a_reference(self):
+        for text in ("$id", "${", "${}", "price: $5", "{id}", "$${id"):
+            with self.subTest(text=text):
+                self.assertEqual(compile_template(text).render({"id": 1, "": 2}), text)
+        self.assertEqual(compile_template("$${id}").render({"id": 1}), "$1")
+        self.assertEqual(compile_template("${a}${b}").render({"a": 1, "b": [2]}), "1[2]")
+
+    def test_values_are_not_rendered_again(self):
+        template = compile_template("token=${token}")
+        self.assertEqual(template.render({"token": "${secret}", "secret": "x"}), "token=${secret}")
+        self.assertEqual(compile_template("${token}").render({"token": "${secret}", "secret": "x"}), "${secret}")
+
+    def test_cache_key_invalidation(self):
+        cache = TemplateCache(maxsize=1)
+        first = cache.get((1, "v1"), {"url": "/a"})
+        self.assertIs(cache.get((1, "v1"), {"url": "/changed"}), first)
+        # 步骤修改后 updated_at 变化，按新内容编译；超出容量时淘汰旧项
+        self.assertEqual(cache.get((1, "v2"), {"url": "/b"}).render({}), {"url": "/b"})
+        self.assertIsNot(cache.get((1, "v1"), {"url": "/a"}), first)
+        self.assertIsNot(cache.get(None, "/a"), cache.get(None, "/a"))
+
+
+# ==== 变量作用域 ====
+class VariableScopeTests(SimpleTestCase):
+
+    def test_sibling_forks_are_isolated(self):
+        global_vars, env_vars = {"host": "g", "token": "g"}, {"token": "env"}
+        base = VariableContext(global_vars, env_vars)
+        first, second = base.fork({"user": "a"}), base.fork({"user": "b"})
+        first.set("token", "first")
+        first.merge({"order": 1})
+        second.set("user", "second")
+
+        self.assertEqual((first.get("token"), second.get("token"), base.get("token")), ("first", "env", "env"))
+        self.assertIsNone(second.get("order"))
+        self.assertEqual((first.get("user"), second.get("user")), ("a", "second"))
+        # 写入只落在各自的最顶层，共享的上层字典不被修改
+        self.assertEqual((first.local, second.local), ({"token": "first", "order": 1}, {"user": "second"}))
+        self.assertEqual((global_vars, env_vars), ({"host": "g", "token": "g"}, {"token": "env"}))
+
+    def test_nested_fork_sees_parent_but_does_not_write_back(self):
+        case = VariableContext(env_vars={"host": "h"}).fork({"id": 1})
+        case.set("token", "t")
+        row = case.fork({"id": 2})
+        row.set("token", "row")
+        self.assertEqual(row.resolve("${host}/${id}/${token}"), "h/2/row")
+        self.assertEqual(case.resolve("${host}/${id}/${token}"), "h/1/t")
+
+    def test_registry_shares_base_scope(self):
+        global_vars, env_vars = {"g": 1}, {"e": 2}
+        cases = [
+            SimpleNamespace(global_vars=global_vars, env_vars=env_vars, case_vars={"c": index}) for index in range(2)
+        ]
+        registry = ScopeRegistry()
+        first, second = (registry.case_context(case) for case in cases)
+        first.set("e", "changed")
+        self.assertEqual(len(registry._bases), 1)
+        self.assertEqual((first.get("c"), second.get("c"), second.get("e")), (0, 1, 2))
+        self.assertEqual(env_vars, {"e": 2})
+
+
+# ==== 表达式缓存 ====
+class ExpressionCacheTests(SimpleTestCase):
+
+    def test_hits_and_lru_eviction(self):
+        cache = ExpressionCache(maxsize=2)
+        parsed = cache.compile("body.id")
+        self.assertIs(cache.compile("body.id"), parsed)
+        self.assertEqual(cache.search("body.items[0].name", {"body": {"items": [{"name": "a"}]}}), "a")
+        # 访问 body.id 后 body.items[0].name 成为最久未用，加入第三个表达式时被淘汰
+        cache.compile("body.id")
+        cache.compile("status_code")
+        self.assertEqual(cache.stats(), {"size": 2, "maxsize": 2, "hits": 2, "misses": 3})
+        self.assertIs(cache.compile("body.id"), parsed)
+        cache.compile("body.items[0].name")
+        self.assertEqual(cache.stats()["misses"], 4)
+
+    def test_clear_invalidates(self):
+        cache = ExpressionCache(maxsize=4)
+        cache.compile("body.id")
+        cache.compile("body.id")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"size": 0, "maxsize": 4, "hits": 0, "misses": 0})
+        cache.compile("body.id")
+        self.assertEqual(cache.stats(), {"size": 1, "maxsize": 4, "hits": 0, "misses": 1})
+
+    def test_invalid_expression_fails_at_compile_time(self):
+        step = SimpleNamespace(
+            id=1, name="step", extractors=[{"key": "id", "expression": "body.id"}],
+            validators=[{"actual": "body.[", "expected": 1, "operator": "eq"}],
+        )
+        with self.assertRaisesMessage(ValueError, "body.["):
+            precompile_step(step)
+
+
+# ==== 执行计划编译 ====
+class PlanQueryTests(TransactionTestCase):
+
+    def setUp(self):
+        self.project = Project.objects.create(name="plan")
+        self.environment = Environment.objects.create(name="dev", project=self.project, base_url="http://svc.local")
+        self.suite = TestSuite.objects.create(name="root", project=self.project)
+        self.child = TestSuite.objects.create(name="child", project=self.project, parent=self.suite)
+        self.action, _ = ActionType.objects.get_or_create(
+            name="http", defaults={"display_name": "HTTP", "category": "HTTP"},
+        )
+        self.interface = ApiInterface.objects.create(
+            name="api", project=self.project, protocol="HTTP", method="GET", url="/items/${id}",
+        )
+        self.template = HookTemplate.objects.create(name="hook", hook_type="SETUP", script="print(1)")
+        self.variable_set = VariableSet.objects.create(name="rows", project=self.project, variables={"id": [1, 2]})
+        GlobalVariable.objects.create(variables={"token": "t"})
+        CustomAssertion.objects.create(name="positive", script="result = actual > 0")
+        self.job = TestJob.objects.create(
+            name="job", suite=self.suite, environment=self.environment, run_mode="ALL", result_summary={},
+        )
+
+    def _add_cases(self, count: int):
+        validators = [{"actual": "body.id", "expected": 0, "operator": "positive"}]
+        for index in range(count):
+            case = TestCase.objects.create(
+                name=f"case-{index}", suite=self.child if index % 2 else self.suite, project=self.project,
+                environment=self.environment, protocol="HTTP", order=index,
+                parameters={"variable_set": self.variable_set.id},
+            )
+            for order in range(3):
+                step = TestStep.objects.create(
+                    testcase=case, name=f"step-{order}", order=order, action_type=self.action,
+                    api_interface=self.interface, validators=validators,
+                )
+                StepHook.objects.create(step=step, hook_template=self.template, position="SETUP")
+
+    def test_query_count_does_not_grow_with_cases(self):
+        self._add_cases(2)
+        # 全局变量、套件树、用例、步骤、步骤 Hook、变量集、自定义断言各 1 次
+        with self.assertNumQueries(7):
+            plan = PlanCompiler(self.environment).compile_job(self.job)
+        self.assertEqual(len(plan.cases), 2)
+
+        self._add_cases(6)
+        with self.assertNumQueries(7):
+            plan = PlanCompiler(self.environment).compile_job(self.job)
+        self.assertEqual(len(plan.cases), 8)
+        self.assertEqual({len(case.steps) for case in plan.cases}, {3})
+        self.assertEqual({len(case.rows) for case in plan.cases}, {2})
+        self.assertIn("positive", plan.cases[0].steps[0].assertions)
+
+    def test_invalid_step_is_a_step_error(self):
+        self._add_cases(2)
+        broken = TestStep.objects.filter(testcase__name="case-0", order=1).get()
+        broken.validators = [{"actual": "body.[", "expected": 1, "operator": "eq"}]
+        broken.save()
+        graphql = ApiInterface.objects.create(name="gql", project=self.project, protocol="GRAPHQL", url="/graphql")
+        TestStep.objects.create(
+            testcase=broken.testcase, name="gql", order=3, action_type=self.action, api_interface=graphql,
+        )
+
+        # 一个步骤的表达式或 GraphQL 配置错误不影响任务内其他步骤与用例的编译
+        plan = PlanCompiler(self.environment).compile_job(self.job)
+        errors = {case.name: [step.error for step in case.steps] for case in plan.cases}
+        self.assertIsNone(errors["case-1"][0])
+        self.assertEqual([error is None for error in errors["case-0"]], [True, False, True, False])
+        self.assertIn("body.[", errors["case-0"][1])
+        self.assertIn("未配置查询", errors["case-0"][3])
+
+
+# ==== 参数化用例 ====
+class ParameterizedCaseTests(SimpleTestCase):
+
+    def setUp(self):
+        def handler(request):
+            status = 500 if request.url.path == "/items/2" else 200
+            return httpx.Response(status, json={"path": request.url.path})
+
+        async_client = httpx.AsyncClient
+        patcher = mock.patch.object(client_pool.httpx, "AsyncClient", lambda **kwargs: async_client(
+            transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"),
+        ))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rows_from_matrix_and_execution_count(self):
+        self.assertEqual(
+            expand_matrix({"currency": ["USD", "GBP"], "region": "US"}),
+            [{"currency": "USD", "region": "US"}, {"currency": "GBP", "region": "US"}],
+        )
+        self.assertIsNone(case_rows({}, 1))
+        self.assertEqual(case_rows({}, 2), ({}, {}))
+        self.assertEqual(case_rows({"rows": [{"id": 1}, {"id": 2}]}, 2), ({"id": 1}, {"id": 2}, {"id": 1}, {"id": 2}))
+        with self.assertRaises(ValueError):
+            case_rows({"variable_set": 404}, 1, {})
+        with self.assertRaises(ValueError):
+            case_rows({"rows": [1]}, 1)
+        with override_settings(ENGINE={"PARAM_MAX_ROWS": 3}), self.assertRaises(ValueError):
+            case_rows({"matrix": {"a": [1, 2], "b": [1, 2]}}, 1)
+
+    def test_per_row_results(self):
+        request = {"method": "GET", "url": "/items/${id}", "headers": {}, "params": {}, "timeout": 5}
+        step = StepPlan(
+            id=1, name="get", order=1, request=request, template=compile_template(request), extractors=(),
+            validators=({"actual": "status_code", "expected": 200, "operator": "eq"},), assertions={},
+            setup_hooks=(), teardown_hooks=(), retry=RetryPolicy(), skip=False,
+        )
+        case = CasePlan(
+            id=1, name="case", order=1, base_url="http://svc.local", verify_ssl=True, steps=(step,),
+            global_vars={}, env_vars={}, case_vars={}, retries=0, rows=({"id": 1}, {"id": 2}, {"id": 3}),
+        )
+        result = EngineDispatcher().run_sync([case])[0]
+
+        self.assertEqual(result["status"], "FAIL")
+        self.assertEqual(result["error_message"], "1/3 组参数未通过")
+        self.assertEqual(
+            [(row["index"], row["params"], row["status"], row["failed_step"]) for row in result["rows"]],
+            [(0, {"id": 1}, "PASS", None), (1, {"id": 2}, "FAIL", "get"), (2, {"id": 3}, "PASS", None)],
+        )
+        # 保留首个未通过行的步骤详情，带上所有行的耗时直方图
+        self.assertEqual(result["steps"][0]["response"]["status_code"], 500)
+        self.assertIn("latency", result["steps"][0])
+
+
+# ==== 并发执行 ====
+def _host_case(pk, base_url):
+    request = {"method": "GET", "url": f"/cases/{pk}", "headers": {}, "params": {}, "timeout": 5}
+    step = StepPlan(
+        id=pk, name="get", order=1, request=request, template=compile_template(request), extractors=(),
+        validators=(), assertions={}, setup_hooks=(), teardown_hooks=(), retry=RetryPolicy(), skip=False,
+    )
+    return CasePlan(
+        id=pk, name=f"case-{pk}", order=pk, base_url=base_url, verify_ssl=True, steps=(step,),
+        global_vars={}, env_vars={}, case_vars={}, retries=0,
+    )
+
+
+@override_settings(ENGINE={"ADAPTIVE_CONCURRENCY": False})
+class JobConcurrencyTests(SimpleTestCase):
+
+    def setUp(self):
+        self.running = Counter()
+        self.peak = Counter()
+
+        async def handler(request):
+            host = request.url.host
+            self.running[host] += 1
+            self.running["*"] += 1
+            self.peak[host] = max(self.peak[host], self.running[host])
+            self.peak["*"] = max(self.peak["*"], self.running["*"])
+            await asyncio.sleep(0.02)
+            self.running[host] -= 1
+            self.running["*"] -= 1
+            return httpx.Response(200, json={})
+
+        async_client = httpx.AsyncClient
+        patcher = mock.patch.object(client_pool.httpx, "AsyncClient", lambda **kwargs: async_client(
+            transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"),
+        ))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _cases(self, count=12):
+        return [_host_case(pk, "http://a.local" if pk % 2 else "http://b.local") for pk in range(count)]
+
+    def test_global_limit(self):
+        results = EngineDispatcher(is_async=True, max_concurrency=3, per_host_limit=10).run(self._cases())
+        self.assertEqual([result["case_id"] for result in results], list(range(12)))
+        self.assertTrue(all(result["status"] == "PASS" for result in results))
+        self.assertEqual(self.peak["*"], 3)
+
+    def test_per_host_limit(self):
+        EngineDispatcher(is_async=True, max_concurrency=20, per_host_limit=2).run(self._cases())
+        self.assertEqual((self.peak["a.local"], self.peak["b.local"]), (2, 2))
+        self.assertEqual(self.peak["*"], 4)
+
+    def test_sync_dispatch_is_serial(self):
+        running = Counter()
+
+        def handler(request):
+            running["*"] += 1
+            self.peak["*"] = max(self.peak["*"], running["*"])
+            time.sleep(0.005)
+            running["*"] -= 1
+            return httpx.Response(200, json={})
+
+        client = httpx.Client
+        with mock.patch.object(client_pool.httpx, "Client", lambda **kwargs: client(
+            transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"),
+        )):
+            results = EngineDispatcher().run(self._cases(4))
+        self.assertEqual([result["status"] for result in results], ["PASS"] * 4)
+        self.assertEqual(self.peak["*"], 1)
+
+
+# ==== 连接池 ====
+class ClientRegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.created = []
+
+        def client(**kwargs):
+            self.created.append(kwargs)
+            return _Client(
+                transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+                event_hooks=kwargs.get("event_hooks"),
+            )
+
+        patcher = mock.patch.object(client_pool.httpx, "Client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.registry = client_pool.ClientRegistry()
+        self.addCleanup(self.registry.close)
+
+    def test_client_reused_across_cases(self):
+        registry = client_pool.client_registry
+        registry.close()
+        self.addCleanup(registry.close)
+        results = EngineDispatcher().run([_host_case(pk, "http://a.local") for pk in range(3)])
+        self.assertEqual([result["status"] for result in results], ["PASS"] * 3)
+        self.assertEqual(len(self.created), 1)
+        metrics = [item for item in registry.metrics() if item["type"] == "sync"]
+        self.assertEqual([(item["base_url"], item["requests"]) for item in metrics], [("http://a.local", 3)])
+
+    def test_keyed_by_host_and_tls_settings(self):
+        keys = [
+            ClientKey("http://a.local"), ClientKey("http://b.local"),
+            ClientKey("http://a.local", verify=False), ClientKey("http://a.local", proxy="http://proxy.local:3128"),
+        ]
+        clients = [self.registry.get_client(key) for key in keys]
+        self.assertEqual(len({id(client) for client in clients}), 4)
+        self.assertIs(self.registry.get_client(ClientKey("http://a.local")), clients[0])
+        self.assertEqual([(options["verify"], options["proxy"]) for options in self.created],
+                         [(True, None), (True, None), (False, None), (True, "http://proxy.local:3128")])
+
+    def test_closed_client_is_replaced(self):
+        client = self.registry.get_client()
+        client.close()
+        self.assertIsNot(self.registry.get_client(), client)
+        self.assertEqual(len(self.registry.metrics()), 1)
+
+    def test_metrics(self):
+        self.registry.get_client(ClientKey("http://a.local")).get("http://a.local/ok")
+        self.registry.get_client(ClientKey("http://a.local")).get("http://a.local/ok")
+        metrics = self.registry.metrics()
+        # MockTransport 没有 httpcore 连接池，占用情况读不到时留空而不报错
+        self.assertEqual(metrics, [{
+            "type": "sync", "base_url": "http://a.local", "verify": True, "proxy": None, "requests": 2,
+            "connections": None, "active": None, "idle": None,
+        }])
+
+    def test_pool_occupancy_of_real_transport(self):
+        client = _Client()
+        self.addCleanup(client.close)
+        self.assertEqual(client_pool._pool_occupancy(client), {"connections": 0, "active": 0, "idle": 0})
+
+
+# ==== 报告写入 ====
+def _case_result(case_id, steps=()):
+    return {"case_id": case_id, "status": "PASS", "duration": 0.1, "error_message": None, "steps": list(steps)}
+
+
+class ReportWriterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.batches = []
+        self.failing = set()
+
+        def write(batch):
+            if len(batch) > 1 and self.failing or any(result["case_id"] in self.failing for _, result in batch):
+                raise DatabaseError("write failed")
+            self.batches.append([result["case_id"] for _, result in batch])
+
+        patcher = mock.patch.object(report_module, "bulk_write_case_reports", side_effect=write)
+        self.write = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(report_module, "save_latency")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_by_batch_size(self):
+        with ReportWriter(batch_size=3, flush_interval=10) as writer:
+            for case_id in range(7):
+                writer.submit(1, _case_result(case_id))
+        self.assertEqual(self.batches, [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(writer.written, 7)
+
+    def test_flush_by_time_window(self):
+        with ReportWriter(batch_size=100, flush_interval=0.05) as writer:
+            writer.submit(1, _case_result(1))
+            deadline = time.monotonic() + 2
+            while not self.batches and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # 未攒满一批，时间窗口到期后后台线程已自行写入
+            self.assertEqual(self.batches, [[1]])
+            writer.submit(1, _case_result(2))
+        self.assertEqual(self.batches, [[1], [2]])
+
+    def test_backpressure_when_queue_full(self):
+        flushing, release = threading.Event(), threading.Event()
+        self.write.side_effect = lambda batch: (flushing.set(), release.wait(2))
+        writer = ReportWriter(batch_size=1, flush_interval=10, max_queue=1)
+        writer.start()
+        try:
+            writer.submit(1, _case_result(1))
+            self.assertTrue(flushing.wait(2))
+            writer.submit(1, _case_result(2))
+            with self.assertRaises(queue.Full):
+                writer.submit(1, _case_result(3), timeout=0.05)
+        finally:
+            release.set()
+            writer.close()
+        self.assertEqual(writer.written, 2)
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        self.failing = {2}
+        with ReportWriter(batch_size=4, flush_interval=10) as writer:
+            for case_id in range(4):
+                writer.submit(1, _case_result(case_id))
+        self.assertEqual(self.batches, [[0], [1], [3]])
+        self.assertEqual((writer.written, len(writer.errors)), (3, 1))
+
+
+class ReportFileTests(TransactionTestCase):
+
+    def setUp(self):
+        project = Project.objects.create(name="report")
+        environment = Environment.objects.create(name="dev", project=project, base_url="http://svc.local")
+        suite = TestSuite.objects.create(name="suite", project=project)
+        self.case = TestCase.objects.create(
+            name="case", suite=suite, project=project, environment=environment, protocol="HTTP", order=1,
+        )
+        action, _ = ActionType.objects.get_or_create(name="http", defaults={"display_name": "HTTP", "category": "HTTP"})
+        self.step = TestStep.objects.create(testcase=self.case, name="step", action_type=action)
+        self.report = TestReport.objects.create(report_type="CASE", summary={})
+        storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_dir.cleanup)
+        self.storage = FileSystemStorage(location=storage_dir.name)
+        patcher = mock.patch.object(report_module, "default_storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        fd, self.path = tempfile.mkstemp()
+        os.write(fd, b"x" * 64)
+        os.close(fd)
+        self.addCleanup(lambda: os.path.exists(self.path) and os.unlink(self.path))
+
+    def _result(self):
+        return _case_result(self.case.id, [{
+            "step_id": self.step.id, "status": "PASS", "duration": 0.1, "extract_result": {}, "error_message": None,
+            "response": {"size": 64}, "response_file": self.path,
+        }])
+
+    def test_case_report_pks_for_repeated_cases(self):
+        # MySQL 的 bulk_create 不回填主键，同一用例在一批中出现多次时按行标识回查
+        bulk_create = CaseReport.objects.bulk_create
+
+        def without_pks(objs, **kwargs):
+            bulk_create(objs, **kwargs)
+            for item in objs:
+                item.pk = None
+            return objs
+
+        results = []
+        for status in ("PASS", "FAIL"):
+            result = self._result()
+            result["status"] = result["steps"][0]["status"] = status
+            result["steps"][0]["response_file"] = None
+            results.append((self.report.id, result))
+        with mock.patch.object(report_module.CaseReport.objects, "bulk_create", side_effect=without_pks):
+            case_reports = bulk_write_case_reports(results)
+        self.assertEqual(len({item.pk for item in case_reports}), 2)
+        for item in case_reports:
+            self.assertEqual(StepReport.objects.get(case_report_id=item.pk).status, item.status)
+
+    def test_failed_write_leaves_no_files(self):
+        result = self._result()
+        with mock.patch.object(report_module.StepReport.objects, "bulk_create", side_effect=DatabaseError("boom")):
+            with self.assertRaises(DatabaseError):
+                bulk_write_case_reports([(self.report.id, result)])
+        self.assertFalse(TestLog.objects.exists())
+        self.assertEqual(self.storage.listdir("response_files")[1], [])
+        # 步骤结果与临时文件保持原样，可以重新写入
+        self.assertEqual(result["steps"][0]["response_file"], self.path)
+        self.assertTrue(os.path.exists(self.path))
+
+        bulk_write_case_reports([(self.report.id, result)])
+        log = TestLog.objects.get()
+        self.assertEqual(StepReport.objects.get().trace_id, log.trace_id)
+        self.assertEqual(result["steps"][0]["trace_id"], log.trace_id)
+        self.assertTrue(self.storage.exists(log.response_file.name))
+        self.assertFalse(os.path.exists(self.path))
+
+
+# ==== 分布式执行 ====
+def _mock_async_client(**kwargs):
+    """用 MockTransport 代替真实网络，/fail 返回 500"""
+    def handler(request):
+        if request.url.path == "/fail":
+            return httpx.Response(500, json={"ok": False})
+        return httpx.Response(200, json={"ok": True})
+
+    return _AsyncClient(transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"))
+
+
+@override_settings(
+    ENGINE={
+        "RESULT_STREAM_BACKEND": "memory", "EVENT_BACKEND": "memory", "PROGRESS_INTERVAL": 0, "RESULT_STREAM_BLOCK": 0.01,
+    },
+    CELERY_TASK_ALWAYS_EAGER=True,
+)
+class DistributedJobTests(TransactionTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Celery 配置经 CELERY 命名空间加载，直接给属性赋值不生效，需用 update；eager 结果不写入结果后端
+        cls._celery_conf = {key: celery_app.conf[key] for key in ("task_always_eager", "task_store_eager_result")}
+        celery_app.conf.update(task_always_eager=True, task_store_eager_result=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        celery_app.conf.update(cls._celery_conf)
+        super().tearDownClass()
+
+    def setUp(self):
+        project = Project.objects.create(name="distributed")
+        self.environment = Environment.objects.create(name="dev", project=project, base_url="http://svc.local")
+        suite = TestSuite.objects.create(name="suite", project=project)
+        action, _ = ActionType.objects.get_or_create(name="http", defaults={"display_name": "HTTP", "category": "HTTP"})
+        validators = [{"actual": "status_code", "expected": 200, "operator": "eq"}]
+        for index in range(5):
+            interface = ApiInterface.objects.create(
+                name=f"api-{index}", project=project, protocol="HTTP", method="GET",
+                url="/fail" if index == 4 else f"/ok/{index}",
+            )
+            case = TestCase.objects.create(
+                name=f"case-{index}", suite=suite, project=project, environment=self.environment,
+                protocol="HTTP", order=index,
+            )
+            TestStep.objects.create(testcase=case, name="step", action_type=action, api_interface=interface, validators=validators)
+        self.job = TestJob.objects.create(
+            name="job", suite=suite, environment=self.environment, run_mode="ALL", parallel=True, result_summary={},
+        )
+
+    def test_split_round_robin(self):
+        self.assertEqual(split_round_robin([1, 2, 3, 4, 5], 3), [[1, 4], [2, 5], [3]])
+        self.assertEqual(split_round_robin([1], 4), [[1]])
+
+    def test_lpt_spreads_slow_cases(self):
+        estimates = {1: 30.0, 2: 28.0, 3: 27.0, 4: 1.0, 5: 1.0, 6: 1.0}
+        planned = plan_lpt(estimates, 3)
+        self.assertEqual([bucket for bucket, _ in planned], [[1], [2, 5], [3, 4, 6]])
+        self.assertEqual(max(load for _, load in planned), 30.0)
+
+    def test_memory_stream_read_after_id(self):
+        stream = MemoryResultStream("test:stream")
+        self.addCleanup(stream.delete)
+        stream.publish({"n": 1})
+        last_id = stream.publish({"n": 2})
+        self.assertEqual([message["n"] for _, message in stream.read("0")], [1, 2])
+        self.assertEqual(stream.read(last_id, block_ms=10), [])
+
+    def test_shards_go_to_dedicated_queue(self):
+        runner = DistributedJobRunner(self.job, shards=2)
+        report = TestReport.objects.create(job=self.job, report_type="SUITE", summary={})
+        with mock.patch.object(run_job_shard, "apply_async") as apply_async:
+            runner._dispatch(report, [[1], [2]], "test:queue")
+        self.assertEqual([call.kwargs["queue"] for call in apply_async.call_args_list], ["engine_shards"] * 2)
+
+    def test_dead_shard_detected_by_heartbeat(self):
+        stream = MemoryResultStream("test:heartbeat")
+        self.addCleanup(stream.delete)
+        stream.publish({"type": "heartbeat", "shard": 0})
+        stream.publish({"type": "done", "shard": 1, "elapsed": 0.1})
+        runner = DistributedJobRunner(self.job, shards=2)
+        report = TestReport.objects.create(job=self.job, report_type="SUITE", summary={})
+        engine = {"RESULT_STREAM_BLOCK": 0.01, "SHARD_HEARTBEAT_TIMEOUT": 0.05, "SHARD_TIMEOUT": 5}
+        with override_settings(ENGINE=engine), ReportWriter() as writer:
+            started = time.monotonic()
+            self.assertEqual(runner._collect(stream, report, writer, 2), [])
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual([item["shard"] for item in runner.shard_errors], [0])
+
+    @mock.patch.object(client_pool.httpx, "AsyncClient", _mock_async_client)
+    def test_shards_merge_into_one_report(self):
+        report = DistributedJobRunner(self.job, shards=3).run()
+
+        self.job.refresh_from_db()
+        self.assertEqual(report.case_reports.count(), 5)
+        self.assertEqual(report.summary["total"], 5)
+        self.assertEqual(report.summary["failed"], 1)
+        self.assertEqual(self.job.status, "FAILED")
+        self.assertEqual(self.job.result_summary["total"], 5)
+        records = CeleryTaskRecord.objects.filter(job=self.job)
+        self.assertEqual(records.count(), 3)
+        self.assertTrue(all(record.status == "SUCCESS" for record in records))
+        sharding = report.summary["sharding"]
+        self.assertEqual(len(sharding["planned"]), 3)
+        self.assertIsNotNone(sharding["actual_makespan"])
+
+    @mock.patch.object(client_pool.httpx, "AsyncClient", _mock_async_client)
+    def test_progress_written_while_collecting(self):
+        runner = DistributedJobRunner(self.job, shards=2)
+        saved = []
+        original = runner._progress
+
+        def track(results, shards_done, shard_count):
+            original(results, shards_done, shard_count)
+            saved.append(dict(self.job.result_summary))
+
+        runner._progress = track
+        runner.run()
+        self.assertTrue(saved)
+        self.assertEqual(saved[-1]["expected"], 5)
+        self.assertLessEqual(saved[0]["total"], 5)
+
+    @mock.patch.object(client_pool.httpx, "AsyncClient", _mock_async_client)
+    def test_smart_run_carries_unchanged_passes(self):
+        first = JobRunner(self.job).run()
+        second = JobRunner(self.job, smart=True).run()
+
+        # 上次通过且未变更的 4 个用例沿用结果，失败的用例重新执行
+        self.assertEqual(second.summary["carried"], 4)
+        self.assertEqual(second.summary["total"], 5)
+        self.assertEqual(second.summary["failed"], 1)
+        carried = second.case_reports.exclude(carried_from=None)
+        self.assertEqual(
+            set(carried.values_list("carried_from__report_id", flat=True)), {first.id}
+        )
+        self.assertFalse(StepReport.objects.filter(case_report__in=carried).exists())
+
+        ApiInterface.objects.filter(name="api-0").update(url="/ok/changed")
+        third = JobRunner(self.job, smart=True).run()
+        self.assertEqual(third.summary["carried"], 3)
+        # 连续沿用时仍指向最初执行的报告
+        self.assertEqual(
+            set(third.case_reports.exclude(carried_from=None).values_list("carried_from__report_id", flat=True)),
+            {first.id},
+        )
+
+    @mock.patch.object(client_pool.httpx, "AsyncClient", _mock_async_client)
+    def test_latency_rolled_up_per_interface(self):
+        first = JobRunner(self.job).run()
+        JobRunner(self.job).run()
+
+        self.assertEqual(first.summary["latency"]["count"], 5)
+        self.assertEqual(first.summary["timing"]["total"]["count"], 5)
+        self.assertTrue(all(step.latency for step in StepReport.objects.filter(case_report__report=first)))
+        rollup = report_latency(first)
+        self.assertEqual(rollup["total"]["count"], 5)
+        self.assertEqual(len(rollup["interfaces"]), 5)
+        interface = ApiInterface.objects.get(name="api-0")
+        history = interface_latency(interface.id, runs=10)
+        self.assertEqual(len(history["runs"]), 2)
+        self.assertEqual(history["merged"]["count"], 2)
+        self.assertLessEqual(history["merged"]["p50"], history["merged"]["max"])
+
+    @mock.patch.object(client_pool.httpx, "AsyncClient", _mock_async_client)
+    def test_submitted_job_runs_coordinator_in_worker(self):
+        with mock.patch.object(runs, "enqueue_job") as enqueue_job:
+            report = runs.submit_job(self.job, distributed=True, shards=2)
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, report.case_reports.count()), ("PENDING", 0))
+        enqueue_job.assert_called_once_with(self.job.id, report.id, True, 2, False)
+
+        # eager 模式下协调者任务与分片任务在当前进程内依次执行
+        report = runs.submit_job(self.job, distributed=True, shards=2)
+        report.refresh_from_db()
+        self.job.refresh_from_db()
+        self.assertEqual((report.summary["total"], report.summary["failed"]), (5, 1))
+        self.assertEqual(self.job.status, "FAILED")
+
+
+# ==== 步骤依赖图 ====
+def _dag_step(pk, url, extractors=(), setup_hooks=()):
+    request = {"method": "GET", "url": url, "headers": {}, "params": {}, "timeout": 5}
+    return StepPlan(
+        id=pk, name=f"step-{pk}", order=pk, request=request, template=compile_template(request),
+        extractors=tuple(extractors), validators=(), assertions={}, setup_hooks=setup_hooks, teardown_hooks=(),
+        retry=RetryPolicy(), skip=False,
+    )
+
+
+def _extract(key):
+    return [{"key": key, "source": "body", "expression": "body.token"}]
+
+
+class StepGraphTests(SimpleTestCase):
+
+    def test_dependency_edges(self):
+        steps = [
+            _dag_step(1, "/login", extractors=_extract("token")),
+            _dag_step(2, "/ping"),
+            _dag_step(3, "/me?token=${token}"),
+            # 再次产出 token：需等之前的读取者与产出者完成
+            _dag_step(4, "/refresh", extractors=_extract("token")),
+            _dag_step(5, "/me?token=${token}"),
+        ]
+        self.assertEqual(build_step_graph(steps), (set(), set(), {0}, {0, 2}, {3}))
+
+    def test_hook_step_is_a_barrier(self):
+        steps = [
+            _dag_step(1, "/a"),
+            _dag_step(2, "/b"),
+            _dag_step(3, "/c", setup_hooks=({"type": "SETUP"},)),
+            _dag_step(4, "/d"),
+        ]
+        self.assertEqual(build_step_graph(steps), (set(), set(), {0, 1}, {2}))
+
+    def test_forward_reference_does_not_create_cycle(self):
+        # 引用之后步骤才产出的变量不产生依赖，依赖只指向前序步骤，图中不会有环
+        steps = [
+            _dag_step(1, "/me?token=${token}"),
+            _dag_step(2, "/login", extractors=_extract("token")),
+            _dag_step(3, "/me?token=${token}", extractors=_extract("token")),
+        ]
+        graph = build_step_graph(steps)
+        self.assertEqual(graph, (set(), {0}, {1}))
+        self.assertTrue(all(dep < index for index, deps in enumerate(graph) for dep in deps))
+
+
+class StepConcurrencyTests(SimpleTestCase):
+
+    def setUp(self):
+        self.events = []
+        self.running = 0
+        self.peak = 0
+
+        async def handler(request):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.events.append(("start", request.url.path))
+            await asyncio.sleep(0.05)
+            self.events.append(("end", request.url.path))
+            self.running -= 1
+            return httpx.Response(200, json={"token": "t-1"})
+
+        def client(**kwargs):
+            return _AsyncClient(transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"))
+
+        patcher = mock.patch.object(client_pool.httpx, "AsyncClient", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, steps):
+        case = CasePlan(
+            id=1, name="case", order=1, base_url="http://svc.local", verify_ssl=True, proxy=None, database=None,
+            setup_hooks=(), global_vars={}, env_vars={}, case_vars={}, steps=tuple(steps),
+            graph=build_step_graph(steps), retries=0, rows=None, updated_at=None, content_hash=None,
+        )
+        return EngineDispatcher(is_async=True).run([case])[0]
+
+    def test_serial_by_default(self):
+        result = self._run([_dag_step(pk, f"/s{pk}") for pk in range(1, 5)])
+        self.assertEqual(result["status"], "PASS")
+        self.assertEqual(self.peak, 1)
+        self.assertEqual([path for kind, path in self.events if kind == "start"], ["/s1", "/s2", "/s3", "/s4"])
+
+    def test_serial_keeps_order_around_dependent_steps(self):
+        steps = [
+            _dag_step(1, "/login", extractors=_extract("token")),
+            _dag_step(2, "/me?token=${token}"),
+            _dag_step(3, "/ping"),
+        ]
+        result = self._run(steps)
+        self.assertEqual(result["status"], "PASS")
+        self.assertEqual(
+            self.events,
+            [("start", "/login"), ("end", "/login"), ("start", "/me"), ("end", "/me"), ("start", "/ping"), ("end", "/ping")],
+        )
+
+    @override_settings(ENGINE={"STEP_CONCURRENCY": 2})
+    def test_concurrency_limit_and_dependencies(self):
+        steps = [
+            _dag_step(1, "/login", extractors=_extract("token")),
+            _dag_step(2, "/a"),
+            _dag_step(3, "/b"),
+            _dag_step(4, "/me?token=${token}"),
+        ]
+        result = self._run(steps)
+        self.assertEqual(result["status"], "PASS")
+        self.assertEqual(self.peak, 2)
+        # /me 在 /login 结束之后才发出
+        self.assertLess(self.events.index(("end", "/login")), self.events.index(("start", "/me")))
+
+
+# ==== 重试与对冲 ====
+def _retry_step(pk, url, policy, extractors=(), validators=None):
+    request = {"method": "GET", "url": url, "headers": {}, "params": {}, "timeout": 5}
+    if validators is None:
+        validators = ({"actual": "status_code", "expected": 200, "operator": "eq"},)
+    return StepPlan(
+        id=pk, name=f"step-{pk}", order=pk, request=request, template=compile_template(request),
+        extractors=tuple(extractors), validators=tuple(validators), assertions={}, setup_hooks=(),
+        teardown_hooks=(), retry=policy, skip=False,
+    )
+
+
+def _retry_case(steps):
+    return CasePlan(
+        id=1, name="case", order=1, base_url="http://svc.local", verify_ssl=True, steps=tuple(steps),
+        graph=build_step_graph(steps), global_vars={}, env_vars={}, case_vars={}, retries=0,
+    )
+
+
+class RetryPolicyTests(SimpleTestCase):
+
+    def setUp(self):
+        self.statuses = []
+        self.slow_started = False
+        self.hedge_cancelled = 0
+
+        def handler(request):
+            status = self.statuses.pop(0) if self.statuses else 200
+            if status is None:
+                raise httpx.ConnectError("connection refused")
+            return httpx.Response(status, json={"ok": status == 200})
+
+        async def async_handler(request):
+            if request.url.path == "/slow" and not self.slow_started:
+                # 首个请求一直不返回，等待对冲请求胜出后被取消
+                self.slow_started = True
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    self.hedge_cancelled += 1
+                    raise
+            return httpx.Response(200, json={"ok": True})
+
+        patchers = [
+            mock.patch.object(client_pool.httpx, "Client", lambda **kwargs: _Client(
+                transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"),
+            )),
+            mock.patch.object(client_pool.httpx, "AsyncClient", lambda **kwargs: _AsyncClient(
+                transport=httpx.MockTransport(async_handler), event_hooks=kwargs.get("event_hooks"),
+            )),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        client_pool.client_registry.close()
+        self.addCleanup(client_pool.client_registry.close)
+
+    def test_from_config_validation(self):
+        policy = RetryPolicy.from_config(2, {"backoff_base": 0, "retry_on_status": [503], "hedge_delay": 0.2})
+        self.assertEqual((policy.retries, policy.backoff_base, policy.retry_on_status), (2, 0, frozenset({503})))
+        for config in ("3", {"retries": "3"}, {"retries": -1}, {"backoff_max": "10"}, {"retry_on_status": 503},
+                       {"retry_on_assertion": "yes"}, {"jitter": True}):
+            with self.subTest(config=config), self.assertRaises(ValueError):
+                RetryPolicy.from_config(0, config)
+
+    def test_null_config_uses_defaults(self):
+        policy = RetryPolicy.from_config(2, {"retries": None, "backoff_base": None, "retry_on_connection": None})
+        self.assertEqual((policy.retries, policy.retry_on_connection), (2, True))
+        self.assertEqual(policy.backoff_base, RetryPolicy().backoff_base)
+
+    def test_retry_on_status_without_validators(self):
+        self.statuses = [503]
+        policy = RetryPolicy(retries=1, backoff_base=0, retry_on_status=[503])
+        step = _retry_step(1, "/flaky", policy, validators=())
+        result = EngineDispatcher().run_sync([_retry_case([step])])[0]
+        self.assertEqual([attempt["status_code"] for attempt in result["steps"][0]["attempts"]], [503, 200])
+
+    def test_only_final_attempt_extracts(self):
+        self.statuses = [503, None]
+        policy = RetryPolicy(retries=1, backoff_base=0, retry_on_status=[503])
+        extractors = [{"key": "ok", "source": "body", "expression": "body.ok"}]
+        steps = [_retry_step(1, "/flaky", policy, extractors=extractors), _retry_step(2, "/next/${ok}", RetryPolicy())]
+        result = EngineDispatcher().run_sync([_retry_case(steps)])[0]
+        first, second = result["steps"]
+        self.assertEqual([attempt["status_code"] for attempt in first["attempts"]], [503, None])
+        self.assertEqual((first["status"], first["extract_result"]), ("ERROR", {}))
+        # 被丢弃的第一次尝试提取的 ok=False 没有写入上下文
+        self.assertEqual(second["request"]["url"], "http://svc.local/next/${ok}")
+
+    def test_exponential_backoff_with_cap(self):
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=3)
+        with mock.patch.object(retry_module.random, "uniform", side_effect=lambda low, high: high):
+            self.assertEqual([policy.delay(attempt) for attempt in range(4)], [0.5, 1.0, 2.0, 3])
+
+    def test_retry_on_status_until_pass(self):
+        self.statuses = [503, 503]
+        policy = RetryPolicy(retries=3, backoff_base=0, retry_on_status=[503])
+        result = EngineDispatcher().run_sync([_retry_case([_retry_step(1, "/flaky", policy)])])[0]
+        step = result["steps"][0]
+        self.assertEqual(step["status"], "PASS")
+        self.assertEqual([attempt["status_code"] for attempt in step["attempts"]], [503, 503, 200])
+
+    def test_retries_exhausted(self):
+        self.statuses = [503, 503, 503]
+        policy = RetryPolicy(retries=1, backoff_base=0, retry_on_status=[503])
+        result = EngineDispatcher().run_sync([_retry_case([_retry_step(1, "/flaky", policy)])])[0]
+        self.assertEqual(result["steps"][0]["status"], "FAIL")
+        self.assertEqual(len(result["steps"][0]["attempts"]), 2)
+        self.assertEqual(self.statuses, [503])
+
+    def test_hedged_request_cancels_the_loser(self):
+        policy = RetryPolicy(hedge_delay=0.05)
+        result = EngineDispatcher(is_async=True).run([_retry_case([_retry_step(1, "/slow", policy)])])[0]
+        step = result["steps"][0]
+        self.assertEqual(step["status"], "PASS")
+        self.assertTrue(step["attempts"][0]["hedged"])
+        self.assertEqual(self.hedge_cancelled, 1)
+        self.assertLess(step["duration"], 1)
+
+
+class StepRetryConfigTests(TransactionTestCase):
+
+    def setUp(self):
+        project = Project.objects.create(name="retry")
+        self.environment = Environment.objects.create(name="dev", project=project, base_url="http://svc.local")
+        suite = TestSuite.objects.create(name="suite", project=project)
+        action, _ = ActionType.objects.get_or_create(name="http", defaults={"display_name": "HTTP", "category": "HTTP"})
+        interface = ApiInterface.objects.create(name="api", project=project, protocol="HTTP", method="GET", url="/ok")
+        self.case = TestCase.objects.create(
+            name="case", suite=suite, project=project, environment=self.environment, protocol="HTTP", order=1,
+        )
+        TestStep.objects.create(
+            testcase=self.case, name="bad", order=1, action_type=action, api_interface=interface,
+            raw_request_config={"retry": {"retries": "three"}},
+        )
+        TestStep.objects.create(testcase=self.case, name="good", order=2, action_type=action, api_interface=interface)
+        patcher = mock.patch.object(client_pool.httpx, "Client", lambda **kwargs: _Client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+            event_hooks=kwargs.get("event_hooks"),
+        ))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        client_pool.client_registry.close()
+        self.addCleanup(client_pool.client_registry.close)
+
+    def test_invalid_retry_config_is_a_step_error(self):
+        plan = PlanCompiler(self.environment).compile_case(self.case)
+        self.assertIn("retries", plan.steps[0].error)
+        self.assertIsNone(plan.steps[1].error)
+
+        result = EngineDispatcher().run_sync([plan])[0]
+        self.assertEqual([step["status"] for step in result["steps"]], ["ERROR", "PASS"])
+        self.assertTrue(result["steps"][0]["error_message"].startswith("重试配置无效"))
+
+
+# ==== 自定义断言 ====
+def _run_script(pool, script, actual=None, expected=None):
+    return pool.run(script_digest(script), script, actual, expected)
+
+
+class AssertionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.pool = AssertionPool(workers=2, cpu_time=0.5, timeout=1)
+        self.addCleanup(self.pool.close)
+
+    def test_script_result(self):
+        self.assertTrue(_run_script(self.pool, "result = actual == expected", 1, 1))
+        self.assertFalse(_run_script(self.pool, "result = actual == expected", 1, 2))
+        with self.assertRaises(ZeroDivisionError):
+            _run_script(self.pool, "result = 1 / 0")
+
+    def test_cpu_time_limit(self):
+        with self.assertRaises(AssertionTimeout):
+            _run_script(self.pool, "while True: pass")
+        # worker 内定时器打断了脚本，不需要替换进程
+        self.assertEqual((self.pool.timeouts, self.pool.restarts), (1, 0))
+        self.assertTrue(_run_script(self.pool, "result = True"))
+
+    def test_stuck_script_replaces_only_its_worker(self):
+        self.pool.start()
+        before = {worker.process.pid for worker in self.pool._all}
+        script = (
+            "import signal, time\n"
+            "signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM, signal.SIGPROF})\n"
+            "time.sleep(30)\n"
+        )
+        with self.assertRaises(AssertionTimeout):
+            _run_script(self.pool, script)
+        after = {worker.process.pid for worker in self.pool._all}
+        self.assertEqual((self.pool.timeouts, self.pool.restarts), (1, 1))
+        self.assertEqual((len(after), len(before & after)), (2, 1))
+        for _ in range(4):
+            self.assertTrue(_run_script(self.pool, "result = True"))
+
+    def test_memory_limit(self):
+        pool = AssertionPool(workers=1, cpu_time=2, timeout=5, memory_limit=512 * 1024 * 1024)
+        self.addCleanup(pool.close)
+        with self.assertRaises(MemoryError):
+            _run_script(pool, "result = len(bytearray(1024 * 1024 * 1024))")
+        self.assertEqual(_run_script(pool, "result = len(bytearray(1024))"), 1024)
+        self.assertEqual(pool.restarts, 0)
+
+    def test_script_cache(self):
+        cache = ScriptCache(maxsize=2)
+        scripts = ["result = 1", "result = 2", "result = 3"]
+        codes = [cache.compile(script_digest(script), script) for script in scripts]
+        self.assertIs(cache.compile(script_digest(scripts[2]), scripts[2]), codes[2])
+        self.assertEqual(cache.stats(), {"size": 2, "maxsize": 2, "hits": 1, "misses": 3})
+        # 最早的脚本已被淘汰，重新编译
+        self.assertIsNot(cache.compile(script_digest(scripts[0]), scripts[0]), codes[0])
+        self.assertEqual(cache.stats()["misses"], 4)
+
+        with self.assertRaises(ValueError):
+            AssertionScript("broken", "result = (")
+
+
+# ==== GraphQL ====
+class GraphQLStub:
+    """进程内 GraphQL 服务：支持批量请求与持久化查询，resolver 原样返回操作名与变量"""
+
+    def __init__(self):
+        self.requests = []
+        self.persisted = {}
+
+    def execute(self, payload: dict) -> dict:
+        query = payload.get("query")
+        digest = ((payload.get("extensions") or {}).get("persistedQuery") or {}).get("sha256Hash")
+        if query is None:
+            if digest not in self.persisted:
+                return {"errors": [{"message": "PersistedQueryNotFound"}]}
+        elif digest:
+            self.persisted[digest] = query
+        return {"data": {"operation": payload.get("operationName"), "variables": payload.get("variables")}}
+
+    def handler(self, request):
+        body = json.loads(request.content)
+        self.requests.append(body)
+        if isinstance(body, list):
+            return httpx.Response(200, json=[self.execute(item) for item in body])
+        return httpx.Response(200, json=self.execute(body))
+
+    def client(self, **kwargs):
+        return _Client(transport=httpx.MockTransport(self.handler), event_hooks=kwargs.get("event_hooks"))
+
+
+def _graphql_step(pk, name, variables=None, extractors=(), retry=None):
+    request = {
+        "method": "POST",
+        "url": "/graphql",
+        "headers": {},
+        "params": {},
+        "document": f"query {name} {{ item {{ id }} }}",
+        "variables": variables or {"id": pk},
+        "timeout": 5,
+    }
+    return StepPlan(
+        id=pk, name=name, order=pk, request=request, template=compile_template(request),
+        extractors=tuple(extractors), validators=({"actual": "body.data.operation", "expected": name, "operator": "eq"},),
+        assertions={}, setup_hooks=(), teardown_hooks=(), retry=retry or RetryPolicy(), skip=False,
+    )
+
+
+def _graphql_case(steps):
+    return CasePlan(
+        id=1, name="graphql", base_url="http://graphql.test", verify_ssl=True, steps=tuple(steps),
+        global_vars={}, env_vars={}, case_vars={}, retries=0,
+    )
+
+
+class GraphQLTests(SimpleTestCase):
+
+    def setUp(self):
+        self.stub = GraphQLStub()
+        patcher = mock.patch.object(client_pool.httpx, "Client", self.stub.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(client_pool.client_registry.close)
+
+    def test_document_parsed_once(self):
+        cache = DocumentCache(maxsize=2)
+        text = "query GetUser($id: ID!, $page: Int = 1) { user(id: $id) { name } }"
+        document = cache.get(text)
+        self.assertIs(cache.get(text), document)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(document.operation_name, "GetUser")
+        self.assertEqual(document.required, ("id",))
+        with self.assertRaises(ValueError):
+            check_variables(document, {"page": 2})
+        with self.assertRaises(ValueError):
+            parse_document("query { user { name }")
+
+    def test_independent_steps_share_one_request(self):
+        steps = [
+            _graphql_step(1, "A"),
+            _graphql_step(2, "B"),
+            _graphql_step(3, "C", extractors=[{"key": "token", "source": "body", "expression": "body.data.operation"}]),
+            _graphql_step(4, "D", variables={"token": "${token}"}),
+        ]
+        result = EngineDispatcher().run_sync([_graphql_case(steps)])[0]
+
+        self.assertEqual(result["status"], "PASS")
+        # A、B、C 互不依赖合并为一次批量请求，D 依赖 C 提取的变量单独发送
+        self.assertEqual([type(body) for body in self.stub.requests], [list, dict])
+        self.assertEqual(len(self.stub.requests[0]), 3)
+        self.assertEqual(self.stub.requests[1]["variables"], {"token": "C"})
+
+    def test_failed_batch_counts_as_first_attempt(self):
+        handler, batches = self.stub.handler, []
+
+        def flaky(request):
+            if isinstance(json.loads(request.content), list):
+                batches.append(request)
+                raise httpx.ConnectError("batch refused")
+            return handler(request)
+
+        self.stub.handler = flaky
+        retry = RetryPolicy(retries=1, backoff_base=0)
+        steps = [_graphql_step(1, "A", retry=retry), _graphql_step(2, "B")]
+        result = EngineDispatcher().run_sync([_graphql_case(steps)])[0]
+
+        retried, exhausted = result["steps"]
+        self.assertEqual([attempt["status"] for attempt in retried["attempts"]], ["ERROR", "PASS"])
+        self.assertEqual((retried["status"], retried["attempts"][1]["attempt"]), ("PASS", 2))
+        # 没有重试次数的步骤只有批量请求这一次尝试
+        self.assertEqual((exhausted["status"], len(exhausted["attempts"])), ("ERROR", 1))
+        self.assertEqual((len(batches), len(self.stub.requests)), (1, 1))
+
+    def test_serial_async_skips_batch_window(self):
+        patcher = mock.patch.object(client_pool.httpx, "AsyncClient", lambda **kwargs: _AsyncClient(
+            transport=httpx.MockTransport(self.stub.handler), event_hooks=kwargs.get("event_hooks"),
+        ))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        steps = [_graphql_step(1, "A"), _graphql_step(2, "B")]
+        with override_settings(ENGINE={"GRAPHQL_BATCH_WINDOW": 5}):
+            started = time.monotonic()
+            result = EngineDispatcher(is_async=True).run([_graphql_case(steps)])[0]
+        self.assertEqual(result["status"], "PASS")
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual([type(body) for body in self.stub.requests], [dict, dict])
+
+    def test_async_batch_keeps_send_task(self):
+        in_flight = []
+
+        def handler(request):
+            in_flight.append(set(requester._tasks))
+            return self.stub.handler(request)
+
+        client = _AsyncClient(transport=httpx.MockTransport(handler))
+        requester = AsyncGraphQLRequester(client, batching=True)
+        requests = [
+            {**_graphql_step(pk, name).request, "url": "http://graphql.test/graphql"} for pk, name in ((1, "A"), (2, "B"))
+        ]
+
+        async def send():
+            try:
+                return await asyncio.gather(*(requester.send_request(request) for request in requests))
+            finally:
+                await client.aclose()
+
+        responses = asyncio.run(send())
+        # 发送中的批量任务由请求器持有，完成后移除
+        self.assertEqual([len(tasks) for tasks in in_flight], [1])
+        self.assertEqual(requester._tasks, set())
+        self.assertEqual([response["body"].parse()["data"]["operation"] for response in responses], ["A", "B"])
+        self.assertEqual([type(body) for body in self.stub.requests], [list])
+
+    @override_settings(ENGINE={"GRAPHQL_PERSISTED_QUERIES": True})
+    def test_persisted_query_sends_hash_after_registration(self):
+        case = _graphql_case([_graphql_step(1, "A")])
+        first = EngineDispatcher().run_sync([case])[0]
+        second = EngineDispatcher().run_sync([case])[0]
+
+        self.assertEqual(first["status"], "PASS")
+        self.assertEqual(second["status"], "PASS")
+        # 首次只发哈希未命中，带查询文本补发；之后只发哈希
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertNotIn("query", self.stub.requests[0])
+        self.assertIn("query", self.stub.requests[1])
+        self.assertNotIn("query", self.stub.requests[2])
+
+
+class GraphQLInterfaceRequestTests(TransactionTestCase):
+
+    def setUp(self):
+        project = Project.objects.create(name="graphql")
+        self.environment = Environment.objects.create(
+            name="dev", project=project, base_url="http://graphql.test/api", variables={"token": "t-1"},
+            verify_ssl=False, proxy="http://proxy.local:3128",
+        )
+        self.interface = ApiInterface.objects.create(
+            name="user", project=project, protocol="GRAPHQL", url="/graphql",
+            headers={"Authorization": "Bearer ${token}"}, body={"id": 1},
+            graphql_query="query GetUser($id: ID!) { user(id: $id) { name } }",
+        )
+        self.stub = GraphQLStub()
+        self.client_options = []
+
+        def client(**kwargs):
+            self.client_options.append(kwargs)
+            return self.stub.client(**kwargs)
+
+        patcher = mock.patch.object(client_pool.httpx, "Client", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        client_pool.client_registry.close()
+        self.addCleanup(client_pool.client_registry.close)
+
+    def test_request_built_like_a_step(self):
+        request, key = build_interface_request(self.interface, self.environment)
+        self.assertEqual(request["method"], "POST")
+        self.assertEqual(request["url"], "http://graphql.test/api/graphql")
+        self.assertEqual(request["headers"], {"Authorization": "Bearer t-1"})
+        self.assertEqual(request["variables"], {"id": 1})
+        self.assertEqual(key, ClientKey("http://graphql.test/api", False, "http://proxy.local:3128"))
+
+        response = GraphQLRequester(client_pool.client_registry.get_client(key)).send_request(request)
+        self.assertEqual(response["body"].parse()["data"]["operation"], "GetUser")
+        self.assertEqual((self.client_options[0]["verify"], self.client_options[0]["proxy"]), (False, "http://proxy.local:3128"))
+
+    def test_overrides_without_environment(self):
+        request, key = build_interface_request(self.interface, None, "query Other { item { id } }", {})
+        self.assertEqual((request["url"], request["document"], request["variables"]), ("/graphql", "query Other { item { id } }", {}))
+        self.assertEqual(key, ClientKey())
+
+
+# ==== Mock 服务 ====
+def _mock_interface(pk, method, url, mock_response):
+    return SimpleNamespace(id=pk, method=method, url=url, mock_response=mock_response, response_example={})
+
+
+class MockServerTests(SimpleTestCase):
+
+    def test_static_segment_wins_and_backtracks(self):
+        trie = PathTrie()
+        trie.add("GET", "/users/{id}/orders", "orders")
+        trie.add("GET", "/users/me", "me")
+        trie.add("GET", "/users/{id}", "user")
+
+        self.assertEqual(trie.match("GET", "/users/me"), ("me", {}))
+        self.assertEqual(trie.match("GET", "/users/me/orders"), ("orders", {"id": "me"}))
+        self.assertEqual(trie.match("GET", "/users/7"), ("user", {"id": "7"}))
+        self.assertEqual(trie.match("POST", "/users/7"), (None, None))
+        self.assertIsNone(trie.match("GET", "/orders"))
+
+    def test_gateway_serves_project_interfaces(self):
+        interfaces = [
+            _mock_interface(1, "GET", "/users/{id}", {"body": {"id": "${id}", "page": "${page}"}}),
+            _mock_interface(2, "POST", "https://api.example.com/orders", {"status_code": 201, "body": "created"}),
+            _mock_interface(3, "GET", "/unstable", {"body": {}, "error_rate": 1, "error_status": 503}),
+        ]
+        gateway = MockGateway(prefix="/mock")
+        gateway._apps[1] = MockApp([(item.method, item.url, MockRoute(item)) for item in interfaces])
+        gateway._apps[1].checked_at = float("inf")
+
+        async def requests():
+            transport = httpx.ASGITransport(app=gateway)
+            async with httpx.AsyncClient(transport=transport, base_url="http://mock") as client:
+                return [
+                    await client.get("/mock/1/users/42", params={"page": 2}),
+                    await client.post("/mock/1/orders"),
+                    await client.get("/mock/1/unstable"),
+                    await client.get("/mock/1/missing"),
+                ]
+
+        user, order, unstable, missing = asyncio.run(requests())
+        self.assertEqual(user.json(), {"id": "42", "page": "2"})
+        self.assertEqual((order.status_code, order.text), (201, "created"))
+        self.assertEqual(unstable.status_code, 503)
+        self.assertEqual(missing.status_code, 404)
+
+
+# ==== 录制/回放 ====
+class RecorderTests(SimpleTestCase):
+
+    def setUp(self):
+        self.calls = 0
+        self.root = tempfile.mkdtemp()
+
+        def handler(request):
+            self.calls += 1
+            return httpx.Response(200, json={"path": request.url.path, "call": self.calls})
+
+        patcher = mock.patch.object(
+            client_pool.httpx, "Client",
+            lambda **kwargs: _Client(transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks")),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(client_pool.client_registry.close)
+
+    def test_fingerprint_is_canonical(self):
+        first = {
+            "method": "get", "url": "HTTP://Api.Test/items?b=2&a=1",
+            "headers": {"X-Token": "t", "Date": "Mon"}, "json": {"name": "x", "meta": {"ts": 1}},
         }
-        self.test_job_data = {
-            "name": "Test Job",
-            "suite": None,
-            "testcases": [],
-            "environment": 1,  # 假设环境 ID 为 1
-            "parallel": False,
-            "run_type": "manual"
+        second = {
+            "method": "GET", "url": "http://api.test/items", "params": {"a": 1, "b": 2},
+            "headers": {"x-token": "t", "date": "Tue"}, "json": {"meta": {"ts": 2}, "name": "x"},
         }
+        self.assertEqual(
+            fingerprint(first, ignore_headers=["date"], ignore_body=["meta.ts"]),
+            fingerprint(second, ignore_headers=["date"], ignore_body=["meta.ts"]),
+        )
+        self.assertNotEqual(fingerprint(first), fingerprint({**first, "params": {"a": 3}}))
+
+    def test_replay_serves_without_network(self):
+        steps = [
+            StepPlan(
+                id=pk, name=f"s{pk}", order=pk, request={"method": "GET", "url": f"/items/{pk}"},
+                template=compile_template({"method": "GET", "url": f"/items/{pk}"}), extractors=(),
+                validators=({"actual": "body.path", "expected": f"/items/{pk}", "operator": "eq"},),
+                assertions={}, setup_hooks=(), teardown_hooks=(), retry=RetryPolicy(), skip=False,
+            )
+            for pk in range(1, 11)
+        ]
+        case = CasePlan(
+            id=1, name="records", base_url="http://api.test", verify_ssl=True, steps=tuple(steps),
+            global_vars={}, env_vars={}, case_vars={}, retries=0,
+        )
+        with override_settings(ENGINE={"RECORD_DIR": self.root}):
+            recorded = EngineDispatcher(record="record").run_sync([case])[0]
+            replayed = EngineDispatcher(record="replay").run_sync([case])[0]
+            strict = Recorder("replay", strict=True)
+            with self.assertRaises(RecordMissing):
+                strict.send({"method": "GET", "url": "http://api.test/other"}, None)
+
+        self.assertEqual(recorded["status"], "PASS")
+        self.assertEqual(replayed["status"], "PASS")
+        self.assertEqual(self.calls, 10)
+        self.assertEqual(replayed["steps"][0]["response"]["body"], recorded["steps"][0]["response"]["body"])
+
+    def test_refresh_expires_stale_records(self):
+        request = {"method": "GET", "url": "http://api.test/items/1"}
+        with override_settings(ENGINE={"RECORD_DIR": self.root}):
+            Recorder("record").send(request, self._send)
+            Recorder("refresh", ttl=3600).send(request, self._send)
+            self.assertEqual(self.calls, 1)
+            with mock.patch("time.time", return_value=time.time() + 7200):
+                Recorder("refresh", ttl=3600).send(request, self._send)
+        self.assertEqual(self.calls, 2)
+
+    def _send(self, request_data):
+        return HTTPRequester(client_pool.client_registry.get_client()).send_request(request_data)
+
+
+# ==== 流式响应 ====
+class StreamResponseTests(SimpleTestCase):
+
+    def setUp(self):
+        self.payload = json.dumps({"items": list(range(100))}).encode()
+        self.spill_dir = tempfile.mkdtemp()
+        patcher = mock.patch.object(client_pool.httpx, "Client", lambda **kwargs: _Client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=self.payload)),
+            event_hooks=kwargs.get("event_hooks"),
+        ))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(client_pool.client_registry.close)
+        settings = override_settings(ENGINE={
+            "STREAM_SPILL_BYTES": 100, "STREAM_CHUNK_SIZE": 32, "STREAM_SPILL_DIR": self.spill_dir,
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _send(self, stream=True):
+        request = {"method": "GET", "url": "http://svc.local/items", "stream": stream}
+        return HTTPRequester(client_pool.client_registry.get_client()).send_request(request)
+
+    def test_large_body_spills_to_disk(self):
+        body = self._send()["body"]
+        self.assertTrue(body.spilled)
+        self.assertEqual(os.listdir(self.spill_dir), [os.path.basename(body.path)])
+        self.assertEqual((body.size, body.read()), (len(self.payload), self.payload))
+        self.assertEqual(b"".join(body.iter_bytes(32)), self.payload)
+        body.discard()
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_small_body_stays_in_memory(self):
+        self.payload = b'{"ok": true}'
+        body = self._send()["body"]
+        self.assertFalse(body.spilled)
+        self.assertEqual(body.parse(), {"ok": True})
+
+    def test_max_bytes(self):
+        with override_settings(ENGINE={"STREAM_SPILL_BYTES": 100, "STREAM_MAX_BYTES": 200,
+                                       "STREAM_SPILL_DIR": self.spill_dir}):
+            for stream in (True, False):
+                with self.subTest(stream=stream), self.assertRaises(ResponseTooLarge):
+                    self._send(stream)
+        # 超限时已落盘的部分一并删除
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_body_parsed_only_when_needed(self):
+        def case(validators):
+            request = {"method": "GET", "url": "/items", "headers": {}, "params": {}, "stream": True}
+            step = StepPlan(
+                id=1, name="get", order=1, request=request, template=compile_template(request), extractors=(),
+                validators=validators, assertions={}, setup_hooks=(), teardown_hooks=(), retry=RetryPolicy(),
+                skip=False,
+            )
+            return CasePlan(
+                id=1, name="case", base_url="http://svc.local", verify_ssl=True, steps=(step,),
+                global_vars={}, env_vars={}, case_vars={}, retries=0,
+            )
+
+        with mock.patch.object(response_module, "json_loads", wraps=response_module.json_loads) as loads:
+            result = EngineDispatcher().run_sync([case(())])[0]
+            self.assertEqual(loads.call_count, 0)
+            validators = ({"actual": "body.items[0]", "expected": 0, "operator": "eq"},)
+            checked = EngineDispatcher().run_sync([case(validators)])[0]
+            self.assertEqual(loads.call_count, 1)
+        step = result["steps"][0]
+        self.assertEqual((step["status"], step["response"]["body"]), ("PASS", None))
+        self.assertEqual(step["response_file"], step["response"]["body_file"])
+        self.assertEqual(checked["steps"][0]["status"], "PASS")
+        for item in (step, checked["steps"][0]):
+            os.unlink(item["response_file"])
+
+    def test_record_spilled_body_in_chunks(self):
+        body = self._send()["body"]
+        self.addCleanup(body.discard)
+        store = RecordStore(tempfile.mkdtemp())
+        with mock.patch.object(ResponseBody, "read", side_effect=AssertionError("整体读取了落盘的响应体")):
+            store.put("abcd", {"method": "GET", "url": "http://svc.local/items"},
+                      {"status_code": 200, "headers": {}, "body": body})
+        self.assertEqual(store.get("abcd")["body"].read(), self.payload)
+
+    def test_hedge_loser_body_is_discarded(self):
+        gate, bodies = asyncio.Event(), []
+
+        async def send_request(request):
+            # 首个请求等对冲请求发出后与其同时完成
+            if not bodies:
+                bodies.append(None)
+                await gate.wait()
+            else:
+                gate.set()
+            fd, path = tempfile.mkstemp(dir=self.spill_dir)
+            os.close(fd)
+            body = ResponseBody(path=path, size=0)
+            bodies.append(body)
+            return {"status_code": 200, "headers": {}, "body": body}
+
+        requester = SimpleNamespace(send_request=send_request)
+        request = {"method": "GET", "url": "http://svc.local/items"}
+        response, hedged = asyncio.run(HTTPRunner._send_async(requester, request, RetryPolicy(hedge_delay=0.01)))
+        self.assertTrue(hedged)
+        self.assertEqual(len(bodies), 3)
+        self.assertEqual(os.listdir(self.spill_dir), [os.path.basename(response["body"].path)])
+
+
+# ==== 依赖反向索引 ====
+class DependencyIndexTests(TransactionTestCase):
+
+    def setUp(self):
+        project = Project.objects.create(name="dependency")
+        environment = Environment.objects.create(name="dev", project=project, base_url="http://svc.local")
+        self.suite = TestSuite.objects.create(name="suite", project=project)
+        action, _ = ActionType.objects.get_or_create(name="http", defaults={"display_name": "HTTP", "category": "HTTP"})
+        self.interface = ApiInterface.objects.create(
+            name="user", project=project, protocol="HTTP", method="GET", url="/users/{id}",
+        )
+        self.case = TestCase.objects.create(
+            name="case", suite=self.suite, project=project, environment=environment, protocol="HTTP",
+        )
+        self.login = TestStep.objects.create(
+            testcase=self.case, name="login", action_type=action, order=0,
+            raw_request_config={"method": "POST", "url": "${host}/login"},
+            extractors=[{"key": "token", "expression": "body.token"}],
+        )
+        self.fetch = TestStep.objects.create(
+            testcase=self.case, name="fetch", action_type=action, order=1, api_interface=self.interface,
+            headers={"Authorization": "Bearer ${token}"},
+        )
+
+    def test_save_signals_index_steps(self):
+        impact = dependency_index.interface_impact(self.interface.id)
+        self.assertEqual(impact, {"steps": [self.fetch.id], "cases": [self.case.id], "suites": [self.suite.id]})
+        usage = dependency_index.variable_usage("token")
+        self.assertEqual([item["step_id"] for item in usage["producers"]], [self.login.id])
+        self.assertEqual([item["step_id"] for item in usage["consumers"]], [self.fetch.id])
+
+        self.interface.url = "/accounts/{id}"
+        self.interface.save()
+        self.assertEqual(dependency_index.endpoint_impact("GET", "/users/42")["steps"], [])
+        self.assertEqual(dependency_index.endpoint_impact("GET", "/accounts/42")["steps"], [self.fetch.id])
+
+        self.fetch.is_active = False
+        self.fetch.save()
+        self.assertFalse(StepIndexEntry.objects.filter(step=self.fetch).exists())
+
+    def test_endpoint_pattern(self):
+        self.assertEqual(dependency_index.endpoint_pattern("${host}/users/:id?page=1"), "/users/{}")
+        self.assertEqual(dependency_index.endpoint_pattern("https://api.local/users/${uid}/orders"), "/users/{}/orders")
+        self.assertEqual(dependency_index.endpoint_impact("post", "/login")["steps"], [self.login.id])
+        self.assertEqual(dependency_index.endpoint_impact("*", "/users/{id}")["steps"], [self.fetch.id])
+
+    def test_rebuild_after_bulk_update(self):
+        TestStep.objects.filter(id=self.login.id).update(extractors=[{"key": "session", "expression": "body.sid"}])
+        self.assertEqual(dependency_index.variable_usage("session")["producers"], [])
+        dependency_index.rebuild()
+        self.assertEqual(len(dependency_index.variable_usage("session")["producers"]), 1)
+        self.assertEqual(dependency_index.variable_usage("token")["producers"], [])
+
+
+# ==== 限流与自适应并发 ====
+class ThrottleTests(SimpleTestCase):
+
+    def test_aimd_shrinks_on_errors_and_grows_back(self):
+        limit = AdaptiveLimit(10, minimum=2, maximum=12, window=10)
+        for _ in range(10):
+            limit.record(0.01, error=True)
+        self.assertEqual(limit.limit, 7)
+        for _ in range(10):
+            limit.record(0.01, error=False)
+        self.assertEqual(limit.limit, 8)
+
+    def test_aimd_shrinks_when_p95_exceeds_baseline(self):
+        limit = AdaptiveLimit(10, window=10, latency_tolerance=2.0)
+        for _ in range(10):
+            limit.record(0.01, error=False)
+        for _ in range(10):
+            limit.record(0.05, error=False)
+        self.assertEqual((limit.limit, limit.decreases), (7, 1))
+
+    def test_token_bucket_paces_requests(self):
+        bucket = TokenBucket(100, burst=5)
+        waits = [bucket.reserve() for _ in range(10)]
+        self.assertEqual(waits[:5], [0.0] * 5)
+        self.assertAlmostEqual(waits[-1], 0.05, places=2)
+
+    @override_settings(ENGINE={"THROTTLE_STATUS": [503], "ADAPTIVE_WINDOW": 20})
+    def test_overloaded_host_converges(self):
+        inflight = {"now": 0}
+
+        async def server(request_data):
+            inflight["now"] += 1
+            try:
+                await asyncio.sleep(0.001)
+                return {"status_code": 503 if inflight["now"] > 4 else 200, "headers": {}}
+            finally:
+                inflight["now"] -= 1
+
+        registry = ThrottleRegistry(per_host_limit=16)
+        throttle = registry.get("http://svc.local")
+
+        async def worker(codes):
+            for _ in range(50):
+                codes.append((await throttle.send(server, {}))["status_code"])
+
+        codes = []
+
+        async def run():
+            await asyncio.gather(*(worker(codes) for _ in range(16)))
+
+        asyncio.run(run())
+        stats = registry.stats()["http://svc.local"]
+        self.assertLessEqual(stats["limit"], 5)
+        self.assertEqual(stats["inflight"], 0)
+        self.assertLess(codes[-200:].count(503), 20)
+
+
+# ==== 耗时直方图 ====
+class LatencyHistogramTests(SimpleTestCase):
+
+    def test_quantiles_within_relative_error(self):
+        values = [0.001 * (1.01 ** i) for i in range(1000)]
+        histogram = LatencyHistogram(alpha=0.01)
+        for value in values:
+            histogram.add(value)
+        for q in (0.5, 0.9, 0.99):
+            expected = values[int(q * len(values)) - 1]
+            self.assertLessEqual(abs(histogram.quantile(q) - expected) / expected, 0.01)
+        self.assertEqual(histogram.summary()["max"], round(values[-1], 6))
+
+    def test_encode_round_trip_and_merge(self):
+        left, right, whole = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for index in range(200):
+            value = 0.0005 * (index + 1)
+            (left if index % 2 else right).add(value)
+            whole.add(value)
+        self.assertEqual(LatencyHistogram.decode(left.encode()).summary(), left.summary())
+        self.assertEqual(merge_encoded([left.encode(), "", right.encode()]).summary(), whole.summary())
+        self.assertLess(len(whole.encode()), 600)
+        self.assertEqual(LatencyHistogram.decode("").summary(), {"count": 0})
+
+    def test_step_histogram_counts_every_attempt(self):
+        histogram = step_histogram([{"attempts": [{"duration": 0.1}, {"duration": 0.3}]}])
+        self.assertEqual(histogram.summary()["count"], 2)
+        self.assertAlmostEqual(histogram.quantile(0.99), 0.3, delta=0.003)
+
+
+# ==== 请求分阶段耗时 ====
+class PhaseTimingTests(SimpleTestCase):
+
+    def test_phases_from_trace_events(self):
+        timer = PhaseTimer()
+        timer.started = 0.0
+        events = [
+            ("connection.connect_tcp.started", 0.01), ("connection.connect_tcp.complete", 0.03),
+            ("connection.start_tls.started", 0.03), ("connection.start_tls.complete", 0.07),
+            ("http11.send_request_headers.started", 0.07), ("http11.send_request_body.complete", 0.08),
+            ("http11.receive_response_headers.complete", 0.28),
+            ("http11.receive_response_body.started", 0.28), ("http11.receive_response_body.complete", 0.3),
+        ]
+        for name, at in events:
+            with mock.patch("time.perf_counter", return_value=at):
+                timer.trace(name, {})
+        phases = timer.phases()
+        expected = {"pool": 0.01, "connect": 0.02, "tls": 0.04, "upload": 0.01, "ttfb": 0.2, "download": 0.02}
+        for phase, value in expected.items():
+            self.assertAlmostEqual(phases[phase], value, places=6)
+
+    def test_reused_connection_has_no_connect_phase(self):
+        timer = PhaseTimer()
+        timer.trace("http2.send_request_headers.started", {})
+        timer.trace("http2.send_request_body.complete", {})
+        timer.trace("http2.receive_response_headers.complete", {})
+        self.assertEqual(set(timer.phases()), {"pool", "upload", "ttfb", "total"})
+
+    def test_requester_attaches_timing(self):
+        client = _Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+        response = HTTPRequester(client).send_request({"method": "GET", "url": "http://svc.local/"})
+        self.assertIn("total", response["timing"])
+        with override_settings(ENGINE={"HTTP_TIMING": False}):
+            self.assertNotIn("timing", HTTPRequester(client).send_request({"method": "GET", "url": "http://svc.local/"}))
+
+
+# ==== 执行进度推送 ====
+@override_settings(ENGINE={"EVENT_BACKEND": "memory", "EVENT_HEARTBEAT": 0.05})
+class EventStreamTests(SimpleTestCase):
+
+    def _publish(self, kind, object_id, events):
+        publisher = get_publisher(kind, object_id)
+        for event_type, fields in events:
+            publisher.emit(event_type, **fields)
+        event_worker().flush()
+
+    def test_unavailable_bus_backs_off_and_logs_once(self):
+        class DownBus:
+            calls = 0
+
+            def publish_many(self, items):
+                self.calls += 1
+                raise ConnectionError("redis down")
+
+        bus, worker = DownBus(), event_worker()
+        dropped = worker.dropped
+        with self.assertLogs("apps.engine.core.events.bus", "INFO") as logs:
+            for index in range(3):
+                worker.put(bus, "engine:events:job:9", {"index": index})
+                worker.flush()
+            # 退避结束后恢复发布
+            worker._failures[bus] = (1, 0.0)
+            bus.publish_many = lambda items: None
+            worker.put(bus, "engine:events:job:9", {"index": 3})
+            worker.flush()
+        self.assertEqual(bus.calls, 1)
+        self.assertEqual(worker.dropped - dropped, 3)
+        self.assertEqual([record.levelname for record in logs.records], ["WARNING", "INFO"])
+        self.assertNotIn(bus, worker._failures)
+
+    def test_hub_fans_out_one_subscription(self):
+        async def scenario():
+            hub = get_hub()
+            first, second = await hub.subscribe("engine:events:job:1"), await hub.subscribe("engine:events:job:1")
+            self.assertEqual(hub.stats(), {"engine:events:job:1": 2})
+            await asyncio.to_thread(self._publish, "job", 1, [("step-finished", {"step_id": 3})])
+            received = [await first.get(1), await second.get(1)]
+            await first.close()
+            await second.close()
+            self.assertEqual(hub.stats(), {})
+            return received
+
+        for data, dropped in asyncio.run(scenario()):
+            self.assertEqual(json.loads(data)["step_id"], 3)
+            self.assertEqual(dropped, 0)
+
+    def test_sse_stream_ends_on_run_finished(self):
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(10)
+
+        async def send(message):
+            sent.append(message)
+
+        async def scenario():
+            app = mount(None, "/events/")
+            watcher = asyncio.ensure_future(app({"type": "http", "method": "GET", "path": "/events/job/2"}, receive, send))
+            await asyncio.sleep(0.01)
+            await asyncio.to_thread(self._publish, "job", 2, [
+                ("step-started", {"step_id": 1}),
+                ("step-finished", {"step_id": 1, "status": "PASS", "duration": 0.01}),
+                ("run-finished", {"status": "PASS"}),
+            ])
+            await asyncio.wait_for(watcher, 2)
+
+        asyncio.run(scenario())
+        self.assertEqual(sent[0]["status"], 200)
+        body = b"".join(message.get("body", b"") for message in sent).decode("utf-8")
+        events = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+        self.assertEqual(events, ["step-started", "step-finished", "run-finished"])
+        self.assertFalse(sent[-1]["more_body"])
+
+    def test_websocket_stream(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def scenario():
+            app = mount(None, "/events/")
+            incoming = asyncio.Queue()
+            await incoming.put({"type": "websocket.connect"})
+            watcher = asyncio.ensure_future(app({"type": "websocket", "path": "/events/case/5"}, incoming.get, send))
+            await asyncio.sleep(0.01)
+            await asyncio.to_thread(self._publish, "case", 5, [("case-finished", {"case_id": 5}), ("run-finished", {})])
+            await asyncio.wait_for(watcher, 2)
+
+        asyncio.run(scenario())
+        self.assertEqual(sent[0], {"type": "websocket.accept"})
+        self.assertEqual([json.loads(message["text"])["type"] for message in sent[1:-1]], ["case-finished", "run-finished"])
+        self.assertEqual(sent[-1], {"type": "websocket.close", "code": 1000})
+
+
+# ==== 提交执行 ====
+@override_settings(ENGINE={"RUN_BACKEND": "thread", "EVENT_BACKEND": "memory", "PROGRESS_INTERVAL": 0.01})
+class SubmittedRunTests(TransactionTestCase):
+
+    def setUp(self):
+        project = Project.objects.create(name="runs")
+        self.environment = Environment.objects.create(name="dev", project=project, base_url="http://svc.local")
+        suite = TestSuite.objects.create(name="suite", project=project)
+        action, _ = ActionType.objects.get_or_create(name="http", defaults={"display_name": "HTTP", "category": "HTTP"})
+        self.case = TestCase.objects.create(
+            name="case", suite=suite, project=project, environment=self.environment, protocol="HTTP",
+        )
+        for index in range(3):
+            interface = ApiInterface.objects.create(
+                name=f"api-{index}", project=project, protocol="HTTP", method="GET", url=f"/ok/{index}",
+            )
+            TestStep.objects.create(testcase=self.case, name=f"step-{index}", action_type=action, api_interface=interface, order=index)
+        # 连接池按 base_url 进程内共享，清掉之前测试建好的客户端，让本用例的 MockTransport 生效
+        client_pool.client_registry.close()
+        self.addCleanup(client_pool.client_registry.close)
+
+    def _client(self, on_request=None):
+        def handler(request):
+            if on_request:
+                on_request(request)
+            return httpx.Response(200, json={"ok": True})
+
+        return lambda **kwargs: _Client(transport=httpx.MockTransport(handler), event_hooks=kwargs.get("event_hooks"))
+
+    @mock.patch.object(runs, "enqueue_run")
+    def test_submit_returns_pending_run_and_dedupes(self, enqueue_run):
+        run, deduplicated = runs.submit_run(self.case, self.environment)
+        self.assertEqual((run.status, deduplicated), ("PENDING", False))
+        again, deduplicated = runs.submit_run(self.case, self.environment)
+        self.assertEqual((again.id, deduplicated), (run.id, True))
+        other, deduplicated = runs.submit_run(self.case, self.environment, key="retry-1")
+        self.assertNotEqual(other.id, run.id)
+        self.assertEqual(enqueue_run.call_count, 2)
+        self.assertEqual(TestRun.objects.count(), 2)
+
+        with mock.patch.object(client_pool.httpx, "Client", self._client()):
+            runs.execute_run(run.id)
+        run.refresh_from_db()
+        self.assertEqual(run.status, "SUCCESS")
+        self.assertEqual(run.report.case_reports.count(), 1)
+        self.assertEqual([step["status"] for step in run.partial], ["PASS"] * 3)
+
+    @mock.patch.object(runs, "enqueue_run")
+    def test_cancel_pending_run(self, enqueue_run):
+        run, _ = runs.submit_run(self.case)
+        self.assertEqual(runs.cancel_run(run.id).status, "CANCELLED")
+        runs.execute_run(run.id)
+        self.assertIsNone(TestRun.objects.get(id=run.id).started_at)
+        # 已取消的运行不参与去重
+        self.assertFalse(runs.submit_run(self.case)[1])
+
+    @mock.patch.object(runs, "enqueue_run")
+    def test_cancel_running_run_skips_remaining_steps(self, enqueue_run):
+        run, _ = runs.submit_run(self.case, self.environment)
+
+        def cancel(request):
+            runs.cancel_run(run.id)
+            time.sleep(0.1)
+
+        with mock.patch.object(client_pool.httpx, "Client", self._client(cancel)):
+            runs.execute_run(run.id)
+        run.refresh_from_db()
+        self.assertEqual(run.status, "CANCELLED")
+        self.assertEqual(len(run.partial), 1)
+        statuses = run.report.case_reports.get().step_reports.order_by("step__order").values_list("status", flat=True)
+        self.assertEqual(list(statuses), ["PASS", "SKIP", "SKIP"])
+
+
+# ==== 被测数据库 ====
+class DatabaseExecutorTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.database = SimpleNamespace(
+            id=1, name="sut", db_type="SQLITE", db_name=os.path.join(directory.name, "sut.db"), updated_at=1,
+        )
+        self.pool = DatabasePool(self.database, max_size=2, timeout=0.05)
+        self.addCleanup(self.pool.close)
+        self.pool.execute([SqlStatement("create table users (id integer primary key, name text)")], {})
+
+    def test_statement_binds_variables(self):
+        statement = SqlStatement("select * from users where name = ${name} and note like '%x'")
+        self.assertEqual(statement.sql("qmark"), "select * from users where name = ? and note like '%x'")
+        self.assertEqual(statement.sql("format"), "select * from users where name = %s and note like '%%x'")
+        self.assertEqual(SqlStatement("select '%'").sql("format"), "select '%'")
+        with self.assertRaises(ValueError):
+            statement.params({})
+
+    def test_values_are_bound_not_interpolated(self):
+        name = "O'Brien'); drop table users; --"
+        insert = SqlStatement("insert into users (name) values (${name})")
+        select = SqlStatement("select name from users where name = ${name}")
+        _, rows = self.pool.execute([insert, select], {"name": name})
+        self.assertEqual(rows, [{"name": name}])
+
+    def test_failed_batch_rolls_back(self):
+        insert = SqlStatement("insert into users (name) values ('a')")
+        with self.assertRaises(Exception):
+            self.pool.execute([insert, SqlStatement("insert into missing values (1)")], {})
+        self.assertEqual(self.pool.execute([SqlStatement("select count(*) as n from users")], {}), [[{"n": 0}]])
+
+    def test_pool_reuses_last_returned_connection(self):
+        with self.pool.connection() as first, self.pool.connection() as second:
+            with self.assertRaises(TimeoutError):
+                with self.pool.connection():
+                    pass
+        # second 先归还、first 后归还，LIFO 下一次借出的是 first
+        with self.pool.connection() as conn:
+            self.assertIs(conn, first)
+        self.assertIsNot(first, second)
+        # setUp 建表时创建了第一个连接
+        self.assertEqual((self.pool.created, self.pool.reused), (2, 2))
+
+    def test_idle_connection_recycled(self):
+        pool = DatabasePool(self.database, recycle=0.01)
+        self.addCleanup(pool.close)
+        with pool.connection() as first:
+            pass
+        time.sleep(0.02)
+        with pool.connection() as second:
+            self.assertIsNot(second, first)
+        self.assertEqual((pool.created, pool.reused), (2, 0))
+
+    def test_registry_rebuilds_pool_when_database_changes(self):
+        registry = DatabasePoolRegistry()
+        self.addCleanup(registry.close)
+        pool = registry.get(self.database)
+        self.assertIs(registry.get(self.database), pool)
+        with pool.connection():
+            pass
+        changed = SimpleNamespace(**{**vars(self.database), "updated_at": 2})
+        self.assertIsNot(registry.get(changed), pool)
+        self.assertEqual(pool.metrics()["idle"], 0)
+
+    def test_connection_returned_to_replaced_pool_is_closed(self):
+        registry = DatabasePoolRegistry()
+        self.addCleanup(registry.close)
+        pool = registry.get(self.database)
+        with pool.connection() as conn:
+            changed = SimpleNamespace(**{**vars(self.database), "updated_at": 2})
+            registry.get(changed)
+            self.assertTrue(pool.metrics()["closed"])
+        self.assertEqual(pool.metrics()["idle"], 0)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("select 1")
+
+    def test_hoist_stops_at_extracted_variables_and_teardown(self):
+        def sql(text):
+            return normalize_hook({"type": "setup", "value": f"SQL: {text}"})
+
+        steps = [SimpleNamespace(extractors=[{"key": "order_id"}]), SimpleNamespace(extractors=[]), SimpleNamespace(extractors=[])]
+        step_hooks = [
+            ((sql("delete from users"),), ()),
+            ((sql("update orders set state = 1 where id = ${order_id}"),), ()),
+            ((sql("delete from orders"),), ()),
+        ]
+        self.assertEqual(hoist_setup_hooks(steps, step_hooks)[0], ())
+        with override_settings(ENGINE={"DB_HOIST_SETUP": True}):
+            hoisted, remaining = hoist_setup_hooks(steps, step_hooks)
+            self.assertEqual([hook["value"].strip() for hook in hoisted], ["delete from users"])
+            self.assertEqual([len(setup) for setup in remaining], [0, 1, 1])
 
-    def test_create_interface(self):
-        response = self.client.post(reverse('create_interface'), json=self.test_interface_data)
-        self.assertEqual(response.status_code, 201)  # 201 Created
-        self.assertEqual(response.json()['name'], self.test_interface_data['name'])
-
-    def test_list_interfaces(self):
-        TestInterface.objects.create(**self.test_interface_data)
-        response = self.client.get(reverse('list_interfaces'))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(len(response.json()), 1)
-
-    def test_get_interface(self):
-        interface = TestInterface.objects.create(**self.test_interface_data)
-        response = self.client.get(reverse('get_interface', args=[interface.id]))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['id'], interface.id)
-
-    def test_update_interface(self):
-        interface = TestInterface.objects.create(**self.test_interface_data)
-        updated_data = {"name": "Updated Interface"}
-        response = self.client.put(reverse('update_interface', args=[interface.id]), json=updated_data)
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['name'], updated_data['name'])
-
-    def test_delete_interface(self):
-        interface = TestInterface.objects.create(**self.test_interface_data)
-        response = self.client.delete(reverse('delete_interface', args=[interface.id]))
-        self.assertEqual(response.status_code, 204)  # 204 No Content
-
-    def test_create_test_suite(self):
-        response = self.client.post(reverse('create_test_suite'), json=self.test_suite_data)
-        self.assertEqual(response.status_code, 201)  # 201 Created
-        self.assertEqual(response.json()['name'], self.test_suite_data['name'])
-
-    def test_list_test_suites(self):
-        TestSuite.objects.create(**self.test_suite_data)
-        response = self.client.get(reverse('list_test_suites'))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(len(response.json()), 1)
-
-    def test_get_test_suite(self):
-        suite = TestSuite.objects.create(**self.test_suite_data)
-        response = self.client.get(reverse('get_test_suite', args=[suite.id]))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['id'], suite.id)
-
-    def test_update_test_suite(self):
-        suite = TestSuite.objects.create(**self.test_suite_data)
-        updated_data = {"name": "Updated Suite"}
-        response = self.client.put(reverse('update_test_suite', args=[suite.id]), json=updated_data)
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['name'], updated_data['name'])
-
-    def test_delete_test_suite(self):
-        suite = TestSuite.objects.create(**self.test_suite_data)
-        response = self.client.delete(reverse('delete_test_suite', args=[suite.id]))
-        self.assertEqual(response.status_code, 204)  # 204 No Content
-
-    def test_create_test_case(self):
-        suite = TestSuite.objects.create(**self.test_suite_data)
-        self.test_case_data['suite'] = suite.id
-        response = self.client.post(reverse('create_test_case'), json=self.test_case_data)
-        self.assertEqual(response.status_code, 201)  # 201 Created
-        self.assertEqual(response.json()['name'], self.test_case_data['name'])
-
-    def test_list_test_cases(self):
-        TestCase.objects.create(**self.test_case_data)
-        response = self.client.get(reverse('list_test_cases'))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(len(response.json()), 1)
-
-    def test_get_test_case(self):
-        test_case = TestCase.objects.create(**self.test_case_data)
-        response = self.client.get(reverse('get_test_case', args=[test_case.id]))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['id'], test_case.id)
-
-    def test_update_test_case(self):
-        test_case = TestCase.objects.create(**self.test_case_data)
-        updated_data = {"name": "Updated Test Case"}
-        response = self.client.put(reverse('update_test_case', args=[test_case.id]), json=updated_data)
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['name'], updated_data['name'])
-
-    def test_delete_test_case(self):
-        test_case = TestCase.objects.create(**self.test_case_data)
-        response = self.client.delete(reverse('delete_test_case', args=[test_case.id]))
-        self.assertEqual(response.status_code, 204)  # 204 No Content
-
-    def test_create_test_job(self):
-        response = self.client.post(reverse('create_test_job'), json=self.test_job_data)
-        self.assertEqual(response.status_code, 201)  # 201 Created
-        self.assertEqual(response.json()['name'], self.test_job_data['name'])
-
-    def test_list_test_jobs(self):
-        TestJob.objects.create(**self.test_job_data)
-        response = self.client.get(reverse('list_test_jobs'))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(len(response.json()), 1)
-
-    def test_get_test_job(self):
-        job = TestJob.objects.create(**self.test_job_data)
-        response = self.client.get(reverse('get_test_job', args=[job.id]))
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['id'], job.id)
-
-    def test_update_test_job(self):
-        job = TestJob.objects.create(**self.test_job_data)
-        updated_data = {"name": "Updated Test Job"}
-        response = self.client.put(reverse('update_test_job', args=[job.id]), json=updated_data)
-        self.assertEqual(response.status_code, 200)  # 200 OK
-        self.assertEqual(response.json()['name'], updated_data['name'])
-
-    def test_delete_test_job(self):
-        job = TestJob.objects.create(**self.test_job_data)
-        response = self.client.delete(reverse('delete_test_job', args=[job.id]))
-        self.assertEqual(response.status_code, 204)  # 204 No Content
+            step_hooks[0] = (step_hooks[0][0], (sql("delete from users"),))
+            step_hooks[1] = ((sql("delete from orders"),), ())
+            hoisted, remaining = hoist_setup_hooks(steps, step_hooks)
+            self.assertEqual(len(hoisted), 1)
+            self.assertEqual([len(setup) for setup in remaining], [0, 1, 1])
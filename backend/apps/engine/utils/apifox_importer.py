@@ -5,18 +5,19 @@ import logging
 from typing import Dict, List, Any, Optional
 
 from django.db import transaction
-from apps.engine.models import TestInterface
+from apps.engine.models import ApiInterface
 
 logger = logging.getLogger(__name__)
 
 class ApifoxImporter:
-    """Apifox 接口导入器，支持将 Apifox 导出的接口数据转换为 TestInterface 模型"""
+    """Apifox 接口导入器，支持将 Apifox 导出的接口数据转换为 ApiInterface 模型，导入到 project_id 对应的项目"""
     
-    def __init__(self):
+    def __init__(self, project_id: int):
+        self.project_id = project_id
         self.protocol_map = {
             "http": "HTTP",
             "https": "HTTP",
-            "graphql": "GraphQL",
+            "graphql": "GRAPHQL",
             "grpc": "gRPC",
             "dubbo": "DUBBO"
         }
@@ -29,7 +30,7 @@ class ApifoxImporter:
             "patch": "PATCH"
         }
     
-    def import_from_json(self, json_data: Dict[str, Any]) -> List[TestInterface]:
+    def import_from_json(self, json_data: Dict[str, Any]) -> List[ApiInterface]:
         """
         从 Apifox 导出的 JSON 数据导入接口
         
@@ -37,7 +38,7 @@ class ApifoxImporter:
             json_data: Apifox 导出的 JSON 数据
             
         Returns:
-            导入的 TestInterface 实例列表
+            导入的 ApiInterface 实例列表
         """
         imported_interfaces = []
         
@@ -56,7 +57,7 @@ class ApifoxImporter:
             logger.error(f"导入过程中发生错误: {str(e)}")
             return []
     
-    def _import_from_openapi(self, openapi_data: Dict[str, Any]) -> List[TestInterface]:
+    def _import_from_openapi(self, openapi_data: Dict[str, Any]) -> List[ApiInterface]:
         """从 OpenAPI (Swagger) 格式导入接口"""
         imported_interfaces = []
         
@@ -81,9 +82,6 @@ class ApifoxImporter:
                     summary = method_data.get("summary", "")
                     name = operation_id or summary or f"{method.upper()} {path}"
                     
-                    # 创建接口描述
-                    description = method_data.get("description", "")
-                    
                     # 处理请求参数
                     parameters = method_data.get("parameters", [])
                     query_params = {}
@@ -117,16 +115,16 @@ class ApifoxImporter:
                             schema = response_content["application/json"].get("schema", {})
                             response_example = schema.get("example", {})
                     
-                    # 创建 TestInterface 实例
-                    interface = TestInterface(
+                    # 创建 ApiInterface 实例
+                    interface = ApiInterface(
                         name=name,
-                        description=description,
+                        project_id=self.project_id,
                         protocol="HTTP",
                         method=self.method_map.get(method.lower(), "GET"),
                         url=path,
                         headers=headers,
                         body=body,
-                        query_params=query_params,
+                        params=query_params,
                         response_example=response_example
                     )
                     
@@ -143,7 +141,7 @@ class ApifoxImporter:
             logger.error(f"从 OpenAPI 导入时发生错误: {str(e)}")
             return []
     
-    def _import_from_apifox_format(self, apifox_data: Dict[str, Any]) -> List[TestInterface]:
+    def _import_from_apifox_format(self, apifox_data: Dict[str, Any]) -> List[ApiInterface]:
         """从 Apifox 自定义格式导入接口"""
         imported_interfaces = []
         
@@ -154,7 +152,6 @@ class ApifoxImporter:
             for api in apis:
                 # 获取基本信息
                 name = api.get("name", "未命名接口")
-                description = api.get("description", "")
                 
                 # 获取请求信息
                 method = api.get("method", "GET")
@@ -190,16 +187,16 @@ class ApifoxImporter:
                 if response_data:
                     response_example = response_data.get("example", {})
                 
-                # 创建 TestInterface 实例
-                interface = TestInterface(
+                # 创建 ApiInterface 实例
+                interface = ApiInterface(
                     name=name,
-                    description=description,
+                    project_id=self.project_id,
                     protocol="HTTP",
                     method=self.method_map.get(method.lower(), "GET"),
                     url=path,
                     headers=headers,
                     body=body,
-                    query_params=query_params,
+                    params=query_params,
                     response_example=response_example
                 )
                 
@@ -216,7 +213,7 @@ class ApifoxImporter:
             logger.error(f"从 Apifox 格式导入时发生错误: {str(e)}")
             return []
     
-    def import_from_file(self, file_path: str) -> List[TestInterface]:
+    def import_from_file(self, file_path: str) -> List[ApiInterface]:
         """
         从文件导入接口
         
@@ -224,7 +221,7 @@ class ApifoxImporter:
             file_path: Apifox 导出的文件路径
             
         Returns:
-            导入的 TestInterface 实例列表
+            导入的 ApiInterface 实例列表
         """
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tsadmin.settings")
 
 application = get_asgi_application()
+
+# /mock/{project_id}/ 下的请求由 Mock 服务直接处理，不经过 Django
+from apps.engine.core.mock.server import mount  # noqa: E402
+
+application = mount(application)
+
+# /events/job/{job_id}、/events/case/{case_id} 推送执行进度（SSE / WebSocket），只读事件总线
+from apps.engine.core.events.server import mount as mount_events  # noqa: E402
+
+application = mount_events(application)
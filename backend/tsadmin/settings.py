@@ -162,6 +162,40 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Asia/Shanghai"
 CELERY_ENABLE_UTC = False
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "False") == "True"
+
+# 测试引擎配置
+ENGINE = {
+    "MAX_CONCURRENCY": int(os.getenv("ENGINE_MAX_CONCURRENCY", "50")),
+    "PER_HOST_CONCURRENCY": int(os.getenv("ENGINE_PER_HOST_CONCURRENCY", "10")),
+    "HTTP2": os.getenv("ENGINE_HTTP2", "False") == "True",
+    "POOL_MAX_CONNECTIONS": int(os.getenv("ENGINE_POOL_MAX_CONNECTIONS", "100")),
+    "POOL_MAX_KEEPALIVE": int(os.getenv("ENGINE_POOL_MAX_KEEPALIVE", "20")),
+    "POOL_KEEPALIVE_EXPIRY": float(os.getenv("ENGINE_POOL_KEEPALIVE_EXPIRY", "30")),
+    "JMESPATH_CACHE_SIZE": int(os.getenv("ENGINE_JMESPATH_CACHE_SIZE", "1024")),
+    "REPORT_BATCH_SIZE": int(os.getenv("ENGINE_REPORT_BATCH_SIZE", "200")),
+    "REPORT_FLUSH_INTERVAL": float(os.getenv("ENGINE_REPORT_FLUSH_INTERVAL", "1")),
+    "REPORT_QUEUE_SIZE": int(os.getenv("ENGINE_REPORT_QUEUE_SIZE", "1000")),
+    "STREAM_RESPONSES": os.getenv("ENGINE_STREAM_RESPONSES", "False") == "True",
+    "STREAM_SPILL_BYTES": int(os.getenv("ENGINE_STREAM_SPILL_BYTES", str(1024 * 1024))),
+    "STREAM_MAX_BYTES": int(os.getenv("ENGINE_STREAM_MAX_BYTES", str(200 * 1024 * 1024))),
+    "STEP_CONCURRENCY": int(os.getenv("ENGINE_STEP_CONCURRENCY", "1")),
+    "CASE_TIMEOUT": int(os.getenv("ENGINE_CASE_TIMEOUT", "600")),
+    "ROW_CONCURRENCY": int(os.getenv("ENGINE_ROW_CONCURRENCY", "10")),
+    "SHARD_COUNT": int(os.getenv("ENGINE_SHARD_COUNT", "4")),
+    "SHARD_TIMEOUT": int(os.getenv("ENGINE_SHARD_TIMEOUT", "3600")),
+    "SHARD_QUEUE": os.getenv("ENGINE_SHARD_QUEUE", "engine_shards"),
+    "SHARD_HEARTBEAT_TIMEOUT": float(os.getenv("ENGINE_SHARD_HEARTBEAT_TIMEOUT", "60")),
+    "RESULT_STREAM_BACKEND": os.getenv("ENGINE_RESULT_STREAM_BACKEND", "redis"),
+    "EVENT_BACKEND": os.getenv("ENGINE_EVENT_BACKEND", "redis"),
+    "RUN_BACKEND": os.getenv("ENGINE_RUN_BACKEND", "celery"),
+    "ASSERTION_WORKERS": int(os.getenv("ENGINE_ASSERTION_WORKERS", "2")),
+    "ASSERTION_TIMEOUT": float(os.getenv("ENGINE_ASSERTION_TIMEOUT", "5")),
+    "GRAPHQL_PERSISTED_QUERIES": os.getenv("ENGINE_GRAPHQL_PERSISTED_QUERIES", "False") == "True",
+    "GRAPHQL_BATCHING": os.getenv("ENGINE_GRAPHQL_BATCHING", "True") == "True",
+    "RATE_LIMIT": float(os.getenv("ENGINE_RATE_LIMIT")) if os.getenv("ENGINE_RATE_LIMIT") else None,
+    "ADAPTIVE_CONCURRENCY": os.getenv("ENGINE_ADAPTIVE_CONCURRENCY", "True") == "True",
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
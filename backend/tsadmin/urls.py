@@ -22,7 +22,7 @@ api.register_controllers(NinjaJWTDefaultController)
 # 导入各个应用的 API 路由
 try:
     from apps.system.router import router as system_router
-    from backend.apps.engine.routers import router as engine_router
+    from apps.engine.routers import router as engine_router
 
     api.add_router("/sys", system_router)
     api.add_router("/engine", engine_router)